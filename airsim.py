@@ -1,31 +1,54 @@
 from models.passenger import Passenger
 from scheduler import Scheduler
+from utils.demand_utils import demand_chunks
+from utils.columnar_log import ColumnarLog, DistributionHistory, PASSENGER_TRIP_SCHEMA, PASSENGER_LEG_SCHEMA, VEHICLE_TRIP_SCHEMA
+import networkx as nx
 import pandas as pd
 import asyncio
+import logging
+import math
+
+logger = logging.getLogger(__name__)
 
 
 class UAMSimulation:
-    def __init__(self, env, network, passenger_data, mission_profile, update_interval=120, start_time=6*3600, end_time=86400, run_mode='visual', websocket_server=None):
+    def __init__(self, env, network, passenger_data, mission_profile, update_interval=120, start_time=6*3600, end_time=86400, run_mode='visual', websocket_server=None, dispatch_policy=None, separation_interval=None, deconfliction=None, network_events=None, arrival_sources=None, skip_idle=True, log_dir=None, log_buffer_size=65536):
         """
         Initializes the UAM Simulation.
 
         :param env: SimPy environment
         :param network: UAMNetwork instance
-        :param passenger_data: DataFrame containing passenger arrival data
+        :param passenger_data: passenger arrival data - DataFrame, DemandTable or iterable of time-ordered DemandTable chunks
         :param update_interval: Time in seconds for periodic network updates
         :param run_mode: "visual" or "fast" - does not do regular update
+        :param dispatch_policy: DispatchPolicy used by the scheduler (default: static threshold policy)
+        :param separation_interval: Time in seconds between UTM separation checks (None disables monitoring)
+        :param deconfliction: StrategicDeconfliction used at dispatch time (None disables slot reservation)
+        :param network_events: NetworkEventManager applying scheduled closures and capacity changes (optional)
+        :param arrival_sources: passenger sources generating arrivals while running (e.g. PoissonArrivalSource),
+                                started next to the replay of passenger_data - pass an empty list as passenger_data to replace it.
+                                Their passengers get ids past the largest replayed id unless a source sets first_passenger_id.
+        :param skip_idle: suspend the periodic update loop while the system is idle (see skip_ahead)
+        :param log_dir: directory the trip and distribution logs are flushed to while running (None keeps them in memory).
+                        The logs can be read at any time (column, to_frame): the chunk files flushed so far are read
+                        back together with the rows still buffered, with the Parquet and the .npz backend alike.
+                        A directory already holding the logs of an earlier run is refused
+        :param log_buffer_size: rows buffered per log before a flush (Parquet row group or .npz chunk)
         """
         self.env = env
         self.network = network
         self.network.simulation = self
-        self.passenger_data = passenger_data
+        self.passenger_data = demand_chunks(passenger_data, network.vertiport_ids) # codes are network vertiport indices
         self.update_interval = update_interval
         self.start_time = start_time
         self.end_time = end_time
         self.mission_profile = mission_profile
-        self.scheduler = Scheduler(env, network, mission_profile, run_mode=run_mode)
+        self.scheduler = Scheduler(env, network, mission_profile, run_mode=run_mode, policy=dispatch_policy, deconfliction=deconfliction)
         self.run_mode = run_mode
         self.websocket_server = websocket_server
+        self.log_dir = log_dir
+        self.skip_idle = skip_idle
+        self.activity = None # pending while the update loop is suspended, triggered by wake()
 
         if self.run_mode == "fast":
             self.websocket_server = None
@@ -33,121 +56,203 @@ class UAMSimulation:
         # Start simulation processes
         self.env.process(self.run())
         self.env.process(self.passenger_arrival_process())
+        if separation_interval:
+            self.env.process(self.network.utm.monitor(separation_interval))
+        self.network_events = network_events
+        if network_events is not None:
+            self.env.process(network_events.process())
+        self.arrival_sources = list(arrival_sources or [])
+        self.next_passenger_id = self.first_generated_passenger_id() if self.arrival_sources else 0
+        for source in self.arrival_sources:
+            source.start(self)
+
+        # network state log - fixed-schema columnar logs, vertiport and aircraft ids stored as codes
+        vertiports = {"origin": network.vertiport_ids, "destination": network.vertiport_ids}
+        aircraft_ids = network.fleet.ids[:network.fleet.size].tolist()
+        # (time × vertiport) counters, preallocated for every update tick of the run
+        self.distribution_history = DistributionHistory(network.vertiport_ids, rows=int(max(end_time - start_time, 0) // update_interval) + 2,
+                                                        update_interval=update_interval)
+        self.passenger_trip_log = ColumnarLog("passenger_trips", PASSENGER_TRIP_SCHEMA, log_buffer_size, log_dir, vertiports)
+        self.passenger_leg_log = ColumnarLog("passenger_legs", PASSENGER_LEG_SCHEMA, log_buffer_size, log_dir, vertiports)
+        self.vehicle_trip_log = ColumnarLog("vehicle_trips", VEHICLE_TRIP_SCHEMA, log_buffer_size, log_dir,
+                                            {"aircraft_id": aircraft_ids, **vertiports})
+        self.rejected_passenger_log = [] # passengers without a route at arrival (closed vertiports or routes)
 
-        # network state log
-        self.distribution_history = []
-        self.passenger_trip_log = []
-        self.vehicle_trip_log = []
+    def first_generated_passenger_id(self):
+        """
+        First passenger id of the arrival sources without an explicit first_passenger_id: past the largest
+        replayed id, so trip and leg rows of replayed and generated passengers never share an id.
+        """
+        if all(getattr(source, "next_passenger_id", None) is not None for source in self.arrival_sources):
+            return 0
+        if not isinstance(self.passenger_data, (list, tuple)):
+            raise ValueError("streamed passenger_data cannot be scanned for its largest passenger id - "
+                             "give the arrival sources an explicit first_passenger_id")
+        largest = [int(chunk.passenger_id.max()) for chunk in self.passenger_data if len(chunk)]
+        return max(largest) + 1 if largest else 0
+
+    def new_passenger_id(self):
+        """Next passenger id for a generated arrival."""
+        passenger_id = self.next_passenger_id
+        self.next_passenger_id += 1
+        return passenger_id
 
     def run(self):
         """Main simulation loop handling network updates."""
         yield self.env.timeout(self.start_time)
 
+        next_update = self.env.now
         while self.env.now  <= self.end_time:
-            yield self.env.timeout(self.update_interval)  # Perform network check
+            next_update += self.update_interval
+            yield self.env.timeout(next_update - self.env.now)  # Perform network check
             self.network.update_network()
-            self.scheduler.make_dispatch_decision()
+            decision = self.scheduler.make_dispatch_decision()
 
             # logging network state
-            dist_state = self.get_aircraft_distribution_state()
-            self.distribution_history.append(dist_state)
+            self.log_distribution()
 
             # Send updates to WebSocket server at every update_interval
             if self.websocket_server:
                 state = self.get_current_state()
                 asyncio.create_task(self.websocket_server.send_update(state))  # Send state asynchronously
 
+            if self.skip_idle and not decision.dispatches and not decision.repositions and self.is_idle():
+                skipped = yield from self.skip_ahead()
+                if skipped is None:
+                    return # nothing happens before the end of the simulation
+                if skipped:
+                    next_update += skipped * self.update_interval
+                    self.scheduler.policy.skip(next_update)
+
+    def is_idle(self):
+        """True if no passenger is waiting and every aircraft is parked, fully charged and not reserved."""
+        for vertiport in self.network.vertiports.values():
+            if vertiport.passengers:
+                return False
+
+        for aircraft in self.network.aircrafts.values():
+            if aircraft.state != "idle" or not aircraft.flight_ready:
+                return False
+
+        return True
+
+    def skip_ahead(self):
+        """
+        Suspends the update loop until the next passenger arrival or network event (see wake).
+        The skipped updates would not change anything, so only the idle interval is logged.
+
+        :return: number of skipped updates - the loop resumes at the first update time at or after the wake-up,
+                 or None if nothing woke the loop before the end time
+        """
+        idle_start = self.env.now
+        activity = self.activity = self.env.event()
+        yield activity | self.env.timeout(max(self.end_time - self.env.now, 0))
+        self.activity = None
+
+        if activity.triggered:
+            skipped = max(math.ceil((self.env.now - idle_start) / self.update_interval) - 1, 0)
+        else:
+            skipped = None
+
+        # idle periods are kept with the distribution history (the distribution state is unchanged)
+        self.distribution_history.record_skip(idle_start, self.env.now, skipped if skipped is not None
+                                              else int((self.env.now - idle_start) // self.update_interval))
+        logger.debug(f"[{self.env.now}] update loop idle since {idle_start}")
+        return skipped
+
+    def wake(self):
+        """Resumes the update loop if it is suspended (passenger arrival, network event)."""
+        if self.activity is not None and not self.activity.triggered:
+            self.activity.succeed()
 
     def passenger_arrival_process(self):
         """Handles passenger arrivals as a separate process."""
-        for _, passenger_info in self.passenger_data.iterrows():
-            arrival_time = self.time_to_seconds(passenger_info['arrival_time'])
-            if arrival_time > self.end_time:
-                break # break if end time is reached
+        for chunk in self.passenger_data:
+            vertiport_ids = chunk.vertiport_ids
+            # plain Python lists - scalar access is much cheaper than on NumPy arrays
+            for pid, arrival_time, origin, destination in zip(chunk.passenger_id.tolist(), chunk.arrival.tolist(),
+                                                              chunk.origin.tolist(), chunk.destination.tolist()):
+                if arrival_time > self.end_time:
+                    return # stop if end time is reached
 
-            pid = passenger_info['passenger_id']
-            if self.run_mode == "visual":
-                print(f'passenger id: {pid} \n \t arrival time: {arrival_time} \t env time: {self.env.now}')
+                if self.run_mode == "visual":
+                    print(f'passenger id: {pid} \n \t arrival time: {arrival_time} \t env time: {self.env.now}')
 
-            yield self.env.timeout(arrival_time - self.env.now)  # Pause until passenger arrives
-            self.process_passenger_arrival(passenger_info)
+                yield self.env.timeout(arrival_time - self.env.now)  # Pause until passenger arrives
+                self.process_passenger_arrival(pid, vertiport_ids[origin], vertiport_ids[destination])
 
-    def process_passenger_arrival(self, passenger_info):
+    def process_passenger_arrival(self, passenger_id, origin, destination):
         """Handles passenger arrival at a vertiport."""
+        self.wake()
 
-        itinerary = self.network.compute_itinerary(passenger_info['origin'], passenger_info['destination'])
+        try:
+            itinerary = self.network.compute_itinerary(origin, destination)
+        except nx.NetworkXNoPath:
+            logger.warning(f"[{self.env.now}] Passenger {passenger_id} rejected: no route {origin} → {destination}")
+            self.rejected_passenger_log.append({
+                "passenger_id": passenger_id,
+                "time": self.env.now,
+                "origin": origin,
+                "destination": destination
+            })
+            return
 
         passenger = Passenger(
             env=self.env,
-            passenger_id=passenger_info['passenger_id'],
+            passenger_id=passenger_id,
             network = self.network,
             itinerary=itinerary
         )
 
-        passenger.journey_process = self.env.process(passenger.journey())
-        self.env.process(self.monitor_passenger(passenger))
-
-    @staticmethod
-    def time_to_seconds(time_str):
-        """Converts time in HH:MM:SS format to seconds past midnight."""
-        h, m, s = map(int, time_str.split(':'))
-        return (h * 3600) + (m * 60) + s
+        passenger.start_journey()
 
     def get_current_state(self):
-        state=[]
-
-        for _, ac in self.network.aircrafts.items():
-            if ac.state == "flying":
-                state.append({
-                    'vehicle': ac.vehicle,
-                    'id': ac.aircraft_id,
-                    'lat': ac.position[0],
-                    'lon': ac.position[1],
-                    'alt': ac.position[2],
-                    'v_h': ac.speed_horizontal,
-                    'v_v': ac.speed_vertical,
-                    'heading': ac.heading,
-                    'soc': ac.battery.soc
-                })
-
-        return{
-            'time': self.env.now,
-            'aircrafts': state
-        }
+        """Columns of the flying aircraft (see FleetState.snapshot), positions interpolated at env.now."""
+        return self.network.fleet.snapshot(self.env.now)
 
     def get_aircraft_distribution_state(self):
         """
-        Returns aircraft distribution:
+        Returns aircraft distribution (from the network counters, no fleet scan):
         - aircraft_at_node: dict[node_id] = number of aircraft parked
         - aircraft_inbound_to_node: dict[node_id] = number of aircraft en route to that node
         """
-        aircraft_at_node = {node_id: 0 for node_id in self.network.vertiports}
-        aircraft_inbound_to_node = {node_id: 0 for node_id in self.network.vertiports}
-
-        for aircraft in self.network.aircrafts.values():
-            if aircraft.state == "flying":
-                # Aircraft is flying toward a destination
-                dest_id = aircraft.destination_vertiport.vertiport_id
-                if dest_id in aircraft_inbound_to_node:
-                    aircraft_inbound_to_node[dest_id] += 1
-                else:
-                    aircraft_inbound_to_node[dest_id] = 1  # Just in case not initialized
-
-            elif aircraft.state in ("idle", "charge"):
-                # Aircraft is parked at a vertiport
-                origin_id = aircraft.origin_vertiport.vertiport_id
-                if origin_id in aircraft_at_node:
-                    aircraft_at_node[origin_id] += 1
-                else:
-                    aircraft_at_node[origin_id] = 1  # Just in case
-
+        ids = self.network.vertiport_ids
         return {
             "time": self.env.now,
-            "aircraft_at_node": aircraft_at_node,
-            "aircraft_inbound_to_node": aircraft_inbound_to_node
+            "aircraft_at_node": dict(zip(ids, self.network.parked_count.tolist())),
+            "aircraft_inbound_to_node": dict(zip(ids, self.network.inbound_count.tolist()))
         }
 
-    def monitor_passenger(self, passenger):
-        """Waits for journey to complete, then logs trip result."""
-        yield passenger.journey_process  # wait until journey ends
-        self.passenger_trip_log.append(passenger.trip_result)
+    def log_distribution(self):
+        """Copies the parked and inbound counters of every vertiport into distribution_history."""
+        self.distribution_history.record(self.env.now, self.network.parked_count, self.network.inbound_count)
+
+    def log_trip(self, passenger):
+        """
+        Called by the passenger at its final destination. Writes the trip row and one leg row per leg
+        (wait time at the leg origin, arrival at the leg destination).
+        """
+        index = self.network.vertiport_index
+        itinerary = passenger.itinerary
+        arrivals = passenger.destination_arrival_time_history
+
+        for leg, (wait_time, arrival_time) in enumerate(zip(passenger.wait_time_history, arrivals)):
+            self.passenger_leg_log.append(passenger.passenger_id, leg, index[itinerary[leg]], index[itinerary[leg + 1]],
+                                          wait_time, arrival_time, arrival_time - passenger.initial_time)
+
+        self.passenger_trip_log.append(passenger.passenger_id, index[itinerary[0]], index[itinerary[len(arrivals)]],
+                                       passenger.initial_time, arrivals[-1], len(arrivals),
+                                       sum(passenger.wait_time_history), arrivals[-1] - passenger.initial_time)
+
+    def log_flight(self, aircraft, origin_id, destination_id, start_soc, flight_time, num_passengers):
+        end_soc = aircraft.battery.soc
+        self.vehicle_trip_log.append(self.env.now, aircraft.fleet_index, self.network.vertiport_index[origin_id],
+                                     self.network.vertiport_index[destination_id], start_soc, end_soc, flight_time,
+                                     num_passengers, (start_soc - end_soc) * aircraft.battery.capacity)
+
+    def close_logs(self):
+        """Flushes the remaining rows of the logs written to log_dir and saves the distribution history with its skipped intervals."""
+        for log in (self.passenger_trip_log, self.passenger_leg_log, self.vehicle_trip_log):
+            log.close()
+        if self.log_dir is not None:
+            self.distribution_history.save(self.log_dir)
@@ -1,93 +1,37 @@
-import pandas as pd
+"""
+Samples a passenger schedule from lambda_matrix.csv and plots the arrivals.
+
+The sampling itself is planning/demand_generation.sample_demand (vectorized, seeded, optional OD matrix);
+the schedule is written in the demand file layout with integer arrival seconds.
+
+usage (from the repository root): python -m input.demand.dummy_demand_generator --seed 0 --plot
+"""
+
+import argparse
+import os
+
 import numpy as np
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
+import pandas as pd
+
+from planning.demand_generation import sample_demand
 
-def generate_passenger_demand(lambda_df: pd.DataFrame):
+DEMAND_PATH = os.path.dirname(os.path.abspath(__file__))
+
+
+def generate_passenger_demand(lambda_df: pd.DataFrame, seed=None, od_matrix: pd.DataFrame = None):
     """
-    Generates passenger demand with precise timestamps within each time interval.
+    Generates passenger demand from the arrival rates of each vertiport and time interval.
 
     Parameters:
     - lambda_df: DataFrame containing lambda values for each vertiport at different time intervals.
+    - seed: random seed (None draws fresh entropy).
+    - od_matrix: (Optional) destination probabilities per origin, uniform over the other vertiports by default.
 
     Returns:
-    - DataFrame of passengers with exact arrival timestamps, origins, destinations, and interarrival times.
+    - DataFrame of passengers (passenger_id, arrival_time in seconds, origin, destination) sorted by arrival time.
     """
-    passenger_data = []
-
-    # Iterate over each time interval
-    for _, row in lambda_df.iterrows():
-        time_slot_str = row["time"]  # Get time in HH:MM format
-        base_time = datetime.strptime(time_slot_str, "%H:%M")  # Convert to datetime
-
-        for vertiport in lambda_df.columns[1:]:  # Skip 'time' column
-            lambda_val = row[vertiport]
-
-            # Generate number of arrivals using Poisson distribution
-            num_arrivals = np.random.poisson(lambda_val)
-
-            if num_arrivals > 0:
-                interarrival_times = np.random.exponential(1 / lambda_val, num_arrivals)
-
-                arrival_time = base_time
-                for interarrival in interarrival_times:
-                    arrival_time += timedelta(seconds=interarrival * 60)
-
-                    passenger_data.append({
-                        "arrival_time": arrival_time,
-                        "origin": vertiport,
-                        "destination": np.random.choice([v for v in lambda_df.columns[1:] if v != vertiport]),
-                        "interarrival_time": interarrival
-                    })
-
-    # Convert to DataFrame and sort by arrival time
-    passenger_df = pd.DataFrame(passenger_data)
-    passenger_df.sort_values(by="arrival_time", inplace=True)
-    passenger_df.reset_index(drop=True, inplace=True)
-
-    # Assign passenger IDs in sorted order
-    passenger_df["passenger_id"] = passenger_df.index
-
-    # Format arrival time as string
-    passenger_df["arrival_time"] = passenger_df["arrival_time"].dt.strftime("%H:%M:%S")
-
-    return passenger_df
-    #
-    # passenger_data = []
-    # passenger_id = 0
-    #
-    # # Iterate over each time interval
-    # for _, row in lambda_df.iterrows():
-    #     time_slot_str = row["time"]  # Get time in HH:MM format
-    #     base_time = datetime.strptime(time_slot_str, "%H:%M")  # Convert to datetime
-    #
-    #     for vertiport in lambda_df.columns[1:]:  # Skip 'Time' column
-    #         lambda_val = row[vertiport]  # Get lambda for this time and vertiport
-    #
-    #         # Generate number of arrivals using Poisson distribution
-    #         num_arrivals = np.random.poisson(lambda_val)
-    #
-    #         if num_arrivals > 0:
-    #             interarrival_times = np.random.exponential(1 / lambda_val, num_arrivals)  # Exponential interarrival
-    #
-    #             # Convert interarrival times to exact timestamps
-    #             arrival_time = base_time  # Start at the base time for the interval
-    #             for interarrival in interarrival_times:
-    #                 arrival_time += timedelta(seconds=interarrival * 60)  # Convert minutes to seconds
-    #
-    #                 passenger_data.append({
-    #                     "passenger_id": passenger_id,
-    #                     "arrival_time": arrival_time.strftime("%H:%M:%S"),  # Exact timestamp
-    #                     "origin": vertiport,
-    #                     "destination": np.random.choice([v for v in lambda_df.columns[1:] if v != vertiport]),
-    #                     "interarrival_time": interarrival
-    #                 })
-    #                 passenger_id += 1
-    #
-    # # Convert to DataFrame
-    # passenger_df = pd.DataFrame(passenger_data)
-    #
-    # return passenger_df
+    return sample_demand(lambda_df, od_matrix=od_matrix, seed=seed).to_frame()
+
 
 def plot_passenger_arrivals(passenger_demand_df: pd.DataFrame, origin: str = None, destination: str = None):
     """
@@ -120,13 +64,10 @@ def plot_passenger_arrivals(passenger_demand_df: pd.DataFrame, origin: str = Non
         print("No passenger data found for the selected filters.")
         return
 
-    # Convert arrival_time to datetime for proper plotting
-    filtered_data["arrival_time"] = pd.to_datetime(filtered_data["arrival_time"], format="%H:%M:%S")
+    import matplotlib.pyplot as plt
 
-    # Define time bins for 15-minute intervals
-    start_time = datetime.strptime("00:00:00", "%H:%M:%S")
-    end_time = datetime.strptime("23:59:59", "%H:%M:%S")
-    bin_edges = [start_time + timedelta(minutes=15 * i) for i in range(96)]  # 96 bins for 15-min intervals
+    # Define time bins for 15-minute intervals (arrival times in seconds)
+    bin_edges = np.arange(97) * 15 * 60
 
     # Plot histogram
     plt.figure(figsize=(12, 6))
@@ -137,8 +78,8 @@ def plot_passenger_arrivals(passenger_demand_df: pd.DataFrame, origin: str = Non
     plt.title(title)
 
     # Set x-axis ticks to only show hour marks
-    hour_ticks = [start_time + timedelta(hours=h) for h in range(24)]  # Generate datetime hour marks
-    hour_labels = [t.strftime("%H:%M") for t in hour_ticks]  # Convert to HH:MM format
+    hour_ticks = np.arange(24) * 3600  # hour marks in seconds
+    hour_labels = [f"{h:02d}:00" for h in range(24)]  # HH:MM format
 
     plt.xticks(hour_ticks, hour_labels, rotation=45)
     plt.grid(axis="y", linestyle="--", alpha=0.7)
@@ -146,24 +87,33 @@ def plot_passenger_arrivals(passenger_demand_df: pd.DataFrame, origin: str = Non
     plt.show()
 
 
-lambda_df = pd.read_csv('lambda_matrix.csv')
-
-# Generate passenger demand with exact timestamps
-passenger_demand_df = generate_passenger_demand(lambda_df)
-
-passenger_demand_df.to_csv('passenger_schedule.csv', index=False)
-
+def main():
+    parser = argparse.ArgumentParser(description="Sample a passenger schedule from a lambda matrix.")
+    parser.add_argument("--lambda-matrix", default=os.path.join(DEMAND_PATH, "lambda_matrix.csv"))
+    parser.add_argument("--od-matrix", default=None, help="destination probabilities per origin (default: uniform)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default=os.path.join(DEMAND_PATH, "passenger_schedule.csv"))
+    parser.add_argument("--plot", action="store_true", help="plot the sampled arrivals")
+    args = parser.parse_args()
 
+    lambda_df = pd.read_csv(args.lambda_matrix)
+    od_matrix = pd.read_csv(args.od_matrix, index_col=0) if args.od_matrix else None
 
-# Plot all passengers traveling from Vertiport A to any destination
-plot_passenger_arrivals(passenger_demand_df, origin="UCB")
+    # Generate passenger demand with exact arrival seconds
+    passenger_demand_df = generate_passenger_demand(lambda_df, seed=args.seed, od_matrix=od_matrix)
+    passenger_demand_df.to_csv(args.output, index=False)
+    print(f"{len(passenger_demand_df)} passengers written to {args.output}")
 
-# Plot all passengers traveling to Vertiport B from any origin
-plot_passenger_arrivals(passenger_demand_df, destination="UCD")
+    if args.plot:
+        # Plot all passengers traveling from Vertiport A to any destination
+        plot_passenger_arrivals(passenger_demand_df, origin="UCB")
 
-# Plot all passengers traveling from A to B specifically
-plot_passenger_arrivals(passenger_demand_df, origin="UCB", destination="UCD")
+        # Plot all passengers traveling to Vertiport B from any origin
+        plot_passenger_arrivals(passenger_demand_df, destination="UCD")
 
+        # Plot all passengers traveling from A to B specifically
+        plot_passenger_arrivals(passenger_demand_df, origin="UCB", destination="UCD")
 
-# plot_passenger_arrivals(passenger_demand_df, origin="A", destination="B")
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Synthetic large-network generator.
+
+Builds an N-vertiport scenario with clustered metro geography, a k-nearest-neighbor route network
+(plus a spanning tree so every vertiport is reachable), one consistent waypoint file per route,
+the initial fleet, a 15-minute arrival-rate (lambda) matrix, a gravity-model OD probability matrix
+and a passenger schedule sampled from them (planning/demand_generation.sample_demand, integer arrival
+seconds). The files use the same formats as the shipped scenario, so the output directory can be
+loaded with Scenario.load(network_path=..., waypoint_path=...).
+
+usage (from the repository root): python -m input.network.synthetic_network --vertiports 100 --output output/synthetic_networks/n100
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from planning.demand_generation import DemandStreams, sample_demand
+
+EARTH_RADIUS_KM = 6371.0
+SLOT_LENGTH = 900  # seconds per lambda matrix row
+DEFAULT_CENTER = (37.80, -122.27)  # (lat, lon) of the metro area
+DEFAULT_VEHICLE = "joby_s4_2"
+
+
+def haversine_matrix(lat, lon):
+    """Great-circle distances in km between every pair of points."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def generate_vertiports(num_vertiports, rng, center=DEFAULT_CENTER, area_per_vertiport=40.0, min_spacing=1.5):
+    """
+    Vertiport locations clustered around metro hubs.
+
+    :param area_per_vertiport: km² of metro area per vertiport (sets the service radius)
+    :param min_spacing: minimum distance in km between two vertiports
+    :return: DataFrame (id, lat, lon, alt, name)
+    """
+    radius = np.sqrt(num_vertiports * area_per_vertiport / np.pi)
+    num_hubs = max(1, num_vertiports // 20)
+
+    def sample_disc(size, scale):
+        r = scale * np.sqrt(rng.random(size))
+        theta = 2 * np.pi * rng.random(size)
+        return r * np.cos(theta), r * np.sin(theta)
+
+    hub_x, hub_y = sample_disc(num_hubs, radius)
+    hub_spread = radius / (2 * np.sqrt(num_hubs))
+
+    def sample_locations(size):
+        hub = rng.integers(num_hubs, size=size)
+        x = hub_x[hub] + rng.normal(0.0, hub_spread, size)
+        y = hub_y[hub] + rng.normal(0.0, hub_spread, size)
+        # a fifth of the vertiports are scattered over the whole area
+        scattered = rng.random(size) < 0.2
+        x[scattered], y[scattered] = sample_disc(scattered.sum(), radius)
+        return x, y
+
+    x, y = sample_locations(num_vertiports)
+    for _ in range(100):  # resample vertiports closer than the minimum spacing
+        distance = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+        np.fill_diagonal(distance, np.inf)
+        too_close = np.flatnonzero(np.triu(distance < min_spacing).any(axis=1))
+        if len(too_close) == 0:
+            break
+        x[too_close], y[too_close] = sample_locations(len(too_close))
+
+    lat = center[0] + np.degrees(y / EARTH_RADIUS_KM)
+    lon = center[1] + np.degrees(x / (EARTH_RADIUS_KM * np.cos(np.radians(center[0]))))
+    ids = [f"V{i:04d}" for i in range(num_vertiports)]
+
+    return pd.DataFrame({
+        "id": ids,
+        "lat": lat.round(6),
+        "lon": lon.round(6),
+        "alt": rng.integers(0, 100, num_vertiports),
+        "name": [f"Synthetic Vertiport {i}" for i in range(num_vertiports)],
+    })
+
+
+def spanning_tree(distance):
+    """Edges of the minimum spanning tree of a dense distance matrix (Prim)."""
+    n = len(distance)
+    in_tree = np.zeros(n, dtype=bool)
+    in_tree[0] = True
+    best = distance[0].copy()
+    parent = np.zeros(n, dtype=int)
+    edges = []
+    for _ in range(n - 1):
+        candidate = np.where(in_tree, np.inf, best)
+        node = int(np.argmin(candidate))
+        edges.append((int(parent[node]), node))
+        in_tree[node] = True
+        closer = distance[node] < best
+        best[closer] = distance[node][closer]
+        parent[closer] = node
+    return edges
+
+
+def generate_edges(nodes_df, distance, rng, k=4, capacity=5):
+    """
+    Bidirectional routes to the k nearest neighbors of every vertiport, plus a spanning tree.
+
+    :return: DataFrame (origin, destination, waypoints, capacity, wind_speed)
+    """
+    n = len(nodes_df)
+    pairs = set()
+    if n > 1:
+        neighbors = np.argsort(distance, axis=1)[:, 1:k + 1]
+        for i in range(n):
+            for j in neighbors[i]:
+                pairs.add((min(i, int(j)), max(i, int(j))))
+        pairs.update((min(i, j), max(i, j)) for i, j in spanning_tree(distance))
+
+    ids = nodes_df["id"].to_numpy()
+    rows = []
+    for i, j in sorted(pairs):
+        for origin, destination in ((ids[i], ids[j]), (ids[j], ids[i])):
+            rows.append({
+                "origin": origin,
+                "destination": destination,
+                "waypoints": f"wp_{origin}_{destination}",
+                "capacity": capacity,
+                "wind_speed": round(float(rng.uniform(3.0, 7.0)), 1),
+            })
+    return pd.DataFrame(rows, columns=["origin", "destination", "waypoints", "capacity", "wind_speed"])
+
+
+def route_waypoints(origin, destination, distance_km):
+    """
+    Waypoints of a direct route: idle and hover climb at the origin, climb to a cruise altitude scaled with
+    the route length, cruise, descent and hover descent at the destination (same layout as the shipped files).
+    """
+    o_id, o_lat, o_lon, o_alt = origin
+    d_id, d_lat, d_lon, d_alt = destination
+    cruise_alt = max(o_alt, d_alt) + float(np.clip(distance_km * 50, 150, 450))
+
+    def point(fraction):
+        return o_lat + fraction * (d_lat - o_lat), o_lon + fraction * (d_lon - o_lon)
+
+    legs = [
+        (0.0, o_alt, "idle"),
+        (0.0, o_alt + 30, "hover_climb"),
+        (0.05, o_alt + 120, "climb"),
+        (0.25, cruise_alt, "climb"),
+        (0.75, cruise_alt, "cruise"),
+        (0.95, d_alt + 150, "descent"),
+        (1.0, d_alt + 30, "descent"),
+        (1.0, d_alt, "hover_descent"),
+    ]
+    rows = []
+    for i, (fraction, altitude, flight_mode) in enumerate(legs):
+        lat, lon = point(fraction)
+        rows.append({
+            "origin": o_id,
+            "destination": d_id,
+            "latitude": round(lat, 6),
+            "longitude": round(lon, 6),
+            "altitude": altitude,
+            "waypoint_id": f"{o_id}_{d_id}_wp{i}",
+            "flight_mode": flight_mode,
+        })
+    return pd.DataFrame(rows)
+
+
+def daily_profile():
+    """Relative demand of each 15-minute slot: morning and evening peaks on a base level."""
+    hours = (np.arange(86400 // SLOT_LENGTH) + 0.5) * SLOT_LENGTH / 3600
+    profile = 0.2 + np.exp(-0.5 * ((hours - 8.0) / 1.2) ** 2) + 0.8 * np.exp(-0.5 * ((hours - 17.5) / 1.5) ** 2)
+    profile[(hours < 5) | (hours > 23)] = 0.0
+    return profile / profile.sum()
+
+
+def generate_demand(nodes_df, distance, rng, daily_trips_per_vertiport=100, decay=15.0):
+    """
+    Arrival rates and destinations of a gravity model with lognormal vertiport attractiveness.
+
+    :param decay: distance decay of the destination choice in km
+    :return: (lambda DataFrame (time, vertiport...) of expected arrivals per slot, OD probability DataFrame)
+    """
+    n = len(nodes_df)
+    ids = nodes_df["id"].tolist()
+    weights = rng.lognormal(0.0, 0.5, n)
+
+    trips = daily_trips_per_vertiport * weights / weights.mean()
+    rates = np.outer(daily_profile(), trips)
+    times = [f"{(slot * SLOT_LENGTH) // 3600}:{(slot * SLOT_LENGTH) % 3600 // 60:02d}" for slot in range(len(rates))]
+    lambda_df = pd.DataFrame(rates.round(4), columns=ids)
+    lambda_df.insert(0, "time", times)
+
+    attraction = weights[None, :] * np.exp(-distance / decay)
+    np.fill_diagonal(attraction, 0.0)
+    totals = attraction.sum(axis=1, keepdims=True)
+    od = np.divide(attraction, totals, out=np.zeros_like(attraction), where=totals > 0)
+    od_df = pd.DataFrame(od, index=ids, columns=ids)
+
+    return lambda_df, od_df
+
+
+def generate_network(num_vertiports, output_dir, k=4, aircraft_per_vertiport=4, pads=2, stands=None,
+                     daily_trips_per_vertiport=100, vehicle=DEFAULT_VEHICLE, seed=0):
+    """
+    Writes a complete synthetic scenario to output_dir:
+    nodes.csv, edges.csv, waypoints/<route>.csv, lambda_matrix.csv, od_matrix.csv, passenger_schedule.csv
+
+    :param k: number of nearest neighbors connected to every vertiport
+    :param aircraft_per_vertiport: initial fleet of every vertiport
+    :param pads: pads per vertiport (None = unconstrained)
+    :param stands: stands per vertiport (None = unconstrained)
+    :param daily_trips_per_vertiport: mean number of passengers departing a vertiport per day
+    :param seed: random seed of the geography and of the demand substreams (DemandStreams)
+    :return: dict of the generated paths
+    """
+    rng = np.random.default_rng(seed)
+    waypoint_dir = os.path.join(output_dir, "waypoints")
+    os.makedirs(waypoint_dir, exist_ok=True)
+
+    nodes_df = generate_vertiports(num_vertiports, rng)
+    distance = haversine_matrix(nodes_df["lat"].to_numpy(), nodes_df["lon"].to_numpy())
+
+    nodes_df["init_ac_num"] = aircraft_per_vertiport
+    nodes_df["ac_composition"] = json.dumps({vehicle: aircraft_per_vertiport})
+    nodes_df["charger"] = json.dumps({"charger_max_charge_rate": 350, "charger_efficiency": 0.9})
+    nodes_df["pads"] = pads
+    nodes_df["stands"] = stands
+
+    edges_df = generate_edges(nodes_df, distance, rng, k=k)
+    index = {vid: i for i, vid in enumerate(nodes_df["id"])}
+    locations = list(nodes_df[["id", "lat", "lon", "alt"]].itertuples(index=False, name=None))
+    for edge in edges_df.itertuples(index=False):
+        i, j = index[edge.origin], index[edge.destination]
+        route_waypoints(locations[i], locations[j], distance[i, j]).to_csv(
+            os.path.join(waypoint_dir, edge.waypoints + ".csv"), index=False)
+
+    lambda_df, od_df = generate_demand(nodes_df, distance, rng, daily_trips_per_vertiport=daily_trips_per_vertiport)
+    passenger_df = sample_demand(lambda_df, od_matrix=od_df, streams=DemandStreams(seed)).to_frame()
+
+    paths = {
+        "network_path": output_dir,
+        "waypoint_path": waypoint_dir,
+        "demand": os.path.join(output_dir, "passenger_schedule.csv"),
+    }
+    nodes_df.to_csv(os.path.join(output_dir, "nodes.csv"), index=False)
+    edges_df.to_csv(os.path.join(output_dir, "edges.csv"), index=False)
+    lambda_df.to_csv(os.path.join(output_dir, "lambda_matrix.csv"), index=False)
+    od_df.to_csv(os.path.join(output_dir, "od_matrix.csv"))
+    passenger_df.to_csv(paths["demand"], index=False)
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic N-vertiport scenario.")
+    parser.add_argument("--vertiports", type=int, default=10)
+    parser.add_argument("--output", default=None, help="output directory (default: output/synthetic_networks/n<N>)")
+    parser.add_argument("--k", type=int, default=4, help="nearest neighbors connected to every vertiport")
+    parser.add_argument("--aircraft", type=int, default=4, help="initial aircraft per vertiport")
+    parser.add_argument("--pads", type=int, default=2)
+    parser.add_argument("--stands", type=int, default=None)
+    parser.add_argument("--trips", type=float, default=100, help="mean daily passengers per vertiport")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = args.output or os.path.join(os.curdir, "output", "synthetic_networks", f"n{args.vertiports}")
+    paths = generate_network(args.vertiports, output_dir, k=args.k, aircraft_per_vertiport=args.aircraft,
+                             pads=args.pads, stands=args.stands, daily_trips_per_vertiport=args.trips, seed=args.seed)
+    print(f"synthetic network written to {paths['network_path']}")
+
+
+if __name__ == "__main__":
+    main()
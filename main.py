@@ -4,6 +4,13 @@ from models.network import UAMNetwork
 from models.charger import ChargerModel
 from airsim import UAMSimulation
 from planning.mission_profile import create_mission_profile
+from utils.scenario import Scenario
+from utils.demand_utils import DemandTable
+from planning.network_events import NetworkEventManager
+from planning.demand_generation import PoissonArrivalSource
+from utils.pacing import WallClockPacer
+from utils.profiling import SimulationProfiler
+from utils.memory_probe import MemoryProbe
 import os
 import subprocess
 import asyncio
@@ -11,18 +18,22 @@ from visualization.python_server.server import WebSocketServer
 import webbrowser
 import time
 
-REALTIME_FACTOR = 0.1 # seconds per sim second (adjust for desired speed)
+PLAYBACK_SPEED = 10 # simulated seconds per wall-clock second in visual mode (clients can change it while running)
 SIMULATION_START_TIME = 6*3600 #0.1*3600 # start simulation at 5am
 SIMULATION_END_TIME = 22*3600
 RUN_MODE = "visual" # "fast" or "visual"
 SIMULATION_UPDATE_INTERVAL = 120
+PROFILE_SIMULATION = False # time the SimPy event loop per process type and write the profile next to the logs
+MEMORY_MILESTONES = None # simulated times of memory snapshots (tracemalloc, slow), e.g. [8*3600, 14*3600, 22*3600]
+NETWORK_EVENTS_FILE = None # schedule of closures and capacity changes, e.g. "input/network/network_events_example.csv"
+LAMBDA_MATRIX_FILE = None # generate passengers while running from these arrival rates instead of replaying the demand file, e.g. "input/demand/lambda_matrix.csv"
+DEMAND_SEED = 0 # seed of the generated passengers
 
 """
 Initialize simulation input
 """
 if RUN_MODE == "visual":
     SIMULATION_UPDATE_INTERVAL = 10
-    REALTIME_FACTOR = 0.1
 
 base_dir = os.curdir
 
@@ -32,7 +43,10 @@ model_specification_path = os.path.join(base_dir, 'input/specifications')
 
 nodes_df = pd.read_csv(os.path.join(network_path,"nodes.csv"))
 edges_df = pd.read_csv(os.path.join(network_path,"edges.csv"))
-passenger_df = pd.read_csv(os.path.join(demand_path,"Simulated_Passenger_Trips.csv"))
+if LAMBDA_MATRIX_FILE is None:
+    demand = DemandTable.read_csv(os.path.join(demand_path,"Simulated_Passenger_Trips.csv")) # sorted numpy columns
+else:
+    demand = [] # arrivals are generated by PoissonArrivalSource
 # Vehicle Input
 os.path.join(model_specification_path, 'evtol_spec.csv')
 
@@ -42,6 +56,7 @@ import datetime
 
 log_out_path = os.path.join(base_dir, 'output','logs')
 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+run_output_path = os.path.join(base_dir, 'output', f"run_{timestamp}") # columnar simulation logs (utils/columnar_log.py)
 
 logging.basicConfig(
     level=logging.INFO,
@@ -63,8 +78,8 @@ client_dir = os.path.join(visualization_path, 'web_client')
 
 
 # Start WebSocket Server in background
-async def run_simulation(simulation, env):
-    """Run SimPy simulation asynchronously with artificial delay."""
+async def run_simulation(simulation, env, pacer=None):
+    """Run SimPy simulation asynchronously, paced by the wall clock in visual mode."""
     print('starting simulation...')
     logger.info("starting simulation...")
     await asyncio.sleep(2)
@@ -74,20 +89,26 @@ async def run_simulation(simulation, env):
     print(f"Fast-forwarding to t = {SIMULATION_START_TIME}")
     env.run(until=SIMULATION_START_TIME)
 
-    while env.now <= simulation.end_time:
-        # Step simulation by one event
-        event = env.step()
-        if event == False:
-            break
-
-        if RUN_MODE == "visual":
-            print(f"Sim time: {env.now}")
-            await asyncio.sleep(REALTIME_FACTOR)
+    if pacer is not None:
+        # chunks of env.run sized by the elapsed wall time and the playback speed
+        await pacer.run(until=simulation.end_time + 1)
+    else:
+        env.run(until=simulation.end_time + 1)
 
 async def main():
+    # Initialize SimPy environment
+    env = simpy.Environment()
+
+    # memory probe first so the allocations of the mission profile and network are traced
+    memory_probe = None
+    if MEMORY_MILESTONES:
+        memory_probe = MemoryProbe(env, MEMORY_MILESTONES)
+
     # Your usual setup
     # Create mission profile
-    mission_profile = create_mission_profile(nodes_df, edges_df, save_result=True)
+    # read network, waypoints and vehicle specifications once
+    scenario = Scenario.load(nodes_df, edges_df)
+    mission_profile = create_mission_profile(nodes_df, edges_df, save_result=True, scenario=scenario)
 
     # Create tabular model for charging
     charger = ChargerModel(400, 0.9, 160)
@@ -95,28 +116,42 @@ async def main():
     """
     Initialize network and simulation environment
     """
-    # Initialize SimPy environment
-    env = simpy.Environment()
-    network = UAMNetwork(env, nodes_df, edges_df, charger, mission_profile)
+    network = UAMNetwork(env, nodes_df, edges_df, charger, mission_profile, scenario=scenario)
     print("network ready")
 
+    network_events = None
+    if NETWORK_EVENTS_FILE:
+        network_events = NetworkEventManager.from_file(env, network, NETWORK_EVENTS_FILE)
+
     # === Start WebSocket server ===
     # === Initialize WebSocket server only for visual mode ===
     ws_server = None
+    pacer = None
     if RUN_MODE == "visual":
-        ws_server = WebSocketServer(simulation=None)
+        pacer = WallClockPacer(env, speed=PLAYBACK_SPEED)
+        ws_server = WebSocketServer(simulation=None, pacer=pacer)  # clients send pause/resume/speed commands
 
 
     # === Initialize Simulation ===
     simulation = UAMSimulation(
-        env, network, passenger_df, mission_profile,
+        env, network, demand, mission_profile,
         update_interval=SIMULATION_UPDATE_INTERVAL,
         start_time= SIMULATION_START_TIME,
         end_time=SIMULATION_END_TIME,
-        run_mode=RUN_MODE, websocket_server=ws_server
+        run_mode=RUN_MODE, websocket_server=ws_server,
+        network_events=network_events,
+        arrival_sources=[PoissonArrivalSource(pd.read_csv(LAMBDA_MATRIX_FILE), seed=DEMAND_SEED)] if LAMBDA_MATRIX_FILE else None,
+        log_dir=run_output_path # trip and distribution logs are flushed here while running
     )
     print("simulation ready")
 
+    profiler = None
+    if PROFILE_SIMULATION:
+        profiler = SimulationProfiler(env)
+        profiler.attach(simulation)
+    if memory_probe is not None:
+        memory_probe.attach(simulation)
+
     if RUN_MODE == "visual":
         ws_server.simulation = simulation  # Link simulation to WebSocket server
 
@@ -133,7 +168,7 @@ async def main():
         webbrowser.open("http://localhost:8080")
 
         # === Run simulation ===
-        simulation_task = asyncio.create_task(run_simulation(simulation, env))
+        simulation_task = asyncio.create_task(run_simulation(simulation, env, pacer))
 
         await simulation_task
 
@@ -152,14 +187,30 @@ async def main():
     else:
         raise ValueError("check RUN_MODE parameter")
 
-    # save distribution log
-    df_dist = pd.json_normalize(simulation.distribution_history)
-    df_passenger_trip_data = pd.json_normalize(simulation.passenger_trip_log)
-    df_veh = pd.DataFrame(simulation.vehicle_trip_log)
+    # flush the rest of the distribution (with its skipped idle intervals), passenger trip/leg and vehicle trip logs (Parquet or .npz chunks)
+    simulation.close_logs()
+    print(f"simulation logs written to {run_output_path}")
+
+    if profiler is not None:
+        profiler.detach()
+        profiler.write(run_output_path)
+        print(profiler.summary())
+
+    if memory_probe is not None:
+        memory_probe.stop()
+        memory_probe.write(run_output_path)
+
+    # airspace queue statistics
+    df_airspace = pd.DataFrame([airspace.get_statistics() for airspace in network.airspaces.values()])
+    df_airspace.to_csv(f"output/airspace_statistics_{timestamp}.csv", index=False)
+
+    # vertiport ground (pad/stand) statistics
+    df_vertiport = pd.DataFrame([vertiport.get_ground_statistics() for vertiport in network.vertiports.values()])
+    df_vertiport.to_csv(f"output/vertiport_statistics_{timestamp}.csv", index=False)
 
-    df_dist.to_csv(f"output/aircraft_distribution_{timestamp}.csv", index=False)
-    df_passenger_trip_data.to_csv(f"output/passenger_trip_log_{timestamp}.csv", index=False)
-    df_veh.to_csv(f"output/vehicle_trip_log_{timestamp}.csv", index=False)
+    if network_events is not None:
+        pd.DataFrame(network_events.event_log).to_csv(f"output/network_events_{timestamp}.csv", index=False)
+        pd.DataFrame(simulation.rejected_passenger_log).to_csv(f"output/rejected_passengers_{timestamp}.csv", index=False)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,17 @@
 from models.battery import Battery
-import utils.flight_utils as fl
 import logging
+import simpy
 
-0
-UPDATE_INTERVAL = 10 # for visualization update interval
+logger = logging.getLogger(__name__)
+PAD_DEPARTURE_PHASES = ("idle", "hover_climb") # the departure pad is released once the aircraft transitions
 STATIC_SOC_FOR_FLIGHT = 0.9 # static charge policy
 
 class Aircraft:
     def __init__(self, env, vehicle, aircraft_id, network, origin_vertiport, specification):
         self.env = env
         self.network = network
+        self.fleet = network.fleet
+        self.fleet_index = self.fleet.register(aircraft_id, vehicle)
         self.vehicle = vehicle
         self.origin_vertiport = origin_vertiport
         self.destination_vertiport = None
@@ -24,19 +26,118 @@ class Aircraft:
         self.flight_plan = None
         self.current_waypoint = None
         self.battery = Battery(battery_capacity=160)  # 100% SoC
+        self.fleet.set_soc(self.fleet_index, self.battery.soc)
         self.tom = self.aircraft_params['mass'] #empty mass
         self.disk_area = self.aircraft_params['mtom']/self.aircraft_params['disk_load']
         self.min_soc = 20  # Minimum SoC reserve for landing sequence
         self.charging_start_time = 0
 
+        # current flight plan segment - the position is interpolated on demand from env.now
+        self.segment_start_time = None
+        self.segment_start_position = None
+        self.segment_end_position = None
+        self.segment_duration = 0.0
+        self.segment_remaining_time = 0.0 # flight time of the segments after the current one
+        self.segment_remaining_energy = 0.0 # energy budget of the current and the following segments
+
         self.position = self.origin_vertiport.location
         self.speed_horizontal = 0  # m/s
         self.speed_vertical = 0 # m/s
         self.travel_time = 0
         self.heading = 0
+        self.expected_arrival_time = None # sim time of arrival at the destination while flying
+        self.expected_arrival_soc = None
+        self.flight_process = None # SimPy process of the current flight
+        self.departure_cancellable = False # True while holding for the departure time or a route slot
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self._state = state
+        self.fleet.set_state(self.fleet_index, state)
+
+    @property
+    def position(self):
+        return self.position_at(self.env.now)
+
+    @position.setter
+    def position(self, position):
+        """Places the aircraft at a fixed position (ends the current segment)."""
+        self._position = position
+        self.segment_start_time = None
+        self.fleet.set_position(self.fleet_index, position)
+
+    def position_at(self, time):
+        """
+        Position (lat, lon, alt) at the given sim time, interpolated along the current flight plan segment.
+        Segments are flown at constant horizontal and vertical speed, so the interpolation is linear in time.
+        """
+        if self.segment_start_time is None:
+            return self._position
+
+        if self.segment_duration > 0:
+            ratio = min(max((time - self.segment_start_time) / self.segment_duration, 0.0), 1.0)
+        else:
+            ratio = 1.0
+
+        lat1, lon1, alt1 = self.segment_start_position
+        lat2, lon2, alt2 = self.segment_end_position
+        return (lat1 + ratio * (lat2 - lat1),
+                lon1 + ratio * (lon2 - lon1),
+                alt1 + ratio * (alt2 - alt1))
+
+    def start_segment(self, end_position, duration):
+        """Starts flying the next flight plan segment from the current position."""
+        start_position = self.position
+        self.segment_start_time = self.env.now
+        self.segment_start_position = start_position
+        self.segment_end_position = end_position
+        self.segment_duration = duration
+        self.fleet.set_segment(self.fleet_index, self.env.now, start_position, end_position, duration,
+                               self.speed_horizontal, self.speed_vertical, self.heading)
+
+    def fly(self, destination, run_mode, priority=0, reservation=None, deconfliction=None):
+        """
+        Triggers flight to a new vertiport.
+
+        :param priority: airspace queue priority, lower value departs first
+        :param reservation: strategic deconfliction Reservation - the aircraft holds until its departure time
+        :param deconfliction: StrategicDeconfliction that booked the reservation (used to re-book late departures)
+        """
+        self.destination_vertiport = destination
+        self.flying_route = self.network.airspaces[self.origin_vertiport.vertiport_id, self.destination_vertiport.vertiport_id]
+
+        # until the pad is requested the departure can be cancelled (network events interrupt the process)
+        self.departure_cancellable = True
+        try:
+            if reservation is not None and reservation.departure_time > self.env.now:
+                yield self.env.timeout(reservation.departure_time - self.env.now)
+
+            # hold at the vertiport (reserved) until the route releases a slot
+            if not self.flying_route.can_accommodate():
+                logger.info(f"[{self.env.now}]: Airspace {(self.origin_vertiport.vertiport_id, destination.vertiport_id)} full. {self.aircraft_id} queued for departure")
+            yield from self.flying_route.request_slot(self, priority)
+
+            # the slot came after the reserved departure time - book the next conflict-free trajectory
+            if reservation is not None and self.env.now > reservation.departure_time:
+                reservation = deconfliction.reschedule(reservation, self, self.origin_vertiport.vertiport_id,
+                                                       destination.vertiport_id, self.env.now)
+                if reservation.departure_time > self.env.now:
+                    yield self.env.timeout(reservation.departure_time - self.env.now)
 
-    def fly(self, destination, run_mode):
-        """Triggers flight to a new vertiport."""
+        except simpy.Interrupt as interrupt:
+            self.cancel_departure(reservation, deconfliction, interrupt.cause)
+            return
+
+        self.departure_cancellable = False
+
+        # taxi from the stand to a pad and spin up
+        pad_request = yield from self.origin_vertiport.request_departure_pad(self)
+        if pad_request is not None:
+            yield self.env.timeout(self.aircraft_params['time_rotor_spin_up'])
 
         # logging
         start_time = self.env.now
@@ -48,34 +149,37 @@ class Aircraft:
         # departure logic
         self.state = "flying"
         self.flight_ready = False
-        self.destination_vertiport = destination
         self.position = self.origin_vertiport.location
         if (self.origin_vertiport.vertiport_id == 'UCD' and self.destination_vertiport.vertiport_id == 'NASA'):
             print('debug')
-        self.flying_route = self.network.airspaces[self.origin_vertiport.vertiport_id, self.destination_vertiport.vertiport_id]
         self.flight_plan = self.flying_route.mission_profile[self.vehicle] # flight plan based on waypoints - use mission profiling in the future
         self.origin_vertiport.remove_aircraft(self)  # Aircraft leaves vertiport
         self.tom = self.tom + len(self.current_passengers)*100 # calculate mass based on current passengers
+        self.expected_arrival_time = self.env.now + self.flight_plan['time'].sum()
+        self.expected_arrival_soc = self.battery.soc - self.flight_plan['energy_budget'].sum()/self.battery.capacity
 
-        flight_time = 0.0
+        self.segment_remaining_time = float(self.flight_plan['time'].sum())
+        self.segment_remaining_energy = float(self.flight_plan['energy_budget'].sum())
 
         # fly in sequence
         if run_mode == "visual":
             print(
                 f"{self.env.now}: {self.aircraft_id} taking off from {self.origin_vertiport.vertiport_id} to {destination.vertiport_id}")
 
-
         # enter airspace
-        enter_flag = self.flying_route.enter_airspace(self)
-        if not enter_flag:
-            yield self.env.timeout(self.flying_route.compute_time_until_availability())
-            enter_flag = self.flying_route.enter_airspace(self)
+        self.flying_route.enter_airspace(self)
 
-            if not enter_flag:
-                raise Exception(f"{self.env.now}: {self.aircraft_id} unable to enter airspace - exception flag")
+        landing_cleared = False
+        for _, row in self.flight_plan.iterrows():
+            if pad_request is not None and not landing_cleared and row['phase'] not in PAD_DEPARTURE_PHASES:
+                self.origin_vertiport.release_pad(pad_request)
+                pad_request = None
 
+            if row['phase'] == 'hover_descent' and not landing_cleared:
+                # approach holding until the destination has a free stand and pad
+                pad_request = yield from destination.request_landing(self)
+                landing_cleared = True
 
-        for _, row in self.flight_plan.iterrows():
             next_position = (row['latitude'], row['longitude'], row['altitude'])
             self.current_waypoint = row['waypoint_id']
             self.flight_mode = row['phase']
@@ -84,33 +188,30 @@ class Aircraft:
             self.speed_horizontal = row['v_horizontal']
             self.heading = row['heading']
 
-            average_power = row['average_power']*1e-3
             energy_spent = row['energy_budget']
 
+            # one event per segment in both run modes, intermediate positions are interpolated on demand
+            self.segment_remaining_time -= self.travel_time
+            self.start_segment(next_position, self.travel_time)
             if run_mode == "visual":
                 print(
-                    f"{self.env.now}: {self.aircraft_id} in transit at flight time: {flight_time}, position: {self.position}, phase: {self.flight_mode}, remaining soc: {self.battery.soc}")
-                steps = self.travel_time // UPDATE_INTERVAL
-
-                # create trajectory
-                for _ in range(int(steps)):
-                    flight_time += UPDATE_INTERVAL
-                    yield self.env.timeout(UPDATE_INTERVAL)
-                    self.position = fl.update_position(self.position, next_position,
-                                                       self.speed_horizontal, self.speed_vertical, UPDATE_INTERVAL)
-                    print(
-                        f"{self.env.now}: {self.aircraft_id} in transit at flight time: {flight_time}, position: {self.position}, phase: {self.flight_mode}")
-
-                remaining_time = round(self.travel_time % UPDATE_INTERVAL)
-                flight_time += remaining_time
-                yield self.env.timeout(remaining_time)
-                self.position = next_position
-
-            else:
-                yield self.env.timeout(self.travel_time)
-                flight_time += self.travel_time
+                    f"{self.env.now}: {self.aircraft_id} in transit, position: {self.position}, phase: {self.flight_mode}, remaining soc: {self.battery.soc}")
+
+            yield self.env.timeout(self.travel_time)
+            self.position = next_position
 
             self.battery.update_soc_energy(energy_spent)
+            self.fleet.set_soc(self.fleet_index, self.battery.soc)
+            self.segment_remaining_energy -= energy_spent
+
+        if not landing_cleared:
+            pad_request = yield from destination.request_landing(self)
+
+        # spin down and taxi from the pad to the stand
+        if pad_request is not None:
+            yield self.env.timeout(self.aircraft_params['time_rotor_spin_down'])
+            destination.release_pad(pad_request)
+        destination.mark_on_stand(self)
 
         # Arrival logic
         if run_mode == "visual":
@@ -130,15 +231,14 @@ class Aircraft:
         destination.park_aircraft(self)  # park ac at destination
         self.origin_vertiport = destination
         self.destination_vertiport = None
+        self.expected_arrival_time = None
+        self.expected_arrival_soc = None
 
         # Remove passengers and mark them as served
         current_passengers = self.current_passengers.copy()
         for passenger in current_passengers:
             passenger.unboard_aircraft()
-            if hasattr(passenger, "current_leg_complete"):
-                passenger.current_leg_complete.succeed()
-            else:
-                logger.debug(f"[{self.env.now}] Aircraft id ({self.aircraft_id}) does not unboard passengers correctly : passengers {passenger.passenger_id}")
+            passenger.complete_leg()  # next leg or trip logged
 
         if self.current_passengers:
             logger.debug(f"[{self.env.now}] Aircraft id ({self.aircraft_id}) does not unboard passengers correctly : current passenger number {len(self.current_passengers)}")
@@ -147,28 +247,33 @@ class Aircraft:
         # self.network.log_served_passengers(served_passengers)
 
         # logging
-        end_soc = self.battery.soc
-        flight_time = self.env.now - start_time
-        energy_consumed = (start_soc - end_soc) * self.battery.capacity
-
-        trip_record = {
-            "time": self.env.now,
-            "aircraft_id": self.aircraft_id,
-            "origin": origin_id,
-            "destination": dest_id,
-            "start_soc": start_soc,
-            "end_soc": end_soc,
-            "flight_time": flight_time,
-            "num_passengers": num_passengers,
-            "energy_consumed": energy_consumed
-        }
-        self.network.simulation.vehicle_trip_log.append(trip_record)
+        self.network.simulation.log_flight(self, origin_id, dest_id, start_soc, self.env.now - start_time, num_passengers)
 
         # start charging
         self.state = "charge"
         self.charging_start_time = self.env.now
 
 
+    def cancel_departure(self, reservation, deconfliction, cause):
+        """Hands back the route slot and trajectory reservation and returns the passengers to the departure queue."""
+        logger.info(f"[{self.env.now}]: {self.aircraft_id} departure {self.origin_vertiport.vertiport_id} → {self.destination_vertiport.vertiport_id} cancelled: {cause}")
+        self.departure_cancellable = False
+
+        self.flying_route.exit_airspace(self)  # releases a slot granted before the cancellation
+        if reservation is not None:
+            deconfliction.release(reservation)
+
+        for passenger in self.current_passengers.copy():
+            passenger.cancel_boarding()
+
+        self.flying_route = None
+        self.destination_vertiport = None
+
+        # back to the charger - update_soc restores flight readiness
+        self.state = "charge"
+        self.charging_start_time = self.env.now
+        self.update_soc()
+
     def update_soc(self):
         charge_time = self.env.now - self.charging_start_time
 
@@ -181,6 +286,7 @@ class Aircraft:
         )
 
         self.charging_start_time = self.env.now
+        self.fleet.set_soc(self.fleet_index, self.battery.soc)
 
         if self.battery.soc >= 0.99:
             self.state = "idle"
@@ -195,11 +301,11 @@ class Aircraft:
             raise Warning("get_expected_arrival_time queried when not flying")
 
         else:
-            row_ind = self.flight_plan.index[self.flight_plan['waypoint_id']==self.current_waypoint][0]
-            remaining_flight_plan = self.flight_plan.iloc[row_ind:,:]
-            remaining_time = remaining_flight_plan['time'].sum()
-            energy_expectation = remaining_flight_plan['energy_budget'].sum()
-            soc_expectation = self.battery.soc - (energy_expectation/self.battery.capacity)
+            # remaining part of the current segment plus the segments after it
+            remaining_time = self.segment_remaining_time
+            if self.segment_start_time is not None:
+                remaining_time += max(self.segment_start_time + self.segment_duration - self.env.now, 0.0)
+            soc_expectation = self.battery.soc - (self.segment_remaining_energy/self.battery.capacity)
 
             return remaining_time, soc_expectation
 
@@ -1,33 +1,124 @@
+import simpy
+
+
+class SlotResource(simpy.PriorityResource):
+    """PriorityResource whose capacity can change during the simulation (network capacity events)."""
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity):
+        self._capacity = capacity
+        # a larger capacity grants queued requests right away, a smaller one only blocks new requests
+        while self.put_queue and len(self.users) < self._capacity:
+            self._trigger_put(None)
+
+
 class Airspace:
-    def __init__(self, origin, destination, capacity, waypoints, mission_profile):
+    def __init__(self, env, origin, destination, capacity, waypoints, mission_profile):
+        self.env = env
         self.origin = origin
         self.destination = destination
         self.capacity = capacity  # Max number of aircraft in airspace
         self.current_aircrafts = []  # Aircraft currently flying in this airspace
         self.waypoints = waypoints
         self.mission_profile = mission_profile
+        self.closed = False  # closed routes are removed from the network graph, airborne aircraft finish their flight
+
+        # route capacity as a queued resource - lower priority value departs first, FIFO within a priority
+        self.slots = SlotResource(env, capacity=int(capacity))
+        self.slot_requests = {}  # aircraft_id → granted slot request
+
+        # queue statistics
+        self.num_requests = 0
+        self.num_delayed = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.max_queue_length = 0
+        self.queue_length_area = 0.0  # time integral of the queue length
+        self.queue_last_update = env.now
 
     def can_accommodate(self):
-        """Returns True if airspace can take another aircraft."""
-        return len(self.current_aircrafts) < self.capacity
+        """Returns True if a slot request would be granted immediately."""
+        return self.slots.count < self.slots.capacity and not self.slots.queue
+
+    def request_slot(self, aircraft, priority=0):
+        """
+        Queues the aircraft for a slot on the route. Process generator - use with `yield from`.
+
+        :param aircraft: Aircraft requesting the slot
+        :param priority: lower value is served first (passenger flights before repositioning)
+        """
+        request_time = self.env.now
+        self.update_queue_statistics()
+        request = self.slots.request(priority=priority)
+        self.num_requests += 1
+        self.max_queue_length = max(self.max_queue_length, len(self.slots.queue))
+
+        try:
+            yield request
+        except simpy.Interrupt:
+            # departure cancelled while queued - withdraw the request (or hand back a slot granted at the same time)
+            if request.triggered:
+                self.slots.release(request)
+            else:
+                request.cancel()
+            raise
+
+        self.update_queue_statistics()
+        wait_time = self.env.now - request_time
+        if wait_time > 0:
+            self.num_delayed += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        self.slot_requests[aircraft.aircraft_id] = request
 
     def enter_airspace(self, aircraft):
-        """Add an aircraft to the airspace if capacity allows."""
-        if self.can_accommodate():
-            self.current_aircrafts.append(aircraft)
-            return True
-        return False
+        """Add an aircraft holding a granted slot to the airspace."""
+        if aircraft.aircraft_id not in self.slot_requests:
+            raise RuntimeError(f"{self.env.now}: {aircraft.aircraft_id} entering airspace {self.origin}-{self.destination} without a slot")
+        self.current_aircrafts.append(aircraft)
+        aircraft.destination_vertiport.add_inbound_aircraft(aircraft)
 
     def exit_airspace(self, aircraft):
-        """Remove an aircraft from the airspace."""
+        """Remove an aircraft from the airspace and release its slot to the next queued departure."""
         if aircraft in self.current_aircrafts:
             self.current_aircrafts.remove(aircraft)
+            aircraft.destination_vertiport.remove_inbound_aircraft(aircraft)
+
+        request = self.slot_requests.pop(aircraft.aircraft_id, None)
+        if request is not None:
+            self.update_queue_statistics()
+            self.slots.release(request)
 
-    def compute_time_until_availability(self):
-        remaining_time = []
-        for ac in self.current_aircrafts:
-            remaining_flight_time,_ = ac.get_expected_arrival_time()
+    def set_capacity(self, capacity):
+        """Changes the number of aircraft allowed on the route. Aircraft above a reduced capacity finish their flight."""
+        self.update_queue_statistics()
+        self.capacity = capacity
+        self.slots.capacity = int(capacity)
 
-            remaining_time.append(remaining_flight_time)
+    def update_queue_statistics(self):
+        now = self.env.now
+        self.queue_length_area += len(self.slots.queue) * (now - self.queue_last_update)
+        self.queue_last_update = now
 
-        return min(remaining_time)-20
\ No newline at end of file
+    def get_statistics(self):
+        """Queue-length and wait-time statistics of the route since the start of the simulation."""
+        self.update_queue_statistics()
+        elapsed = self.env.now
+        return {
+            "origin": self.origin,
+            "destination": self.destination,
+            "capacity": self.capacity,
+            "requests": self.num_requests,
+            "delayed": self.num_delayed,
+            "total_wait_time": self.total_wait_time,
+            "mean_wait_time": self.total_wait_time / self.num_requests if self.num_requests else 0.0,
+            "max_wait_time": self.max_wait_time,
+            "queue_length": len(self.slots.queue),
+            "max_queue_length": self.max_queue_length,
+            "mean_queue_length": self.queue_length_area / elapsed if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,127 @@
+import numpy as np
+
+# aircraft state codes of the fleet arrays
+STATE_CODES = {"idle": 0, "charge": 1, "flying": 2}
+
+# float columns of a packed frame, after the fleet index column
+PACKED_COLUMNS = ("lat", "lon", "alt", "v_h", "v_v", "heading", "soc")
+
+
+class FleetState:
+    def __init__(self, initial_capacity=64):
+        """
+        Struct-of-arrays state of the fleet used to produce visualization frames.
+
+        Aircraft write their segment (start time, start/end position, duration), speeds, SoC and state code
+        on every transition, so a frame is produced with array operations over the fleet instead of
+        building one Python object per aircraft.
+
+        :param initial_capacity: number of preallocated aircraft rows (grows on demand)
+        """
+        self.size = 0
+        self.index = {}  # aircraft_id → row
+
+        self.ids = np.empty(initial_capacity, dtype=object)
+        self.vehicles = np.empty(initial_capacity, dtype=object)
+        self.state = np.zeros(initial_capacity, dtype=np.int8)
+        self.segment_start_time = np.zeros(initial_capacity)
+        self.start_position = np.zeros((initial_capacity, 3))
+        self.end_position = np.zeros((initial_capacity, 3))
+        self.segment_duration = np.zeros(initial_capacity)
+        self.speed_horizontal = np.zeros(initial_capacity)
+        self.speed_vertical = np.zeros(initial_capacity)
+        self.heading = np.zeros(initial_capacity)
+        self.soc = np.zeros(initial_capacity)
+
+    def register(self, aircraft_id, vehicle):
+        """Adds an aircraft to the fleet and returns its row."""
+        if self.size == len(self.state):
+            self._grow(2 * len(self.state))
+
+        row = self.size
+        self.ids[row] = aircraft_id
+        self.vehicles[row] = vehicle
+        self.index[aircraft_id] = row
+        self.size += 1
+        return row
+
+    def _grow(self, capacity):
+        for name in ("ids", "vehicles", "state", "segment_start_time", "start_position", "end_position", "segment_duration",
+                     "speed_horizontal", "speed_vertical", "heading", "soc"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype) if array.dtype != object else np.empty(capacity, dtype=object)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+
+    def set_state(self, row, state):
+        self.state[row] = STATE_CODES[state]
+
+    def set_position(self, row, position):
+        """Fixed position - the aircraft is parked, holding or between segments."""
+        self.start_position[row] = position
+        self.end_position[row] = position
+        self.segment_duration[row] = 0.0
+
+    def set_segment(self, row, start_time, start_position, end_position, duration, speed_horizontal, speed_vertical, heading):
+        self.segment_start_time[row] = start_time
+        self.start_position[row] = start_position
+        self.end_position[row] = end_position
+        self.segment_duration[row] = duration
+        self.speed_horizontal[row] = speed_horizontal
+        self.speed_vertical[row] = speed_vertical
+        self.heading[row] = heading
+
+    def set_soc(self, row, soc):
+        self.soc[row] = soc
+
+    def snapshot(self, now, state="flying"):
+        """
+        Columns of the aircraft in the given state, positions interpolated along their segments at now.
+
+        :return: dict of column name → array (ids and vehicles are object arrays)
+        """
+        rows = np.flatnonzero(self.state[:self.size] == STATE_CODES[state])
+        duration = self.segment_duration[rows]
+        elapsed = now - self.segment_start_time[rows]
+        ratio = np.ones_like(duration)
+        moving = duration > 0
+        ratio[moving] = np.clip(elapsed[moving] / duration[moving], 0.0, 1.0)
+
+        start = self.start_position[rows]
+        position = start + ratio[:, None] * (self.end_position[rows] - start)
+
+        return {
+            "time": now,
+            "index": rows,
+            "id": self.ids[rows],
+            "vehicle": self.vehicles[rows],
+            "lat": position[:, 0],
+            "lon": position[:, 1],
+            "alt": position[:, 2],
+            "v_h": self.speed_horizontal[rows],
+            "v_v": self.speed_vertical[rows],
+            "heading": self.heading[rows],
+            "soc": self.soc[rows],
+        }
+
+    def pack(self, now, state="flying"):
+        """
+        Binary frame: float64 header (time, number of aircraft) followed by one row per aircraft of
+        (fleet index, lat, lon, alt, v_h, v_v, heading, soc). Clients resolve the fleet index with id_table().
+        """
+        return self.pack_snapshot(self.snapshot(now, state))
+
+    @staticmethod
+    def pack_snapshot(snapshot):
+        frame = np.empty((len(snapshot["index"]), 1 + len(PACKED_COLUMNS)))
+        frame[:, 0] = snapshot["index"]
+        for column, name in enumerate(PACKED_COLUMNS, start=1):
+            frame[:, column] = snapshot[name]
+
+        header = np.array([snapshot["time"], len(frame)], dtype=np.float64)
+        return header.tobytes() + frame.tobytes()
+
+    def id_table(self):
+        """Fleet index → (aircraft id, vehicle), sent once to clients of the binary frames."""
+        return [{"index": row, "id": aircraft_id, "vehicle": vehicle}
+                for row, (aircraft_id, vehicle) in enumerate(zip(self.ids[:self.size], self.vehicles[:self.size]))]
@@ -1,82 +1,164 @@
 import networkx as nx
+import numpy as np
 from models.vertiport import Vertiport
 from models.airspace import Airspace
 from models.aircraft import Aircraft
 from models.charger import ChargerModel
-from pathlib import Path
-import pandas as pd
-import json
-
-INPUT_PATH = Path.cwd() / "input"
-SPECIFICATION_PATH = INPUT_PATH / "specifications"
-AIRSPACE_PATH = INPUT_PATH / "waypoints"
+from models.fleet_state import FleetState
+from planning.unmanned_traffic_management import UTM
+from utils.scenario import Scenario
 
 class UAMNetwork:
-    def __init__(self, env, nodes_df, edges_df, charger, mission_profile):
+    def __init__(self, env, nodes_df, edges_df, charger, mission_profile, scenario=None):
+        """
+        :param scenario: preloaded Scenario shared with the mission profile (default: loaded from nodes_df/edges_df)
+        """
         self.env = env
         self.graph = nx.DiGraph()
         self.vertiports = {}  # Stores Vertiport instances
         self.airspaces = {}  # Stores Airspace instances
         self.aircrafts = {}
+        self.fleet = FleetState()  # struct-of-arrays aircraft state for visualization frames
         self.initial_aircraft_allocation = {}  # node_id → expected aircraft count
         self.mission_profile = mission_profile
-        self.load_network(nodes_df, edges_df, charger)
+        self.simulation = None  # UAMSimulation driving this network (set by the simulation)
+
+        # itinerary cache - (origin, destination) → tuple of vertiport indices
+        self.vertiport_ids = []  # vertiport index → vertiport id
+        self.vertiport_index = {}  # vertiport id → vertiport index
+        self.itinerary_cache = {}
+        self.itineraries_by_edge = {}  # (origin, destination) edge → cached OD pairs routed over it
+
+        # network disruptions
+        self.closed_edges = {}  # (origin, destination) → graph edge attributes of the closed route
+        self.closed_vertiports = set()
+        self.closed_routes = set()  # routes closed by a route closure (closed_edges also holds those of closed vertiports)
+
+        if scenario is None:
+            scenario = Scenario.load(nodes_df, edges_df)
+        self.scenario = scenario
 
-    def load_network(self, nodes_df, edges_df, charger):
-        """Loads the nodes and edges, initializing Vertiport, Aircraft, Airspace instances."""
-        # Load aircrafts specification
-        df_specification = pd.read_csv(Path.joinpath(SPECIFICATION_PATH, "evtol_spec.csv"), index_col=0)
-        dict_specification = df_specification[df_specification.columns[0]].to_dict()
+        # aircraft distribution counters per vertiport index, updated on park/remove and airspace entry/exit
+        self.parked_count = np.zeros(len(scenario.nodes), dtype=np.int32)
+        self.inbound_count = np.zeros(len(scenario.nodes), dtype=np.int32)
 
+        self.load_network(scenario, charger)
+        self.utm = UTM(self)
+
+    def load_network(self, scenario, charger):
+        """Initializes Vertiport, Aircraft, Airspace instances from the scenario."""
         # Load nodes and initialize Vertiports
         aircraft_num = 1
-        for _, row in nodes_df.iterrows():
+        for node in scenario.nodes:
             vertiport = Vertiport(
                 env=self.env,
-                vertiport_id=row["id"],
-                name=row["name"],
-                location=(row["lat"], row["lon"], row["alt"]),
+                vertiport_id=node.id,
+                name=node.name,
+                location=node.location,
                 network=self,
-                charger=charger
+                charger=charger,
+                pads=node.pads,
+                stands=node.stands
             )
-            self.graph.add_node(row["id"], pos=vertiport.location, vertiport=vertiport)
-            self.vertiports[row["id"]] = vertiport
+            self.graph.add_node(node.id, pos=vertiport.location, vertiport=vertiport)
+            self.vertiports[node.id] = vertiport
+            vertiport.index = len(self.vertiport_ids)
+            self.vertiport_index[node.id] = vertiport.index
+            self.vertiport_ids.append(node.id)
 
             # initialize aircrafts
-            for ac_vehicle, num in json.loads(row["ac_composition"]).items():
+            for ac_vehicle, num in node.composition.items():
+                specification = scenario.vehicles[ac_vehicle]
                 for _ in range(num):
                     aircraft_id = f"AC_{aircraft_num}"
-                    specification = df_specification[ac_vehicle]
                     aircraft = Aircraft(env=self.env, vehicle=ac_vehicle, aircraft_id=aircraft_id, network=self, origin_vertiport=vertiport, specification=specification)
                     self.aircrafts[aircraft_id] = aircraft
                     aircraft_num += 1
                     vertiport.park_aircraft(aircraft)
+                    vertiport.occupy_stand(aircraft)
 
                 # save aircraft distribution (for aircraft repositioning)
-                self.initial_aircraft_allocation[row["id"]] = num
+                self.initial_aircraft_allocation[node.id] = num
 
         # Load edges and initialize Airspaces
-        for _, row in edges_df.iterrows():
-            attributes = row.drop(["origin", "destination"]).to_dict()
-            wp_name = row["waypoints"]
-            waypoint_input_file = Path.joinpath(AIRSPACE_PATH, wp_name + ".csv")
-
-            flight_time = list(self.mission_profile[wp_name]['joby_s4_2']['accumulated time'])[-1]
-
-            try:
-                waypoints = pd.read_csv(waypoint_input_file)
-            except:
-                raise Exception(f"waypoint file not found for {row}. Check file exists: {waypoint_input_file}")
+        for edge in scenario.edges:
+            # routing weight: fastest vehicle on the route
+            flight_time = min(profile['accumulated time'].iloc[-1] for profile in self.mission_profile[edge.waypoints].values())
 
             airspace = Airspace(
-                origin=row["origin"],
-                destination=row["destination"],
-                capacity=attributes.get("capacity", 5),  # Default capacity = 5 if not provided
-                waypoints=waypoints,
-                mission_profile=self.mission_profile[row["waypoints"]]
+                env=self.env,
+                origin=edge.origin,
+                destination=edge.destination,
+                capacity=edge.capacity,
+                waypoints=scenario.waypoints[edge.waypoints],
+                mission_profile=self.mission_profile[edge.waypoints]
             )
-            self.graph.add_edge(row["origin"], row["destination"], airspace=airspace, flight_time=flight_time,**attributes)
-            self.airspaces[(row["origin"], row["destination"])] = airspace
+            self.graph.add_edge(edge.origin, edge.destination, airspace=airspace, flight_time=flight_time, **edge.attributes)
+            self.airspaces[(edge.origin, edge.destination)] = airspace
+
+    def close_route(self, origin, destination):
+        """
+        Closes a route (airborne aircraft finish their flight on it). It stays closed until reopen_route,
+        whatever happens to its vertiports in the meantime.
+
+        :return: True if the route was open
+        """
+        self.closed_routes.add((origin, destination))
+        return self.remove_route(origin, destination)
+
+    def reopen_route(self, origin, destination):
+        """
+        Lifts a route closure and restores the route, unless one of its vertiports is still closed.
+
+        :return: True if the route was reopened
+        """
+        self.closed_routes.discard((origin, destination))
+        return self.restore_route(origin, destination)
+
+    def close_vertiport(self, vertiport_id):
+        """
+        Closes every route from and to the vertiport.
+
+        :return: list of the closed routes
+        """
+        self.closed_vertiports.add(vertiport_id)
+        edges = list(self.graph.in_edges(vertiport_id)) + list(self.graph.out_edges(vertiport_id))
+        return [edge for edge in edges if self.remove_route(*edge)]
+
+    def reopen_vertiport(self, vertiport_id):
+        """
+        Reopens the routes of the vertiport whose other end is open and that are not closed themselves.
+
+        :return: list of the reopened routes
+        """
+        self.closed_vertiports.discard(vertiport_id)
+        edges = [edge for edge in self.closed_edges if vertiport_id in edge]
+        return [edge for edge in edges if self.restore_route(*edge)]
+
+    def remove_route(self, origin, destination):
+        """Removes a route from the graph. Returns True if it was in the graph."""
+        if not self.graph.has_edge(origin, destination):
+            return False
+
+        self.closed_edges[origin, destination] = dict(self.graph.edges[origin, destination])
+        self.graph.remove_edge(origin, destination)
+        self.airspaces[origin, destination].closed = True
+        self.invalidate_itineraries((origin, destination))
+        return True
+
+    def restore_route(self, origin, destination):
+        """Puts a removed route back once no route or vertiport closure applies to it any more."""
+        if ((origin, destination) not in self.closed_edges or (origin, destination) in self.closed_routes
+                or {origin, destination} & self.closed_vertiports):
+            return False
+
+        self.graph.add_edge(origin, destination, **self.closed_edges.pop((origin, destination)))
+        self.airspaces[origin, destination].closed = False
+        self.invalidate_itineraries((origin, destination), weight_decreased=True)
+        return True
+
+    def set_route_capacity(self, origin, destination, capacity):
+        self.airspaces[origin, destination].set_capacity(capacity)
 
     def update_network(self):
         """Updates network state every 'update_interval' minutes."""
@@ -87,5 +169,40 @@ class UAMNetwork:
             vertiport.update_aircraft_soc()
 
     def compute_itinerary(self, origin_node, destination_node):
-        itinerary = nx.shortest_path(self.graph, source=origin_node, target=destination_node, weight='flight_time')
-        return itinerary
+        """Fastest itinerary (list of vertiport ids), memoized per OD pair."""
+        path = self.itinerary_cache.get((origin_node, destination_node))
+        if path is None:
+            itinerary = nx.shortest_path(self.graph, source=origin_node, target=destination_node, weight='flight_time')
+            path = self.cache_itinerary(itinerary)
+
+        return [self.vertiport_ids[index] for index in path]
+
+    def cache_itinerary(self, itinerary):
+        path = tuple(self.vertiport_index[node] for node in itinerary)
+        od = (itinerary[0], itinerary[-1])
+        self.itinerary_cache[od] = path
+        for edge in zip(itinerary[:-1], itinerary[1:]):
+            self.itineraries_by_edge.setdefault(edge, set()).add(od)
+        return path
+
+    def precompute_itineraries(self):
+        """Fills the itinerary cache for every reachable OD pair (all-pairs Dijkstra)."""
+        for origin, paths in nx.all_pairs_dijkstra_path(self.graph, weight='flight_time'):
+            for destination, itinerary in paths.items():
+                if origin != destination:
+                    self.cache_itinerary(itinerary)
+
+    def invalidate_itineraries(self, edge=None, weight_decreased=False):
+        """
+        Drops cached itineraries after the graph changed.
+
+        :param edge: (origin, destination) edge that was removed or became slower - only itineraries routed over it are dropped
+        :param weight_decreased: the edge was added or became faster - any itinerary may change, the whole cache is dropped
+        """
+        if edge is None or weight_decreased:
+            self.itinerary_cache.clear()
+            self.itineraries_by_edge.clear()
+            return
+
+        for od in self.itineraries_by_edge.pop(tuple(edge), ()):
+            self.itinerary_cache.pop(od, None)
@@ -1,14 +1,21 @@
-import simpy
 import logging
 
 logger = logging.getLogger(__name__)
 
 class Passenger:
+    """
+    Passenger record without a SimPy process - legs advance through complete_leg, called by the aircraft
+    on arrival, and the trip is written to the simulation logs when the last leg is completed.
+    """
+    __slots__ = ("env", "network", "passenger_id", "itinerary", "leg_index", "origin", "destination", "initial_time",
+                 "arrival_time", "boarded_aircraft", "wait_time", "destination_arrival_time_history", "wait_time_history")
+
     def __init__(self, env, network, passenger_id, itinerary):
         self.env = env
         self.network = network
         self.passenger_id = passenger_id
         self.itinerary = itinerary
+        self.leg_index = 1 # current leg: itinerary[leg_index-1] → itinerary[leg_index]
         self.origin = None
         self.destination = None
         self.initial_time = self.env.now # initial arrival time to the vertiport (used to compute the total travel time)
@@ -17,9 +24,6 @@ class Passenger:
         self.wait_time = 0
         self.destination_arrival_time_history = []
         self.wait_time_history = []
-        self.current_leg_complete = None
-        self.journey_process = None
-        self.trip_result = None
 
     def update_wait_time(self, env):
         self.wait_time = env.now - self.arrival_time
@@ -34,57 +38,61 @@ class Passenger:
         self.boarded_aircraft.current_passengers.remove(self)
         self.boarded_aircraft = None
 
-    def journey(self):
-        for i in range(1, len(self.itinerary)):
-            current_origin = self.itinerary[i - 1]
-            next_dest = self.itinerary[i]
-
-            self.current_leg_complete = self.env.event()
-
-            # Request to travel from current to next
-            self.origin = self.network.vertiports[current_origin]
-            self.destination = self.network.vertiports[next_dest]
-
-            # arrive at vertiport
-            self.origin.add_passenger(self)
-            self.arrival_time = self.env.now
-            self.wait_time = 0 # reset wait time -- increase this if priority is higher
-
-            logger.info(f"[{self.env.now}] Passenger {self.passenger_id} traveling {current_origin} → {next_dest}")
-
-            try:
-                yield self.current_leg_complete  # Wait for this trip to complete
-                self.destination_arrival_time_history.append(self.env.now)
-                logger.info(f"[{self.env.now}] Passenger {self.passenger_id} intermediate point reached : {current_origin} out of {self.itinerary}")
-            except simpy.Interrupt as interrupt:
-                print(f"[{self.env.now}] Passenger {self.passenger_id} interrupted: {interrupt.cause}")
-                break
-
+    def cancel_boarding(self):
+        """Returns the passenger to the departure queue of a cancelled flight (waiting time keeps counting)."""
+        self.boarded_aircraft.current_passengers.remove(self)
+        self.boarded_aircraft = None
+        self.wait_time_history.pop()
+        self.origin.requeue_passenger(self)
+
+    def remaining_itinerary(self):
+        """Vertiports still to visit, starting at the current vertiport (waiting) or the leg destination (boarded)."""
+        start = self.leg_index if self.boarded_aircraft is not None else self.leg_index - 1
+        return self.itinerary[start:]
+
+    def reroute(self, path):
+        """
+        Replaces the remaining itinerary.
+
+        :param path: new path starting at the first vertiport of remaining_itinerary()
+        """
+        if self.boarded_aircraft is not None:
+            self.itinerary = self.itinerary[:self.leg_index] + list(path)
+        else:
+            self.itinerary = self.itinerary[:self.leg_index - 1] + list(path)
+            self.destination = self.network.vertiports[path[1]]
+
+    def start_journey(self):
+        """Passenger arrives at the origin vertiport of the itinerary."""
+        self.start_leg()
+
+    def start_leg(self):
+        """Queues the passenger at the origin of the current leg."""
+        # the itinerary may be re-routed during the journey (network events)
+        current_origin = self.itinerary[self.leg_index - 1]
+        next_dest = self.itinerary[self.leg_index]
+
+        # Request to travel from current to next
+        self.origin = self.network.vertiports[current_origin]
+        self.destination = self.network.vertiports[next_dest]
+
+        # arrive at vertiport
+        self.origin.add_passenger(self)
+        self.arrival_time = self.env.now
+        self.wait_time = 0 # reset wait time -- increase this if priority is higher
+
+        logger.info(f"[{self.env.now}] Passenger {self.passenger_id} traveling {current_origin} → {next_dest}")
+
+    def complete_leg(self):
+        """Called by the aircraft after unboarding at the leg destination - starts the next leg or ends the trip."""
+        self.destination_arrival_time_history.append(self.env.now)
+        logger.info(f"[{self.env.now}] Passenger {self.passenger_id} intermediate point reached : {self.itinerary[self.leg_index - 1]} out of {self.itinerary}")
+        self.leg_index += 1
+
+        if self.leg_index < len(self.itinerary):
+            self.start_leg()
+            return
 
         logger.info(f"[{self.env.now}] Passenger {self.passenger_id} final destination reached.")
-        self.trip_result = self.compute_travel_result()
-
-
-    def compute_travel_result(self):
-        """Returns total wait and travel time for completed journey."""
-        # final arrival is time at last destination (last leg index)
-
-        total_travel_time = self.destination_arrival_time_history[-1] - self.initial_time
-        total_wait_time = 0
-
-        result_dict = {
-            "passenger_id": self.passenger_id,
-            "itinerary": self.itinerary,
-            "origin": self.itinerary[0]
-        }
-
-        for i, (wt, dt) in enumerate(zip(self.wait_time_history, self.destination_arrival_time_history), start=1):
-            result_dict[f"wait time at itinerary {i-1}"] = wt
-            result_dict[f"itinerary {i}"] = self.itinerary[i]
-            result_dict[f"travel time to itinerary {i}"] = dt - self.initial_time
-            total_wait_time += wt
-
-        result_dict["total wait time"]= total_wait_time
-        result_dict["total travel time"] = total_travel_time
-
-        return result_dict
+        if self.network.simulation is not None:
+            self.network.simulation.log_trip(self)
@@ -1,7 +1,12 @@
+import simpy
 from collections import defaultdict
 
 class Vertiport:
-    def __init__(self, env, vertiport_id, name, location, network, charger, geometry=None):
+    def __init__(self, env, vertiport_id, name, location, network, charger, geometry=None, pads=None, stands=None):
+        """
+        :param pads: number of FATO/pads shared by take-offs and landings (None = unconstrained)
+        :param stands: number of parking/charging stands (None = unconstrained)
+        """
 
         self.env = env
         self.vertiport_id = vertiport_id
@@ -11,14 +16,43 @@ class Vertiport:
         self.network = network  # Reference to the UAMNetwork
         self.charger = charger
         self.aircrafts = []  # List of aircraft currently at this vertiport
+        self.inbound_aircraft = {}  # aircraft_id → airborne aircraft heading to this vertiport
+        self.index = None  # position in network.vertiport_ids (set by the network) - row of the distribution counters
         self.passengers = [] # List of passengers waiting in the vertiport
+        self.arrival_counts = defaultdict(int) # destination id → cumulative passenger arrivals (demand forecasting)
 
         # self.node = # pointer to the network node
         # self.chargers = []  # List of chargers at this vertiport
 
+        # ground infrastructure - landings hold in the approach until both a stand and a pad are free
+        self.pads = simpy.Resource(env, capacity=int(pads)) if pads else None
+        self.stands = simpy.Resource(env, capacity=int(stands)) if stands else None
+        self.stand_requests = {}  # aircraft_id → (stand request, time on stand)
+        self.approach_queue = 0  # aircraft holding in the approach
+
+        # ground statistics (compact counters)
+        self.ground_stats = {
+            "departures": 0,
+            "departure_delayed": 0,
+            "departure_wait_time": 0.0,
+            "max_departure_wait_time": 0.0,
+            "arrivals": 0,
+            "holding": 0,
+            "holding_time": 0.0,
+            "max_holding_time": 0.0,
+            "max_approach_queue": 0,
+            "turnarounds": 0,
+            "turnaround_time": 0.0,
+        }
+
     def add_passenger(self, passenger):
         """Add a passenger to the vertiport."""
         self.passengers.append(passenger)
+        self.arrival_counts[passenger.destination.vertiport_id] += 1
+
+    def requeue_passenger(self, passenger):
+        """Puts back a passenger of a cancelled departure (not counted as a new arrival)."""
+        self.passengers.append(passenger)
 
     def remove_passenger(self, passenger):
         """Remove a passenger from the vertiport."""
@@ -32,11 +66,112 @@ class Vertiport:
     def park_aircraft(self, aircraft):
         """Park an aircraft at this vertiport."""
         self.aircrafts.append(aircraft)
+        self.network.parked_count[self.index] += 1
 
     def remove_aircraft(self, aircraft):
         """Dispatch an aircraft from this vertiport."""
         if aircraft in self.aircrafts:
             self.aircrafts.remove(aircraft)
+            self.network.parked_count[self.index] -= 1
+
+    def add_inbound_aircraft(self, aircraft):
+        """Aircraft entered the airspace of a route to this vertiport."""
+        self.inbound_aircraft[aircraft.aircraft_id] = aircraft
+        self.network.inbound_count[self.index] += 1
+
+    def remove_inbound_aircraft(self, aircraft):
+        if self.inbound_aircraft.pop(aircraft.aircraft_id, None) is not None:
+            self.network.inbound_count[self.index] -= 1
+
+    def occupy_stand(self, aircraft):
+        """Assigns a stand to an aircraft parked at initialization."""
+        if self.stands is None:
+            return
+        if self.stands.count >= self.stands.capacity:
+            raise ValueError(f"vertiport {self.vertiport_id}: more aircraft initialized than stands ({self.stands.capacity})")
+        self.stand_requests[aircraft.aircraft_id] = (self.stands.request(), None)
+
+    def request_departure_pad(self, aircraft):
+        """
+        Process generator - queues a parked aircraft for a pad, it leaves its stand once the pad is free.
+        Use with `yield from`; returns the pad request to release after take-off (None if pads are unconstrained).
+        """
+        self.ground_stats["departures"] += 1
+        if self.pads is None:
+            self.release_stand(aircraft)
+            return None
+
+        request_time = self.env.now
+        request = self.pads.request()
+        yield request
+        self.release_stand(aircraft)
+
+        wait_time = self.env.now - request_time
+        if wait_time > 0:
+            self.ground_stats["departure_delayed"] += 1
+            self.ground_stats["departure_wait_time"] += wait_time
+            self.ground_stats["max_departure_wait_time"] = max(self.ground_stats["max_departure_wait_time"], wait_time)
+        return request
+
+    def request_landing(self, aircraft):
+        """
+        Process generator - approach holding until a stand and then a pad are free.
+        Use with `yield from`; returns the pad request to release after touchdown (None if pads are unconstrained).
+        """
+        self.ground_stats["arrivals"] += 1
+        request_time = self.env.now
+        self.approach_queue += 1
+        self.ground_stats["max_approach_queue"] = max(self.ground_stats["max_approach_queue"], self.approach_queue)
+
+        if self.stands is not None:
+            stand_request = self.stands.request()
+            yield stand_request
+            self.stand_requests[aircraft.aircraft_id] = (stand_request, None)
+
+        pad_request = None
+        if self.pads is not None:
+            pad_request = self.pads.request()
+            yield pad_request
+
+        self.approach_queue -= 1
+        holding_time = self.env.now - request_time
+        if holding_time > 0:
+            self.ground_stats["holding"] += 1
+            self.ground_stats["holding_time"] += holding_time
+            self.ground_stats["max_holding_time"] = max(self.ground_stats["max_holding_time"], holding_time)
+        return pad_request
+
+    def release_pad(self, pad_request):
+        if pad_request is not None:
+            self.pads.release(pad_request)
+
+    def mark_on_stand(self, aircraft):
+        """Starts the turnaround clock once the aircraft has taxied from the pad to its stand."""
+        if aircraft.aircraft_id in self.stand_requests:
+            request, _ = self.stand_requests[aircraft.aircraft_id]
+            self.stand_requests[aircraft.aircraft_id] = (request, self.env.now)
+
+    def release_stand(self, aircraft):
+        entry = self.stand_requests.pop(aircraft.aircraft_id, None)
+        if entry is None:
+            return
+
+        request, on_stand_time = entry
+        if on_stand_time is not None:  # initial parking is not a turnaround
+            self.ground_stats["turnarounds"] += 1
+            self.ground_stats["turnaround_time"] += self.env.now - on_stand_time
+        self.stands.release(request)
+
+    def get_ground_statistics(self):
+        stats = dict(self.ground_stats)
+        stats["vertiport_id"] = self.vertiport_id
+        stats["pads"] = self.pads.capacity if self.pads else None
+        stats["stands"] = self.stands.capacity if self.stands else None
+        stats["pads_in_use"] = self.pads.count if self.pads else 0
+        stats["approach_queue"] = self.approach_queue
+        stats["mean_turnaround_time"] = stats["turnaround_time"] / stats["turnarounds"] if stats["turnarounds"] else 0.0
+        stats["mean_holding_time"] = stats["holding_time"] / stats["holding"] if stats["holding"] else 0.0
+        return stats
 
     # def add_charger(self, charger):
     #     """Adds a charger to this vertiport."""
@@ -73,5 +208,6 @@ class Vertiport:
             if aircraft.state == "charge":
                 aircraft.update_soc()
 
-            elif aircraft.battery.soc < 0.99 and aircraft.state == "idle":
+            elif aircraft.battery.soc < 0.99 and aircraft.state == "idle" and aircraft.flight_ready:
+                # reserved aircraft (idle, not flight ready) may wait for an airspace slot below full charge
                 raise Warning(f"{self.env.now}: aircraft {aircraft.aircraft_id} - soc: {aircraft.battery.soc} but state is idle not charge - check charge logic")
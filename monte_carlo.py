@@ -0,0 +1,204 @@
+"""
+Monte Carlo replication runner.
+
+Runs R seeded replications of one scenario headless (fast mode) across a process pool. The scenario,
+mission profiles and charger model are built once in the parent and handed to every worker when it
+starts, so a replication only samples its passenger demand and runs the simulation. Each replication
+draws its demand (planning/demand_generation.py) from the Poisson arrival rates of a lambda matrix
+(15-minute slots, destinations from an OD matrix or uniform over the other vertiports) with its own
+child of one SeedSequence, which makes the results independent of how replications are spread over
+the workers. Within a replication every vertiport and
+random quantity has its own substream, so runs of different policies with the same --seed compare the
+policies under common random numbers.
+
+Reports per-replication KPIs and their distribution over the replications: mean, standard deviation,
+Student-t confidence interval of the mean and percentiles.
+
+usage: python monte_carlo.py --replications 32 --workers 8 --seed 0
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import simpy
+from scipy import stats
+
+from airsim import UAMSimulation
+from models.charger import ChargerModel
+from models.network import UAMNetwork
+from planning.demand_generation import PoissonArrivalSource, sample_demand
+from planning.dispatch_policy import POLICIES
+from planning.mission_profile import create_mission_profile
+from utils.demand_utils import DemandTable
+from utils.scenario import Scenario
+
+NETWORK_PATH = os.path.join(os.curdir, 'input/network')
+DEMAND_PATH = os.path.join(os.curdir, 'input/demand')
+OUTPUT_PATH = os.path.join(os.curdir, 'output')
+
+# inputs shared by every replication of a worker process, set once by init_worker
+WORKER_INPUTS = {}
+
+
+def init_worker(inputs, log_level):
+    """Pool initializer: receives the shared precomputation once per worker process."""
+    logging.basicConfig(level=log_level)
+    WORKER_INPUTS.update(inputs)
+
+
+def run_replication(replication, seed):
+    """
+    Samples the demand of one replication (or streams it while running) and runs it in fast mode.
+
+    :return: dict of KPIs
+    """
+    inputs = WORKER_INPUTS
+    scenario = inputs["scenario"]
+    sources = []
+    if inputs["demand"] is not None:
+        demand = inputs["demand"]
+    elif inputs["streaming"]:
+        demand = []
+        sources = [PoissonArrivalSource(inputs["lambda_df"], od_matrix=inputs["od_df"], seed=seed)]
+    else:
+        demand = sample_demand(inputs["lambda_df"], scenario.nodes_df["id"].tolist(), od_matrix=inputs["od_df"], seed=seed)
+
+    wall_start = time.perf_counter()
+    env = simpy.Environment()
+    network = UAMNetwork(env, scenario.nodes_df, scenario.edges_df, inputs["charger"], inputs["mission_profile"],
+                         scenario=scenario)
+    policy = POLICIES[inputs["policy"]]() if inputs["policy"] else None
+    simulation = UAMSimulation(env, network, demand, inputs["mission_profile"], update_interval=inputs["update_interval"],
+                               start_time=inputs["start_time"], end_time=inputs["end_time"], run_mode="fast",
+                               dispatch_policy=policy, arrival_sources=sources)
+    env.run(until=inputs["end_time"] + 1)
+    wall_time = time.perf_counter() - wall_start
+
+    passengers_demand = sources[0].generated if sources else len(demand)
+    return {"replication": replication, **replication_kpis(simulation, passengers_demand), "wall_time_s": wall_time}
+
+
+def replication_kpis(simulation, passengers_demand):
+    trips = simulation.passenger_trip_log
+    flights = simulation.vehicle_trip_log
+
+    wait = trips.column("total_wait_time")
+    travel = trips.column("total_travel_time")
+    empty_legs = int((flights.column("num_passengers") == 0).sum())
+
+    def percentile(values, q):
+        return np.percentile(values, q) if values.size else np.nan
+
+    return {
+        "passengers_demand": passengers_demand,
+        "passengers_served": len(trips),
+        "served_ratio": len(trips) / passengers_demand if passengers_demand else np.nan,
+        "mean_wait_s": wait.mean() if wait.size else np.nan,
+        "p50_wait_s": percentile(wait, 50),
+        "p90_wait_s": percentile(wait, 90),
+        "p95_wait_s": percentile(wait, 95),
+        "mean_travel_s": travel.mean() if travel.size else np.nan,
+        "flights": len(flights),
+        "empty_legs": empty_legs,
+        "empty_leg_ratio": empty_legs / len(flights) if len(flights) else np.nan,
+        "energy_kwh": flights.column("energy_consumed").sum(),
+    }
+
+
+def aggregate(df_results, confidence=0.95):
+    """
+    Distribution of every KPI over the replications.
+
+    :return: DataFrame indexed by KPI with mean, std, confidence interval of the mean and percentiles
+    """
+    rows = {}
+    for column in df_results.columns.drop("replication"):
+        values = df_results[column].dropna().to_numpy(dtype=float)
+        n = values.size
+        mean = values.mean() if n else np.nan
+        std = values.std(ddof=1) if n > 1 else np.nan
+        half_width = stats.t.ppf(0.5 + confidence / 2, n - 1) * std / np.sqrt(n) if n > 1 else np.nan
+        rows[column] = {
+            "n": n,
+            "mean": mean,
+            "std": std,
+            "ci_low": mean - half_width,
+            "ci_high": mean + half_width,
+            "p5": np.percentile(values, 5) if n else np.nan,
+            "p50": np.percentile(values, 50) if n else np.nan,
+            "p95": np.percentile(values, 95) if n else np.nan,
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded Monte Carlo replications of one scenario in parallel.")
+    parser.add_argument("--replications", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0, help="root seed of the replication seed sequence")
+    parser.add_argument("--network", default=NETWORK_PATH, help="directory with nodes.csv and edges.csv")
+    parser.add_argument("--lambda-matrix", default=os.path.join(DEMAND_PATH, 'lambda_matrix.csv'))
+    parser.add_argument("--od-matrix", default=None, help="destination probabilities per origin (default: uniform)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="generate arrivals inside the simulation (thinning) instead of sampling a demand table first")
+    parser.add_argument("--demand", default=None, help="replay a fixed demand file in every replication instead of sampling")
+    parser.add_argument("--policy", default=None, choices=list(POLICIES))
+    parser.add_argument("--start", type=int, default=6*3600, help="simulation start time in seconds")
+    parser.add_argument("--end", type=int, default=22*3600, help="simulation end time in seconds")
+    parser.add_argument("--update-interval", type=int, default=120)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", default=os.path.join(OUTPUT_PATH, "monte_carlo"), help="output file prefix")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level)
+
+    # shared precomputation, built once and shipped to each worker when it starts
+    scenario = Scenario.load(network_path=args.network)
+    mission_profile = create_mission_profile(scenario.nodes_df, scenario.edges_df, save_result=False, scenario=scenario)
+    inputs = {
+        "scenario": scenario,
+        "mission_profile": mission_profile,
+        "charger": ChargerModel(400, 0.9, 160),
+        "lambda_df": pd.read_csv(args.lambda_matrix) if args.demand is None else None,
+        "od_df": pd.read_csv(args.od_matrix, index_col=0) if args.od_matrix and args.demand is None else None,
+        "streaming": args.streaming,
+        "demand": DemandTable.read_csv(args.demand, scenario.nodes_df["id"].tolist()) if args.demand else None,
+        "policy": args.policy,
+        "start_time": args.start,
+        "end_time": args.end,
+        "update_interval": args.update_interval,
+    }
+    if args.demand:
+        logging.warning("fixed demand file: the simulation is deterministic, every replication gives the same result")
+
+    seeds = np.random.SeedSequence(args.seed).spawn(args.replications)
+    tasks = list(enumerate(seeds))
+
+    print(f"running {args.replications} replications on {args.workers} workers")
+    wall_start = time.perf_counter()
+    if args.workers > 1:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.workers, initializer=init_worker, initargs=(inputs, args.log_level)) as pool:
+            results = pool.starmap(run_replication, tasks, chunksize=1)
+    else:
+        init_worker(inputs, args.log_level)
+        results = [run_replication(*task) for task in tasks]
+    wall_time = time.perf_counter() - wall_start
+
+    df_results = pd.DataFrame(results).sort_values("replication")
+    df_summary = aggregate(df_results, args.confidence)
+    print(df_summary.to_string(float_format=lambda x: f"{x:.2f}"))
+    print(f"{args.replications} replications in {wall_time:.1f} s")
+
+    df_results.to_csv(f"{args.output}_replications.csv", index=False)
+    df_summary.to_csv(f"{args.output}_summary.csv", index_label="kpi")
+
+
+if __name__ == "__main__":
+    main()
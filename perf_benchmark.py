@@ -0,0 +1,451 @@
+"""
+Performance benchmark suite.
+
+Repeatable timings and memory figures of the planner, charger and routing hot spots and of full-day
+fast-mode runs:
+
+    mission_profile   create_mission_profile on the shipped routes, flight_profile on synthetic long routes
+    charger           ChargerModel construction, query_final_soc / query_charging_time
+    itinerary         UAMNetwork.compute_itinerary, cold (empty cache) and warm
+    check_demand      Vertiport.check_demand at growing queue sizes
+    full_day          fast-mode runs of synthetic networks with 20, 200 and 2,000 aircraft
+
+Micro benchmarks report the min / median / mean wall time over the repeats and the peak traced memory
+of one extra (untimed) call. Full-day runs use the scaling benchmark in a fresh process per network
+and report its peak RSS. Results are written as JSON together with the environment they were taken in.
+
+The compare mode matches two result files by benchmark name and flags every benchmark whose median
+time or memory grew by more than the threshold; it exits with status 1 if there are regressions.
+
+usage: python perf_benchmark.py run --output output/benchmarks/baseline.json
+       python perf_benchmark.py run --only charger itinerary --compare output/benchmarks/baseline.json
+       python perf_benchmark.py compare output/benchmarks/baseline.json output/benchmarks/current.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_PATH = os.path.join(os.curdir, 'output', 'benchmarks')
+SYNTHETIC_PATH = os.path.join(os.curdir, 'output', 'synthetic_networks')
+
+AIRCRAFT_PER_VERTIPORT = 4
+FULL_DAY_FLEETS = (20, 200, 2000)  # aircraft of the full-day runs
+QUEUE_SIZES = (10, 100, 1000, 10000)  # waiting passengers of the check_demand benchmarks
+LONG_ROUTE_WAYPOINTS = (25, 100)  # cruise waypoints of the synthetic long routes
+ITINERARY_VERTIPORTS = 50
+ITINERARY_QUERIES = 1000
+CHARGER_QUERIES = 10000
+
+
+class Benchmark(NamedTuple):
+    name: str
+    group: str
+    setup: Callable  # returns the function to time (setup time is not measured)
+    number: int = 1  # calls per timed repeat
+
+
+class Fixtures:
+    """Inputs shared by several benchmarks, built on first use and excluded from the timings."""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.cache = {}
+
+    def get(self, key, build):
+        if key not in self.cache:
+            with contextlib.redirect_stdout(io.StringIO()):  # progress prints of the models
+                self.cache[key] = build()
+        return self.cache[key]
+
+    def scenario(self):
+        from utils.scenario import Scenario
+        return self.get("scenario", Scenario.load)
+
+    def charger(self):
+        from models.charger import ChargerModel
+        return self.get("charger", lambda: ChargerModel(400, 0.9, 160))
+
+    def mission_profile(self):
+        from planning.mission_profile import create_mission_profile
+        scenario = self.scenario()
+        return self.get("mission_profile", lambda: create_mission_profile(scenario.nodes_df, scenario.edges_df,
+                                                                          save_result=False, scenario=scenario))
+
+    def network(self):
+        """Network of the shipped scenario."""
+        return self.get("network", lambda: self.build_network(self.scenario(), self.mission_profile()))
+
+    def synthetic_paths(self, vertiports):
+        from input.network.synthetic_network import generate_network
+        return self.get(("synthetic", vertiports), lambda: generate_network(
+            vertiports, os.path.join(SYNTHETIC_PATH, f"n{vertiports}"), aircraft_per_vertiport=AIRCRAFT_PER_VERTIPORT,
+            seed=self.seed))
+
+    def synthetic_network(self, vertiports):
+        from planning.mission_profile import create_mission_profile
+        from utils.scenario import Scenario
+
+        def build():
+            paths = self.synthetic_paths(vertiports)
+            scenario = Scenario.load(network_path=paths["network_path"], waypoint_path=paths["waypoint_path"])
+            mission_profile = create_mission_profile(scenario.nodes_df, scenario.edges_df, save_result=False,
+                                                     scenario=scenario)
+            return self.build_network(scenario, mission_profile)
+
+        return self.get(("synthetic_network", vertiports), build)
+
+    def build_network(self, scenario, mission_profile):
+        import simpy
+        from models.network import UAMNetwork
+        return UAMNetwork(simpy.Environment(), scenario.nodes_df, scenario.edges_df, self.charger(), mission_profile,
+                          scenario=scenario)
+
+
+def long_route(cruise_waypoints, distance_km=150.0):
+    """Synthetic route with the shipped waypoint layout and the cruise split into many waypoints."""
+    from input.network.synthetic_network import route_waypoints
+
+    latitude_span = distance_km / 111.0
+    waypoints = route_waypoints(("A", 37.0, -122.0, 0), ("B", 37.0 + latitude_span, -122.0, 0), distance_km)
+    cruise_start, cruise_end = waypoints.iloc[3], waypoints.iloc[4]
+    fractions = np.linspace(0, 1, cruise_waypoints + 2)[1:-1]
+    cruise = pd.DataFrame({
+        "origin": "A",
+        "destination": "B",
+        "latitude": cruise_start["latitude"] + fractions * (cruise_end["latitude"] - cruise_start["latitude"]),
+        "longitude": cruise_start["longitude"] + fractions * (cruise_end["longitude"] - cruise_start["longitude"]),
+        "altitude": cruise_start["altitude"],
+        "waypoint_id": [f"A_B_cruise{i}" for i in range(cruise_waypoints)],
+        "flight_mode": "cruise",
+    })
+    waypoints = pd.concat([waypoints.iloc[:4], cruise, waypoints.iloc[4:]], ignore_index=True)
+    waypoints["waypoint_id"] = [f"A_B_wp{i}" for i in range(len(waypoints))]
+    return waypoints
+
+
+def mission_profile_benchmarks(fixtures):
+    from planning.mission_profile import create_mission_profile, flight_profile
+
+    def shipped():
+        scenario = fixtures.scenario()
+        return lambda: create_mission_profile(scenario.nodes_df, scenario.edges_df, save_result=False, scenario=scenario)
+
+    def long_route_profile(cruise_waypoints):
+        def setup():
+            specification = fixtures.scenario().specification
+            parameters = specification[specification.columns[0]].to_dict()
+            waypoints = long_route(cruise_waypoints)
+            return lambda: flight_profile(waypoints, parameters)
+        return setup
+
+    yield Benchmark("mission_profile.shipped_routes", "mission_profile", shipped)
+    for cruise_waypoints in LONG_ROUTE_WAYPOINTS:
+        yield Benchmark(f"mission_profile.long_route_{cruise_waypoints}wp", "mission_profile",
+                        long_route_profile(cruise_waypoints))
+
+
+def charger_benchmarks(fixtures):
+    from models.charger import ChargerModel
+
+    def construction():
+        def build():
+            with contextlib.redirect_stdout(io.StringIO()):
+                ChargerModel(400, 0.9, 160)
+        return build
+
+    def queries(method):
+        def setup():
+            charger = fixtures.charger()
+            rng = np.random.default_rng(fixtures.seed)
+            initial = rng.uniform(0.1, 0.6, CHARGER_QUERIES).tolist()
+            second = rng.uniform(0, 3600, CHARGER_QUERIES).tolist() if method == "query_final_soc" \
+                else rng.uniform(0.6, 0.95, CHARGER_QUERIES).tolist()
+            query = getattr(charger, method)
+
+            def run():
+                for a, b in zip(initial, second):
+                    query(a, b)
+            return run
+        return setup
+
+    yield Benchmark("charger.construction", "charger", construction)
+    yield Benchmark(f"charger.query_final_soc_{CHARGER_QUERIES}", "charger", queries("query_final_soc"))
+    yield Benchmark(f"charger.query_charging_time_{CHARGER_QUERIES}", "charger", queries("query_charging_time"))
+
+
+def itinerary_benchmarks(fixtures):
+    def queries(cold):
+        def setup():
+            network = fixtures.synthetic_network(ITINERARY_VERTIPORTS)
+            rng = np.random.default_rng(fixtures.seed)
+            ids = network.vertiport_ids
+            origin = rng.integers(0, len(ids), ITINERARY_QUERIES)
+            destination = (origin + rng.integers(1, len(ids), ITINERARY_QUERIES)) % len(ids)
+            pairs = [(ids[o], ids[d]) for o, d in zip(origin, destination)]
+
+            def run():
+                if cold:
+                    network.invalidate_itineraries()
+                for o, d in pairs:
+                    network.compute_itinerary(o, d)
+            return run
+        return setup
+
+    yield Benchmark(f"itinerary.cold_n{ITINERARY_VERTIPORTS}_{ITINERARY_QUERIES}", "itinerary", queries(cold=True))
+    yield Benchmark(f"itinerary.warm_n{ITINERARY_VERTIPORTS}_{ITINERARY_QUERIES}", "itinerary", queries(cold=False))
+
+
+def check_demand_benchmarks(fixtures):
+    from models.passenger import Passenger
+
+    def queue(size):
+        def setup():
+            network = fixtures.network()
+            vertiports = list(network.vertiports.values())
+            vertiport, destinations = vertiports[0], vertiports[1:] or vertiports
+            rng = np.random.default_rng(fixtures.seed)
+            passengers = []
+            for i in range(size):
+                passenger = Passenger(network.env, network, i, [vertiport.vertiport_id])
+                passenger.origin = vertiport
+                passenger.destination = destinations[i % len(destinations)]
+                passenger.wait_time = float(rng.uniform(0, 1800))
+                passengers.append(passenger)
+
+            def run():
+                vertiport.passengers = passengers
+                try:
+                    vertiport.check_demand()
+                finally:
+                    vertiport.passengers = []
+            return run
+        return setup
+
+    for size in QUEUE_SIZES:
+        yield Benchmark(f"check_demand.queue_{size}", "check_demand", queue(size), number=max(1, 10000 // size))
+
+
+MICRO_BENCHMARKS = (mission_profile_benchmarks, charger_benchmarks, itinerary_benchmarks, check_demand_benchmarks)
+
+
+def measure(benchmark, function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(benchmark.number):
+            function()
+        times.append((time.perf_counter() - start) / benchmark.number)
+
+    # memory of one extra call, tracemalloc would distort the timings
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "name": benchmark.name,
+        "group": benchmark.group,
+        "repeat": repeat,
+        "number": benchmark.number,
+        "times_s": times,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "memory_mb": peak / 2**20,
+        "memory_kind": "traced_peak",
+    }
+
+
+def run_full_day(fixtures, aircraft, repeat, start_time, end_time, update_interval):
+    """Full-day fast-mode run of a synthetic network, in a fresh process per repeat (peak RSS of the run only)."""
+    from scaling_benchmark import run_size
+
+    vertiports = max(2, aircraft // AIRCRAFT_PER_VERTIPORT)
+    paths = fixtures.synthetic_paths(vertiports)
+    context = multiprocessing.get_context("spawn")
+
+    runs = []
+    for _ in range(repeat):
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(run_size, (paths, start_time, end_time, update_interval, "ERROR")))
+
+    times = [run["run_s"] for run in runs]
+    return {
+        "name": f"full_day.aircraft_{aircraft}",
+        "group": "full_day",
+        "repeat": repeat,
+        "number": 1,
+        "times_s": times,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "memory_mb": max(run["peak_mb"] for run in runs) if runs[0]["peak_mb"] is not None else None,
+        "memory_kind": "peak_rss",
+        "setup_s": statistics.median(run["setup_s"] for run in runs),
+        "events": runs[0]["events"],
+        "vertiports": runs[0]["vertiports"],
+        "aircraft": runs[0]["aircraft"],
+        "passengers_served": runs[0]["passengers_served"],
+    }
+
+
+def selected(name, only):
+    return not only or any(pattern in name for pattern in only)
+
+
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(args):
+    fixtures = Fixtures(seed=args.seed)
+    results = []
+
+    for benchmarks in MICRO_BENCHMARKS:
+        for benchmark in benchmarks(fixtures):
+            if not selected(benchmark.name, args.only):
+                continue
+            print(f"running {benchmark.name}")
+            function = benchmark.setup()
+            function()  # warm-up (imports, caches of the libraries)
+            results.append(measure(benchmark, function, args.repeat))
+
+    for aircraft in args.fleets:
+        name = f"full_day.aircraft_{aircraft}"
+        if not selected(name, args.only):
+            continue
+        print(f"running {name}")
+        results.append(run_full_day(fixtures, aircraft, args.run_repeat, args.start, args.end, args.update_interval))
+
+    report = {"environment": environment_info(), "results": results}
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    df = pd.DataFrame(results)[["name", "min_s", "median_s", "mean_s", "memory_mb", "memory_kind"]]
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.6f}"))
+    print(f"results written to {args.output}")
+    return report
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Median time and memory of the benchmarks present in both reports.
+
+    :param baseline: report dict (or path of its JSON file)
+    :param current: report dict (or path of its JSON file)
+    :param threshold: relative growth flagged as a regression
+    :return: DataFrame (one row per benchmark, regression flag)
+    """
+    reports = []
+    for report in (baseline, current):
+        if isinstance(report, str):
+            with open(report) as f:
+                report = json.load(f)
+        reports.append({result["name"]: result for result in report["results"]})
+    baseline, current = reports
+
+    rows = []
+    for name in baseline.keys() & current.keys():
+        before, after = baseline[name], current[name]
+        time_ratio = after["median_s"] / before["median_s"] if before["median_s"] else np.nan
+        memory_ratio = np.nan
+        if before.get("memory_mb") and after.get("memory_mb") is not None:
+            memory_ratio = after["memory_mb"] / before["memory_mb"]
+        rows.append({
+            "name": name,
+            "baseline_s": before["median_s"],
+            "current_s": after["median_s"],
+            "time_ratio": time_ratio,
+            "baseline_mb": before.get("memory_mb"),
+            "current_mb": after.get("memory_mb"),
+            "memory_ratio": memory_ratio,
+            "time_regression": bool(time_ratio > 1 + threshold),
+            "memory_regression": bool(memory_ratio > 1 + threshold),
+        })
+
+    df = pd.DataFrame(rows, columns=["name", "baseline_s", "current_s", "time_ratio", "baseline_mb", "current_mb",
+                                     "memory_ratio", "time_regression", "memory_regression"])
+    df["regression"] = df["time_regression"] | df["memory_regression"]
+    return df.sort_values("name", ignore_index=True)
+
+
+def print_comparison(df, threshold):
+    print(df.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    regressions = df[df["regression"]]
+    if regressions.empty:
+        print(f"no regressions (threshold {threshold:.0%})")
+    else:
+        print(f"{len(regressions)} regression(s) above {threshold:.0%}: {', '.join(regressions['name'])}")
+    return regressions.empty
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the performance benchmark suite or compare two result files.")
+    subparsers = parser.add_subparsers(dest="mode", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--only", nargs="+", default=None, help="run the benchmarks whose name contains one of these")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed repeats of the micro benchmarks")
+    run_parser.add_argument("--run-repeat", type=int, default=1, help="repeats of the full-day runs")
+    run_parser.add_argument("--fleets", type=int, nargs="+", default=list(FULL_DAY_FLEETS),
+                            help="aircraft of the full-day runs")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--start", type=int, default=0, help="simulation start time in seconds")
+    run_parser.add_argument("--end", type=int, default=22*3600, help="simulation end time in seconds")
+    run_parser.add_argument("--update-interval", type=int, default=120)
+    run_parser.add_argument("--output", default=os.path.join(
+        OUTPUT_PATH, f"benchmark_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.json"))
+    run_parser.add_argument("--compare", default=None, help="baseline result file to compare the new results with")
+    run_parser.add_argument("--threshold", type=float, default=0.10, help="relative growth flagged as a regression")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="relative growth flagged as a regression")
+
+    args = parser.parse_args()
+
+    if args.mode == "run":
+        report = run_suite(args)
+        if args.compare is None:
+            return
+        df = compare(args.compare, report, args.threshold)
+    else:
+        df = compare(args.baseline, args.current, args.threshold)
+
+    if not print_comparison(df, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
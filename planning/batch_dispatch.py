@@ -0,0 +1,275 @@
+"""
+Receding-horizon batch dispatch optimizer.
+
+Every solve_interval seconds the optimizer collects the queued passengers, the forecast arrivals
+(ArrivalRateEstimator) and the aircraft supply per vertiport (parked, charging and inbound with their
+ETA/SoC) and solves a small assignment MILP with scipy's HiGHS backend over a short horizon split
+into slots. Only the decisions of the first slot are executed immediately, the rest of the plan is
+executed on the following decision epochs until the next solve.
+
+Solves are bounded by a wall-clock time budget. If scipy is unavailable, the solver fails or no
+feasible solution is found within the budget, the static policy takes over until the next solve.
+"""
+
+import logging
+import math
+import time
+
+import numpy as np
+
+from planning.dispatch_policy import DispatchPolicy, DispatchAction, StaticPolicy, ArrivalRateEstimator
+
+try:
+    from scipy.optimize import milp, LinearConstraint, Bounds
+    from scipy.sparse import csr_array
+except ImportError:  # optimizer falls back to the static policy
+    milp = None
+
+logger = logging.getLogger(__name__)
+
+
+class BatchDispatchOptimizer(DispatchPolicy):
+    name = "batch_milp"
+
+    def __init__(self, solve_interval=600, horizon=1800, slot_length=300, time_budget=0.5,
+                 passenger_threshold=4, max_wait_time=600, empty_seat_cost=300, flight_cost=300,
+                 overdue_cost=1e5, ready_soc=0.8, turnaround_time=600, time_constant=1800, **kwargs):
+        """
+        :param solve_interval: seconds between MILP solves
+        :param horizon: optimization horizon in seconds
+        :param slot_length: length of a departure slot in seconds
+        :param time_budget: wall-clock limit of a single solve in seconds
+        :param passenger_threshold: threshold of the fallback static policy
+        :param max_wait_time: passengers waiting longer than this must be dispatched in the first slot
+        :param empty_seat_cost: cost of one empty seat, in passenger waiting seconds
+        :param flight_cost: fixed cost of one flight, in passenger waiting seconds
+        :param overdue_cost: penalty for not dispatching an overdue group in the first slot
+        :param ready_soc: inbound aircraft arriving below this SoC need turnaround_time before the next flight
+        :param turnaround_time: charging time assumed before a low SoC or charging aircraft is ready
+        :param time_constant: smoothing time constant of the arrival-rate forecast
+        """
+        super().__init__(**kwargs)
+        self.solve_interval = solve_interval
+        self.num_slots = max(1, int(math.ceil(horizon / slot_length)))
+        self.slot_length = slot_length
+        self.time_budget = time_budget
+        self.max_wait_time = max_wait_time
+        self.empty_seat_cost = empty_seat_cost
+        self.flight_cost = flight_cost
+        self.overdue_cost = overdue_cost
+        self.ready_soc = ready_soc
+        self.turnaround_time = turnaround_time
+
+        self.estimator = ArrivalRateEstimator(time_constant=time_constant)
+        self.fallback = StaticPolicy(passenger_threshold=passenger_threshold, max_wait_time=max_wait_time)
+
+        self.plan = []  # pending (departure time, origin, destination, flights, passengers)
+        self.next_solve_time = None
+        self.fallback_active = False
+        self.solve_log = []  # one record per solve (wall time, status, problem size, ...)
+
+    def skip(self, time):
+        self.estimator.advance(time)  # the next solve is due at the first update after the idle period
+
+    def dispatch(self, snapshot):
+        self.estimator.update(snapshot)
+
+        if self.next_solve_time is None or snapshot.time >= self.next_solve_time:
+            self.next_solve_time = snapshot.time + self.solve_interval
+            self.fallback_active = not self.solve(snapshot)
+
+        if self.fallback_active:
+            return self.fallback.dispatch(snapshot)
+
+        return self.execute_plan(snapshot)
+
+    def execute_plan(self, snapshot):
+        """Pops the planned departures that are due and guarantees dispatch of overdue groups."""
+        dispatches = []
+        pending = []
+        due_groups = set()
+
+        for departure_time, origin, destination, flights, passengers in self.plan:
+            if departure_time > snapshot.time:
+                pending.append((departure_time, origin, destination, flights, passengers))
+                continue
+
+            queue = snapshot.vertiports[origin].queues.get(destination)
+            if queue is None:
+                continue  # planned for forecast demand that did not show up
+
+            # the plan sizes flights on forecast arrivals, board whoever is actually queued
+            due_groups.add((origin, destination))
+            remaining = min(queue.count, flights * snapshot.seat_capacity)
+            for _ in range(flights):
+                if remaining <= 0:
+                    break
+                boarding = min(remaining, snapshot.seat_capacity)
+                dispatches.append(DispatchAction(origin, destination, boarding))
+                remaining -= boarding
+
+        self.plan = pending
+
+        for vertiport_id, state in snapshot.vertiports.items():
+            for destination, queue in state.queues.items():
+                if queue.max_wait_time >= self.max_wait_time and (vertiport_id, destination) not in due_groups:
+                    dispatches.append(DispatchAction(vertiport_id, destination, min(queue.count, snapshot.seat_capacity)))
+
+        return dispatches
+
+    def aircraft_supply(self, state, slot_times):
+        """Cumulative number of aircraft ready at the vertiport by each slot departure time."""
+        now = slot_times[0]
+        ready_times = [now] * state.available
+        ready_times += [now + self.turnaround_time] * (state.parked - state.available)
+
+        for eta, soc in state.inbound_etas:
+            ready_times.append(eta if soc >= self.ready_soc else eta + self.turnaround_time)
+
+        ready_times = np.sort(np.array(ready_times, dtype=float))
+        return np.searchsorted(ready_times, slot_times, side="right")
+
+    def solve(self, snapshot):
+        """
+        Solves the assignment MILP and stores the plan.
+
+        Variables per group g=(origin, destination) and slot k: flights f[g,k] (integer),
+        boarded passengers p[g,k] (continuous) and an overdue slack u[g] per group.
+        min  sum (seats*c_seat + c_flight) f - sum ((K-k)*slot + c_seat) p + c_overdue u
+        s.t. p[g,k] <= seats f[g,k]                                  (seat capacity)
+             sum_{j<=k} p[g,j] <= queued_g + forecast_g(t_k)         (passengers present)
+             sum_{g from v} sum_{j<=k} f[g,j] <= supply_v(t_k)       (aircraft ready)
+             f[g,0] + u[g] >= 1 for groups with an overdue passenger (max wait time)
+
+        :return: True if a plan was stored, False if the fallback policy should be used
+        """
+        wall_start = time.perf_counter()
+        record = {"time": snapshot.time, "wall_time": 0.0, "status": None, "message": "",
+                  "n_variables": 0, "n_constraints": 0, "objective": np.nan, "fallback": True}
+
+        num_slots = self.num_slots
+        seats = snapshot.seat_capacity
+        slot_offsets = np.arange(num_slots) * self.slot_length
+        slot_times = snapshot.time + slot_offsets
+
+        groups = []
+        for vertiport_id, state in snapshot.vertiports.items():
+            destinations = set(state.queues) | {dst for dst in state.arrivals
+                                                if self.estimator.rates.get((vertiport_id, dst), 0) > 0}
+            groups.extend((vertiport_id, dst) for dst in sorted(destinations))
+
+        if milp is None:
+            record["message"] = "scipy.optimize.milp unavailable"
+            return self.finish_solve(record, wall_start)
+
+        if not groups:
+            self.plan = []
+            record.update(status=0, message="no demand", fallback=False)
+            return self.finish_solve(record, wall_start)
+
+        num_groups = len(groups)
+        num_flight_vars = num_groups * num_slots
+        num_variables = 2 * num_flight_vars + num_groups
+
+        def f_index(g, k):
+            return g * num_slots + k
+
+        def p_index(g, k):
+            return num_flight_vars + g * num_slots + k
+
+        def u_index(g):
+            return 2 * num_flight_vars + g
+
+        cost = np.zeros(num_variables)
+        cost[:num_flight_vars] = seats * self.empty_seat_cost + self.flight_cost
+        for g in range(num_groups):
+            for k in range(num_slots):
+                cost[p_index(g, k)] = -((num_slots - k) * self.slot_length + self.empty_seat_cost)
+            cost[u_index(g)] = self.overdue_cost
+
+        supply = {vertiport_id: self.aircraft_supply(state, slot_times)
+                  for vertiport_id, state in snapshot.vertiports.items()}
+
+        # constraint matrix as (row, column, value) triplets - each row touches a few variables only
+        row_indices, column_indices, values, lower, upper = [], [], [], [], []
+
+        def add_row(coefficients, lb, ub):
+            for index, value in coefficients:
+                row_indices.append(len(lower))
+                column_indices.append(index)
+                values.append(value)
+            lower.append(lb)
+            upper.append(ub)
+
+        for g, (origin, destination) in enumerate(groups):
+            queue = snapshot.vertiports[origin].queues.get(destination)
+            queued = queue.count if queue else 0
+            rate = self.estimator.rates.get((origin, destination), 0.0)
+
+            for k in range(num_slots):
+                add_row([(p_index(g, k), 1.0), (f_index(g, k), -seats)], -np.inf, 0.0)
+                add_row([(p_index(g, j), 1.0) for j in range(k + 1)], -np.inf, queued + rate * slot_offsets[k])
+
+            if queue is not None and queue.max_wait_time >= self.max_wait_time:
+                add_row([(f_index(g, 0), 1.0), (u_index(g), 1.0)], 1.0, np.inf)
+
+        for vertiport_id in snapshot.vertiports:
+            group_ids = [g for g, (origin, _) in enumerate(groups) if origin == vertiport_id]
+            if not group_ids:
+                continue
+            for k in range(num_slots):
+                add_row([(f_index(g, j), 1.0) for g in group_ids for j in range(k + 1)],
+                        -np.inf, float(supply[vertiport_id][k]))
+
+        upper_bounds = np.full(num_variables, np.inf)
+        upper_bounds[2 * num_flight_vars:] = 1.0
+        integrality = np.zeros(num_variables)
+        integrality[:num_flight_vars] = 1
+
+        record["n_variables"] = num_variables
+        record["n_constraints"] = len(lower)
+        matrix = csr_array((values, (row_indices, column_indices)), shape=(len(lower), num_variables))
+
+        try:
+            result = milp(
+                c=cost,
+                constraints=LinearConstraint(matrix, lower, upper),
+                integrality=integrality,
+                bounds=Bounds(np.zeros(num_variables), upper_bounds),
+                options={"time_limit": self.time_budget},
+            )
+        except Exception as e:
+            record["message"] = str(e)
+            return self.finish_solve(record, wall_start)
+
+        record["status"] = result.status
+        record["message"] = result.message
+        if result.x is None:
+            return self.finish_solve(record, wall_start)
+
+        record["objective"] = result.fun
+        record["fallback"] = False
+
+        flights = np.round(result.x[:num_flight_vars]).astype(int)
+        passengers = np.floor(result.x[num_flight_vars:2 * num_flight_vars] + 1e-6).astype(int)
+
+        self.plan = [
+            (slot_times[k], origin, destination, flights[f_index(g, k)], passengers[f_index(g, k)])
+            for g, (origin, destination) in enumerate(groups)
+            for k in range(num_slots)
+            if flights[f_index(g, k)] > 0
+        ]
+        return self.finish_solve(record, wall_start)
+
+    def finish_solve(self, record, wall_start):
+        record["wall_time"] = time.perf_counter() - wall_start
+        self.solve_log.append(record)
+
+        if record["fallback"]:
+            logger.warning(f"[{record['time']}] batch dispatch solve failed ({record['message']}), "
+                           f"using static policy until next solve")
+        else:
+            logger.info(f"[{record['time']}] batch dispatch solved in {record['wall_time']*1e3:.1f} ms "
+                        f"({record['n_variables']} variables, {record['n_constraints']} constraints)")
+
+        return not record["fallback"]
@@ -0,0 +1,206 @@
+"""
+Strategic deconfliction with 4D trajectory slot reservations.
+
+Every flight plan is cut into timed segments. Shared route segments are identified by their geometry,
+so routes flying the same waypoints compete for the same segment, and the take-off/landing phases are
+mapped to the approach volume of the vertiport. Approach volumes are reserved for the whole phase,
+route segments reserve their entry and exit times so aircraft keep an in-trail headway. Each segment or
+volume keeps its reservations in an IntervalIndex. At dispatch time the earliest departure for which
+every reservation of the trajectory is free (including a headway) is searched and the whole trajectory
+is reserved at once.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# flight phases flown inside the vertiport approach volume
+DEPARTURE_PHASES = ("idle", "hover_climb", "climb_transition")
+ARRIVAL_PHASES = ("descent_transition", "hover_descent")
+
+
+class IntervalIndex:
+    """
+    Reservations of a single segment. Reservations never overlap, so they are kept as two parallel
+    sorted lists of start and end times. Conflict lookups are a binary search on the end times and
+    only visit the intervals that actually block the requested window.
+    """
+
+    def __init__(self, headway):
+        self.headway = headway
+        self.starts = []
+        self.ends = []
+
+    def earliest_start(self, start, duration):
+        """Earliest time >= start at which [t, t+duration) keeps the headway to every reservation."""
+        i = bisect_right(self.ends, start - self.headway)
+        while i < len(self.starts) and self.starts[i] < start + duration + self.headway:
+            start = max(start, self.ends[i] + self.headway)
+            i += 1
+        return start
+
+    def reserve(self, start, end):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+
+    def release(self, start, end):
+        i = bisect_left(self.starts, start)
+        while i < len(self.starts) and self.starts[i] == start:
+            if self.ends[i] == end:
+                del self.starts[i]
+                del self.ends[i]
+                return
+            i += 1
+
+    def prune(self, now):
+        """Drops reservations that ended more than a headway before now."""
+        i = bisect_right(self.ends, now - self.headway)
+        if i:
+            del self.starts[:i]
+            del self.ends[:i]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class SegmentTime(NamedTuple):
+    key: tuple  # segment entry/exit or vertiport volume id
+    offset: float  # seconds after departure
+    duration: float
+
+
+class Reservation(NamedTuple):
+    aircraft_id: str
+    departure_time: float
+    segments: Tuple[Tuple[tuple, float, float], ...]  # (key, start, end)
+
+
+class StrategicDeconfliction:
+    def __init__(self, network, segment_headway=60, vertiport_headway=30, precision=4):
+        """
+        :param network: UAMNetwork instance
+        :param segment_headway: minimum time in seconds between two aircraft entering or leaving the same route segment
+        :param vertiport_headway: minimum time in seconds between two operations in a vertiport approach volume
+        :param precision: decimals of the lat/lon rounding that identifies shared waypoints
+        """
+        self.network = network
+        self.segment_headway = segment_headway
+        self.vertiport_headway = vertiport_headway
+        self.precision = precision
+
+        self.indexes = {}  # segment key → IntervalIndex
+        self.profiles = {}  # (origin, destination, vehicle) → tuple of SegmentTime
+
+        self.num_reservations = 0
+        self.num_delayed = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def trajectory(self, origin, destination, vehicle):
+        """Timed segments of the flight plan, compiled once per route and vehicle."""
+        profile_key = (origin, destination, vehicle)
+        if profile_key not in self.profiles:
+            flight_plan = self.network.airspaces[origin, destination].mission_profile[vehicle]
+            segments = []
+            offset = 0.0
+            previous = None
+
+            for waypoint in flight_plan[['latitude', 'longitude', 'altitude', 'time', 'phase']].itertuples(index=False):
+                point = (round(waypoint.latitude, self.precision), round(waypoint.longitude, self.precision), round(waypoint.altitude))
+                duration = float(waypoint.time)
+
+                if waypoint.phase in DEPARTURE_PHASES or waypoint.phase in ARRIVAL_PHASES:
+                    key = ("vertiport", origin if waypoint.phase in DEPARTURE_PHASES else destination)
+
+                    # the approach volume is occupied for the whole phase, consecutive phases are merged
+                    if segments and segments[-1].key == key:
+                        segments[-1] = segments[-1]._replace(duration=segments[-1].duration + duration)
+                    elif duration > 0:
+                        segments.append(SegmentTime(key, offset, duration))
+
+                elif duration > 0:
+                    # in-trail separation on route segments: entry and exit times keep the headway
+                    segments.append(SegmentTime(("entry", previous, point), offset, 0.0))
+                    segments.append(SegmentTime(("exit", previous, point), offset + duration, 0.0))
+
+                offset += duration
+                previous = point
+
+            self.profiles[profile_key] = tuple(segments)
+
+        return self.profiles[profile_key]
+
+    def index(self, key):
+        if key not in self.indexes:
+            headway = self.vertiport_headway if key[0] == "vertiport" else self.segment_headway
+            self.indexes[key] = IntervalIndex(headway)
+        return self.indexes[key]
+
+    def earliest_departure(self, segments, earliest_time):
+        """Earliest departure >= earliest_time for which every segment of the trajectory is free."""
+        departure = earliest_time
+        shifted = True
+        while shifted:
+            shifted = False
+            for segment in segments:
+                index = self.indexes.get(segment.key)
+                if index is None:
+                    continue
+                start = index.earliest_start(departure + segment.offset, segment.duration)
+                if start > departure + segment.offset:
+                    departure = start - segment.offset
+                    shifted = True
+                    break
+        return departure
+
+    def reserve(self, aircraft, origin, destination, earliest_time):
+        """
+        Reserves the earliest conflict-free trajectory of the aircraft on the route.
+
+        :return: Reservation
+        """
+        segments = self.trajectory(origin, destination, aircraft.vehicle)
+        for segment in segments:
+            self.index(segment.key).prune(earliest_time)
+
+        departure = self.earliest_departure(segments, earliest_time)
+        reserved = []
+        for segment in segments:
+            start = departure + segment.offset
+            end = start + segment.duration
+            self.indexes[segment.key].reserve(start, end)
+            reserved.append((segment.key, start, end))
+
+        delay = departure - earliest_time
+        self.num_reservations += 1
+        if delay > 0:
+            self.num_delayed += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+            logger.info(f"[{earliest_time}] {aircraft.aircraft_id} {origin}-{destination} departure deconflicted by {delay:.0f} s")
+
+        return Reservation(aircraft.aircraft_id, departure, tuple(reserved))
+
+    def release(self, reservation):
+        for key, start, end in reservation.segments:
+            index = self.indexes.get(key)
+            if index is not None:
+                index.release(start, end)
+
+    def reschedule(self, reservation, aircraft, origin, destination, earliest_time):
+        """Releases a reservation that can no longer be met and books the next conflict-free one."""
+        self.release(reservation)
+        self.num_reservations -= 1
+        return self.reserve(aircraft, origin, destination, earliest_time)
+
+    def get_statistics(self):
+        return {
+            "reservations": self.num_reservations,
+            "delayed": self.num_delayed,
+            "total_delay": self.total_delay,
+            "max_delay": self.max_delay,
+            "active_intervals": sum(len(index) for index in self.indexes.values()),
+        }
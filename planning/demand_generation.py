@@ -0,0 +1,225 @@
+"""
+Seeded, vectorized passenger demand generation.
+
+sample_demand draws a passenger schedule from a lambda matrix (expected arrivals per 15-minute slot and
+vertiport) and an optional OD probability matrix, and returns it as a DemandTable in the integer-seconds
+form the simulation consumes - fast enough to sample the demand of every replication.
+PoissonArrivalSource draws the same arrival model on the fly inside a running simulation (thinning of
+the time-varying rates), without a demand table or file.
+
+Every random quantity of every vertiport is drawn from its own np.random.Generator substream of one
+root SeedSequence: the arrival counts, the arrival times within the slot and the destinations of the
+passengers departing vertiport X never share draws with each other or with another vertiport. The
+substream of a (vertiport, quantity) pair is keyed by the vertiport id, not its position, so:
+
+- the same seed reproduces the same demand;
+- two configurations run with the same seed see identical demand (common random numbers), which
+  reduces the variance of their difference and needs fewer replications for the same confidence;
+- changing the rates of one vertiport, or adding a vertiport, leaves the draws of the others untouched.
+"""
+
+import zlib
+
+import numpy as np
+
+from utils.demand_utils import DemandTable, clock_to_seconds
+
+QUANTITIES = ("counts", "arrivals", "destinations")
+SLOT_LENGTH = 15 * 60  # lambda matrix time slot in seconds
+
+
+class DemandStreams:
+    def __init__(self, seed=None):
+        """
+        :param seed: int, SeedSequence (e.g. a spawned replication seed) or None for fresh entropy
+        """
+        self.root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.generators = {}
+
+    @property
+    def entropy(self):
+        """Root entropy - pass it as seed to reproduce a run started without one."""
+        return self.root.entropy
+
+    def generator(self, vertiport_id, quantity):
+        """Generator of one random quantity of one vertiport."""
+        key = (vertiport_id, quantity)
+        if key not in self.generators:
+            if quantity not in QUANTITIES:
+                raise ValueError(f"unknown demand quantity {quantity} - expected one of {QUANTITIES}")
+            vertiport_key = zlib.crc32(str(vertiport_id).encode())
+            sequence = np.random.SeedSequence(self.root.entropy,
+                                              spawn_key=(*self.root.spawn_key, vertiport_key, QUANTITIES.index(quantity)))
+            self.generators[key] = np.random.default_rng(sequence)
+        return self.generators[key]
+
+
+def od_cumulative(od_matrix, vertiport_ids):
+    """
+    Row-wise cumulative destination probabilities of an OD matrix, in vertiport_ids order.
+
+    :param od_matrix: DataFrame indexed by origin id with one column per destination id (missing pairs are 0)
+    :return: (V, V) array, rows of origins without any destination are all zero
+    """
+    probabilities = od_matrix.reindex(index=vertiport_ids, columns=vertiport_ids, fill_value=0.0).to_numpy(dtype=float, copy=True)
+    if (probabilities < 0).any():
+        raise ValueError("OD matrix has negative probabilities")
+    np.fill_diagonal(probabilities, 0.0)
+    cumulative = np.cumsum(probabilities, axis=1)
+    totals = cumulative[:, -1:]
+    return np.divide(cumulative, totals, out=np.zeros_like(cumulative), where=totals > 0)
+
+
+def sample_demand(lambda_df, vertiport_ids=None, od_matrix=None, seed=None, streams=None, slot_length=SLOT_LENGTH):
+    """
+    Samples passengers from a lambda matrix (expected arrivals per time slot and vertiport): Poisson counts per
+    slot, arrival seconds uniform within the slot and destinations drawn from the OD matrix (uniform over the
+    other vertiports without one). Every draw is an array operation per vertiport.
+
+    :param lambda_df: DataFrame with a time column (H:MM or seconds) and one rate column per vertiport
+    :param vertiport_ids: vertiport ids of the destination codes (default: the rate columns) - rate columns of
+        other vertiports are ignored
+    :param od_matrix: DataFrame of destination probabilities, indexed by origin id, one column per destination id
+    :param seed: seed of the DemandStreams (ignored if streams is given)
+    :param streams: DemandStreams to draw from
+    :param slot_length: seconds per lambda matrix row
+    :return: DemandTable (integer arrival seconds, sorted)
+    """
+    streams = streams or DemandStreams(seed)
+    if vertiport_ids is None:
+        vertiport_ids = [column for column in lambda_df.columns if column != "time"]
+    vertiport_ids = list(vertiport_ids)
+    slot_start = clock_to_seconds(lambda_df["time"])
+    cumulative = od_cumulative(od_matrix, vertiport_ids) if od_matrix is not None else None
+
+    arrivals, origins, destinations = [], [], []
+    for code, vertiport_id in enumerate(vertiport_ids):
+        if vertiport_id not in lambda_df.columns:
+            continue
+        counts = streams.generator(vertiport_id, "counts").poisson(lambda_df[vertiport_id].to_numpy(dtype=float))
+        total = int(counts.sum())
+        if total == 0:
+            continue
+
+        slot = np.repeat(np.arange(len(counts)), counts)
+        arrivals.append(slot_start[slot] + streams.generator(vertiport_id, "arrivals").integers(0, slot_length, total))
+        origins.append(np.full(total, code, dtype=np.int32))
+
+        rng = streams.generator(vertiport_id, "destinations")
+        if cumulative is None:
+            if len(vertiport_ids) < 2:
+                raise ValueError(f"no destination other than the origin {vertiport_id} - uniform destinations "
+                                 "need at least two vertiports")
+            # uniform over the other vertiports: draw from n-1 codes and skip the origin
+            destination = rng.integers(0, len(vertiport_ids) - 1, total)
+            destination += destination >= code
+        elif cumulative[code, -1] > 0:
+            destination = np.searchsorted(cumulative[code], rng.random(total), side="right")
+        else:
+            raise ValueError(f"OD matrix has no destination for origin {vertiport_id}")
+        destinations.append(destination.astype(np.int32))
+
+    if not arrivals:
+        return DemandTable(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                           np.zeros(0, dtype=np.int32), vertiport_ids)
+
+    arrival = np.concatenate(arrivals)
+    order = np.argsort(arrival, kind="stable")
+    return DemandTable(np.arange(len(arrival)), arrival[order], np.concatenate(origins)[order],
+                       np.concatenate(destinations)[order], vertiport_ids)
+
+
+class PoissonArrivalSource:
+    def __init__(self, lambda_df, od_matrix=None, seed=None, streams=None, slot_length=SLOT_LENGTH, periodic=True,
+                 first_passenger_id=None):
+        """
+        Streams passengers into a running simulation instead of replaying a demand file. Every vertiport of the
+        lambda matrix is a SimPy process drawing a non-homogeneous Poisson process by thinning: candidate arrivals
+        at the peak rate of the vertiport, each kept with probability rate(t) / peak rate. Nothing is stored
+        per passenger, so memory does not grow with the horizon.
+
+        Substreams per vertiport (see DemandStreams): "arrivals" for the candidate gaps, "counts" for the thinning
+        draws, "destinations" for the destinations.
+
+        :param lambda_df: DataFrame with a time column (H:MM or seconds, regular slots from 0:00) and one column of
+            expected arrivals per slot for each vertiport
+        :param od_matrix: DataFrame of destination probabilities, indexed by origin id, one column per destination id
+            (default: uniform over the other vertiports)
+        :param seed: seed of the DemandStreams (ignored if streams is given)
+        :param streams: DemandStreams to draw from
+        :param slot_length: seconds per lambda matrix row
+        :param periodic: repeat the lambda matrix after its last slot (multi-day runs), else stop there
+        :param first_passenger_id: id of the first generated passenger (None: ids are handed out by the simulation,
+            past the largest replayed passenger id and shared with its other sources)
+        """
+        slot_start = clock_to_seconds(lambda_df["time"])
+        if not np.array_equal(slot_start, np.arange(len(slot_start)) * slot_length):
+            raise ValueError(f"lambda matrix slots must be consecutive {slot_length} s slots starting at 0:00")
+
+        self.vertiport_ids = [column for column in lambda_df.columns if column != "time"]
+        self.rates = lambda_df[self.vertiport_ids].to_numpy(dtype=float) / slot_length  # arrivals per second
+        if (self.rates < 0).any():
+            raise ValueError("lambda matrix has negative rates")
+        self.od_matrix = od_matrix
+        self.streams = streams or DemandStreams(seed)
+        self.slot_length = slot_length
+        self.period = len(slot_start) * slot_length
+        self.periodic = periodic
+        self.next_passenger_id = first_passenger_id
+        self.generated = 0  # passengers handed to the simulation
+
+    def start(self, simulation):
+        """Starts one arrival process per vertiport of the lambda matrix that is part of the network."""
+        network_ids = simulation.network.vertiport_ids
+        cumulative = od_cumulative(self.od_matrix, network_ids) if self.od_matrix is not None else None
+
+        for column, vertiport_id in enumerate(self.vertiport_ids):
+            if vertiport_id not in simulation.network.vertiports:
+                continue
+            simulation.env.process(self.vertiport_arrivals(simulation, column, vertiport_id, network_ids, cumulative))
+
+    def rate(self, column, time):
+        """Arrival rate (per second) of one vertiport at a simulated time."""
+        if time >= self.period and not self.periodic:
+            return 0.0
+        return self.rates[int(time % self.period // self.slot_length), column]
+
+    def vertiport_arrivals(self, simulation, column, vertiport_id, network_ids, cumulative):
+        env = simulation.env
+        peak = self.rates[:, column].max()
+        if peak <= 0:
+            return
+
+        origin = network_ids.index(vertiport_id)
+        if cumulative is not None and cumulative[origin, -1] <= 0:
+            raise ValueError(f"OD matrix has no destination for origin {vertiport_id}")
+        if cumulative is None and len(network_ids) < 2:
+            raise ValueError(f"no destination other than the origin {vertiport_id} - uniform destinations "
+                             "need at least two vertiports")
+        gaps = self.streams.generator(vertiport_id, "arrivals")
+        thinning = self.streams.generator(vertiport_id, "counts")
+        destinations = self.streams.generator(vertiport_id, "destinations")
+        horizon = simulation.end_time if self.periodic else min(simulation.end_time, self.period)
+
+        time = env.now
+        while True:
+            time += gaps.exponential(1 / peak)
+            if time > horizon:
+                return
+            if thinning.random() * peak >= self.rate(column, time):
+                continue  # candidate thinned out, no event is scheduled
+
+            yield env.timeout(time - env.now)
+            if cumulative is None:
+                destination = int(destinations.integers(0, len(network_ids) - 1))
+                destination += destination >= origin
+            else:
+                destination = int(np.searchsorted(cumulative[origin], destinations.random(), side="right"))
+
+            if self.next_passenger_id is None:
+                passenger_id = simulation.new_passenger_id()
+            else:
+                passenger_id = self.next_passenger_id
+                self.next_passenger_id += 1
+            self.generated += 1
+            simulation.process_passenger_arrival(passenger_id, vertiport_id, network_ids[destination])
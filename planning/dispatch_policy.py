@@ -0,0 +1,278 @@
+"""
+Dispatch policies for the scheduler.
+
+The scheduler builds a compact DispatchSnapshot of passenger queues and fleet supply at every
+decision epoch and hands it to a policy. The policy returns a PolicyDecision with the dispatch and
+reposition actions to execute. Policies never touch passengers or aircraft objects directly, which
+keeps them cheap to evaluate and easy to swap.
+"""
+
+import math
+from typing import NamedTuple, Dict, List, Tuple
+
+
+class QueueState(NamedTuple):
+    """Waiting passengers at a vertiport for a single next-hop destination."""
+    destination: str
+    count: int
+    max_wait_time: float
+
+
+class VertiportState(NamedTuple):
+    """Per-vertiport view of demand and supply at the decision epoch."""
+    vertiport_id: str
+    queues: Dict[str, QueueState]  # destination id → queue
+    available: int  # flight ready aircraft parked at the vertiport
+    charging: int  # parked aircraft still charging
+    parked: int  # all aircraft parked at the vertiport
+    inbound: int  # aircraft flying toward the vertiport
+    target: int  # initial aircraft allocation (rebalancing target)
+    arrivals: Dict[str, int]  # destination id → cumulative passenger arrivals
+    inbound_etas: Tuple[Tuple[float, float], ...]  # (eta, expected soc) of inbound aircraft
+
+
+class DispatchSnapshot(NamedTuple):
+    time: float
+    vertiports: Dict[str, VertiportState]
+    predecessors: Dict[str, Tuple[str, ...]]  # node id → vertiports with an edge into the node
+    seat_capacity: int
+
+
+class DispatchAction(NamedTuple):
+    origin: str
+    destination: str
+    num_passengers: int
+
+
+class RepositionAction(NamedTuple):
+    origin: str
+    destination: str
+
+
+class PolicyDecision(NamedTuple):
+    dispatches: List[DispatchAction]
+    repositions: List[RepositionAction]
+
+
+class DispatchPolicy:
+    """
+    Base class for dispatch policies.
+
+    Subclasses implement dispatch(snapshot). Vehicle repositioning defaults to the deficit/surplus
+    rebalancing heuristic and can be overridden per policy.
+    """
+    name = "base"
+
+    def __init__(self, reposition_buffer=0.4, supply_buffer=0.7):
+        """
+        :param reposition_buffer: a node is in deficit when its supply is at or below this share of its target
+        :param supply_buffer: a neighbor only supports a deficit node if its supply is above this share of its target
+        """
+        self.reposition_buffer = reposition_buffer
+        self.supply_buffer = supply_buffer
+
+    def decide(self, snapshot):
+        dispatches = self.dispatch(snapshot)
+        repositions = self.reposition(snapshot, dispatches)
+        return PolicyDecision(dispatches, repositions)
+
+    def dispatch(self, snapshot):
+        raise NotImplementedError
+
+    def skip(self, time):
+        """
+        Called by the simulation for updates skipped while the system was idle (no passengers, flights or
+        charging), with the time of the last skipped update. Policies with time-dependent state catch up here.
+        """
+        pass
+
+    def reposition(self, snapshot, dispatches=()):
+        """
+        Rebalances aircraft from the neighbor with the largest surplus toward nodes in deficit.
+        Aircraft already committed by the dispatch actions are not offered for repositioning.
+        """
+        vertiports = snapshot.vertiports
+        available = {node_id: state.available for node_id, state in vertiports.items()}
+        for action in dispatches:
+            available[action.origin] -= 1
+
+        node_supply = {node_id: state.parked + state.inbound for node_id, state in vertiports.items()}
+
+        deficit_nodes = sorted(
+            ((node_id, node_supply[node_id] - state.target) for node_id, state in vertiports.items()
+             if node_supply[node_id] <= round(state.target * self.reposition_buffer)),
+            key=lambda x: x[1])  # most negative = worst deficit
+
+        repositions = []
+        for dst_id, _ in deficit_nodes:
+            best_source = None
+            best_score = -float("inf")
+
+            for src_id in snapshot.predecessors.get(dst_id, ()):
+                src_target = vertiports[src_id].target
+                if node_supply[src_id] <= round(self.supply_buffer * src_target):
+                    continue
+
+                score = node_supply[src_id] - src_target
+                if available[src_id] > 0 and score > best_score:
+                    best_score = score
+                    best_source = src_id
+
+            if best_source is not None:
+                available[best_source] -= 1
+                repositions.append(RepositionAction(best_source, dst_id))
+
+        return repositions
+
+
+class StaticPolicy(DispatchPolicy):
+    """Dispatches one aircraft per group once the passenger threshold or the maximum wait time is reached."""
+    name = "static"
+
+    def __init__(self, passenger_threshold=4, max_wait_time=600, **kwargs):
+        super().__init__(**kwargs)
+        self.passenger_threshold = passenger_threshold
+        self.max_wait_time = max_wait_time
+
+    def dispatch(self, snapshot):
+        dispatches = []
+        for vertiport_id, state in snapshot.vertiports.items():
+            for destination, queue in state.queues.items():
+                if queue.count >= self.passenger_threshold or queue.max_wait_time >= self.max_wait_time:
+                    dispatches.append(DispatchAction(vertiport_id, destination,
+                                                     min(queue.count, snapshot.seat_capacity)))
+        return dispatches
+
+
+class LoadFactorPolicy(DispatchPolicy):
+    """
+    Dispatches when the expected load factor reaches a target that decays linearly with the wait time
+    of the oldest passenger. Large queues are split over several aircraft when enough are available.
+    """
+    name = "load_factor"
+
+    def __init__(self, target_load_factor=0.75, max_wait_time=600, **kwargs):
+        super().__init__(**kwargs)
+        self.target_load_factor = target_load_factor
+        self.max_wait_time = max_wait_time
+
+    def dispatch(self, snapshot):
+        dispatches = []
+        seats = snapshot.seat_capacity
+
+        for vertiport_id, state in snapshot.vertiports.items():
+            available = state.available
+            for destination, queue in state.queues.items():
+                required = self.target_load_factor * max(0.0, 1 - queue.max_wait_time / self.max_wait_time)
+                remaining = queue.count
+
+                # always attempt the first dispatch, later ones only while aircraft remain
+                while remaining > 0 and remaining / seats >= required:
+                    boarding = min(remaining, seats)
+                    dispatches.append(DispatchAction(vertiport_id, destination, boarding))
+                    remaining -= boarding
+                    available -= 1
+                    if available <= 0:
+                        break
+
+        return dispatches
+
+
+class ArrivalRateEstimator:
+    """Exponentially smoothed passenger arrival rate per (origin, destination) from cumulative counts."""
+
+    def __init__(self, time_constant=1800):
+        """
+        :param time_constant: smoothing time constant in seconds
+        """
+        self.time_constant = time_constant
+        self.rates = {}  # (origin, destination) → passengers per second
+        self._last_counts = {}
+        self._last_time = None
+
+    def update(self, snapshot):
+        if self._last_time is None:
+            elapsed = 0
+        else:
+            elapsed = snapshot.time - self._last_time
+
+        if elapsed > 0:
+            alpha = 1 - math.exp(-elapsed / self.time_constant)
+            for vertiport_id, state in snapshot.vertiports.items():
+                for destination, count in state.arrivals.items():
+                    key = (vertiport_id, destination)
+                    observed = (count - self._last_counts.get(key, 0)) / elapsed
+                    self.rates[key] = alpha * observed + (1 - alpha) * self.rates.get(key, observed)
+
+        for vertiport_id, state in snapshot.vertiports.items():
+            for destination, count in state.arrivals.items():
+                self._last_counts[(vertiport_id, destination)] = count
+
+        self._last_time = snapshot.time
+        return self.rates
+
+    def advance(self, time):
+        """Decays the rates to time as a sequence of updates without arrivals would."""
+        if self._last_time is None or time <= self._last_time:
+            return
+
+        decay = math.exp(-(time - self._last_time) / self.time_constant)
+        for key in self.rates:
+            self.rates[key] *= decay
+        self._last_time = time
+
+    def expected_arrivals(self, origin, destination, duration):
+        """Expected arrivals within duration seconds, or None before the first rate observation."""
+        rate = self.rates.get((origin, destination))
+        if rate is None:
+            return None
+        return rate * duration
+
+
+class LookaheadPolicy(DispatchPolicy):
+    """
+    Static thresholds plus a short lookahead on the estimated arrival rate. A group below the passenger
+    threshold is dispatched early when the forecast says the aircraft will not fill before the oldest
+    passenger reaches the maximum wait time, so holding would only add waiting without adding load.
+    """
+    name = "lookahead"
+
+    def __init__(self, passenger_threshold=4, max_wait_time=600, horizon=900, time_constant=1800, **kwargs):
+        """
+        :param horizon: lookahead window in seconds
+        :param time_constant: smoothing time constant of the arrival-rate estimate in seconds
+        """
+        super().__init__(**kwargs)
+        self.passenger_threshold = passenger_threshold
+        self.max_wait_time = max_wait_time
+        self.horizon = horizon
+        self.estimator = ArrivalRateEstimator(time_constant=time_constant)
+
+    def skip(self, time):
+        self.estimator.advance(time)
+
+    def dispatch(self, snapshot):
+        self.estimator.update(snapshot)
+        dispatches = []
+
+        for vertiport_id, state in snapshot.vertiports.items():
+            for destination, queue in state.queues.items():
+                boarding = min(queue.count, snapshot.seat_capacity)
+
+                if queue.count >= self.passenger_threshold or queue.max_wait_time >= self.max_wait_time:
+                    dispatches.append(DispatchAction(vertiport_id, destination, boarding))
+                    continue
+
+                slack = min(self.max_wait_time - queue.max_wait_time, self.horizon)
+                expected = self.estimator.expected_arrivals(vertiport_id, destination, slack)
+                if expected is not None and queue.count + expected < self.passenger_threshold:
+                    dispatches.append(DispatchAction(vertiport_id, destination, boarding))
+
+        return dispatches
+
+
+POLICIES = {
+    StaticPolicy.name: StaticPolicy,
+    LoadFactorPolicy.name: LoadFactorPolicy,
+    LookaheadPolicy.name: LookaheadPolicy,
+}
@@ -22,16 +22,21 @@ VTOL_VERTICAL_SPEED = 2 # assume 2 m/s vertical speed
 TRANSITION_HORIZONTAL_SPEED = 20 # assume 20 m/s horizontal speed at the end of transition
 TRANSITION_VERTICAL_SPEED = 2 # assume 2 m/s vertical speed at the end of transition
 
-def create_mission_profile(nodes_df, edges_df, save_result=True):
-
-    aircraft_params = pd.read_csv(os.path.join(PARAM_PATH, 'evtol_spec.csv'), index_col=0)
+def create_mission_profile(nodes_df, edges_df, save_result=True, scenario=None):
+    """
+    :param scenario: preloaded Scenario - its waypoints and vehicle specifications are used instead of reading the input files
+    :return: dict[waypoint file name][vehicle] = flight profile DataFrame
+    """
+    if scenario is not None:
+        aircraft_params = scenario.specification
+        waypoints = scenario.waypoints
+    else:
+        aircraft_params = pd.read_csv(os.path.join(PARAM_PATH, 'evtol_spec.csv'), index_col=0)
+        waypoints = {name: pd.read_csv(os.path.join(WAYPOINT_PATH, name+'.csv')) for name in edges_df['waypoints'].unique()}
 
     mission_profile = {}
-    # for each edge, for each aircrafts, create a mission profile
-    for _, row in edges_df.iterrows():
-        waypoint_file = os.path.join(WAYPOINT_PATH, row['waypoints']+'.csv')
-        wp = pd.read_csv(waypoint_file)
-
+    # for each waypoint file, for each aircrafts, create a mission profile
+    for wp_name, wp in waypoints.items():
         for aircraft in aircraft_params.columns:
             param = aircraft_params[aircraft].to_dict()
 
@@ -39,11 +44,11 @@ def create_mission_profile(nodes_df, edges_df, save_result=True):
             # Aircraft must be LPC
 
             mission_profile_df = flight_profile(wp, param)
-            file_name = row['waypoints']+'_'+aircraft+'.csv'
+            file_name = wp_name+'_'+aircraft+'.csv'
             if save_result:
                 mission_profile_df.to_csv(os.path.join(OUTPUT_PATH, file_name))
 
-            mission_profile[row["waypoints"]] = {aircraft: mission_profile_df}
+            mission_profile.setdefault(wp_name, {})[aircraft] = mission_profile_df
 
     return mission_profile
 
@@ -0,0 +1,185 @@
+"""
+Timed network disruptions.
+
+A schedule file lists vertiport closures, route closures (e.g. weather) and route capacity changes:
+
+    time,event,origin,destination,value
+    8:00:00,route_closure,UCB,UCD,
+    9:30:00,route_reopening,UCB,UCD,
+    12:00:00,capacity_change,UCD,UCB,2
+    17:00:00,vertiport_closure,UCD,,
+
+Events are applied incrementally: the graph edges and itinerary cache entries of the affected routes
+are updated, departures still queued on a closed route are cancelled, and only passengers whose
+remaining itinerary uses a closed route are re-routed. Passengers without an alternative wait at
+their vertiport until the route reopens.
+"""
+
+import logging
+from typing import NamedTuple, Optional
+
+import networkx as nx
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = ("vertiport_closure", "vertiport_reopening", "route_closure", "route_reopening", "capacity_change")
+
+
+class NetworkEvent(NamedTuple):
+    time: float
+    event: str
+    origin: str  # vertiport id for vertiport events
+    destination: Optional[str]
+    value: Optional[float]  # new capacity of capacity_change events
+
+
+def load_network_events(path):
+    """
+    Reads a network event schedule (time as seconds or HH:MM:SS).
+
+    :return: list of NetworkEvent sorted by time
+    """
+    df = pd.read_csv(path)
+    events = []
+    for row in df.to_dict("records"):
+        if row["event"] not in EVENT_TYPES:
+            raise ValueError(f"unknown network event {row['event']} - expected one of {EVENT_TYPES}")
+
+        time = row["time"]
+        if isinstance(time, str) and ":" in time:
+            h, m, s = map(int, time.split(":"))
+            time = h * 3600 + m * 60 + s
+
+        destination = row.get("destination")
+        value = row.get("value")
+        events.append(NetworkEvent(
+            time=float(time),
+            event=row["event"],
+            origin=row["origin"],
+            destination=None if pd.isna(destination) else destination,
+            value=None if pd.isna(value) else float(value),
+        ))
+
+    return sorted(events, key=lambda event: event.time)
+
+
+class NetworkEventManager:
+    def __init__(self, env, network, events):
+        """
+        :param env: SimPy environment
+        :param network: UAMNetwork instance
+        :param events: list of NetworkEvent (see load_network_events)
+        """
+        self.env = env
+        self.network = network
+        self.events = sorted(events, key=lambda event: event.time)
+        self.event_log = []  # one record per applied event
+
+    @classmethod
+    def from_file(cls, env, network, path):
+        return cls(env, network, load_network_events(path))
+
+    def validate(self):
+        for event in self.events:
+            if event.origin not in self.network.vertiports:
+                raise ValueError(f"network event {event}: unknown vertiport {event.origin}")
+            if event.event in ("route_closure", "route_reopening", "capacity_change") \
+                    and (event.origin, event.destination) not in self.network.airspaces:
+                raise ValueError(f"network event {event}: unknown route {(event.origin, event.destination)}")
+            if event.event == "capacity_change" and event.value is None:
+                raise ValueError(f"network event {event}: capacity change without a value")
+
+    def process(self):
+        """SimPy process applying the scheduled events."""
+        self.validate()
+        for event in self.events:
+            if event.time > self.env.now:
+                yield self.env.timeout(event.time - self.env.now)
+
+            closed = self.apply(event)
+            if self.network.simulation is not None:
+                self.network.simulation.wake()  # resume the update loop if it is suspended while idle
+            cancelled = self.cancel_departures(closed)
+            if cancelled:
+                yield self.env.timeout(0)  # let the interrupted flights hand their passengers back first
+            rerouted, stranded = self.reroute_passengers(closed)
+
+            self.event_log.append({
+                "time": self.env.now,
+                "event": event.event,
+                "origin": event.origin,
+                "destination": event.destination,
+                "value": event.value,
+                "routes_closed": len(closed),
+                "departures_cancelled": cancelled,
+                "passengers_rerouted": rerouted,
+                "passengers_stranded": stranded,
+            })
+            logger.info(f"[{self.env.now}] network event {event.event} {event.origin}-{event.destination}: "
+                        f"{len(closed)} routes closed, {cancelled} departures cancelled, "
+                        f"{rerouted} passengers re-routed, {stranded} stranded")
+
+    def apply(self, event):
+        """Updates the network. Returns the routes closed by the event."""
+        if event.event == "vertiport_closure":
+            return set(self.network.close_vertiport(event.origin))
+        if event.event == "vertiport_reopening":
+            self.network.reopen_vertiport(event.origin)
+        elif event.event == "route_closure":
+            if self.network.close_route(event.origin, event.destination):
+                return {(event.origin, event.destination)}
+        elif event.event == "route_reopening":
+            self.network.reopen_route(event.origin, event.destination)
+        elif event.event == "capacity_change":
+            self.network.set_route_capacity(event.origin, event.destination, event.value)
+        return set()
+
+    def cancel_departures(self, closed):
+        """Cancels flights still holding for a slot or departure time on a closed route."""
+        cancelled = 0
+        if not closed:
+            return cancelled
+
+        for aircraft in self.network.aircrafts.values():
+            if not aircraft.departure_cancellable or aircraft.flight_process is None or not aircraft.flight_process.is_alive:
+                continue
+            route = (aircraft.origin_vertiport.vertiport_id, aircraft.destination_vertiport.vertiport_id)
+            if route in closed:
+                aircraft.flight_process.interrupt(f"route {route} closed")
+                cancelled += 1
+        return cancelled
+
+    def affected_passengers(self):
+        """Passengers waiting at a vertiport or boarded on an aircraft."""
+        for vertiport in self.network.vertiports.values():
+            yield from vertiport.passengers
+        for aircraft in self.network.aircrafts.values():
+            yield from aircraft.current_passengers
+
+    def reroute_passengers(self, closed):
+        """
+        Re-routes the passengers whose remaining itinerary uses a closed route.
+
+        :return: (number of re-routed passengers, number of passengers without an alternative)
+        """
+        rerouted, stranded = 0, 0
+        if not closed:
+            return rerouted, stranded
+
+        for passenger in list(self.affected_passengers()):
+            remaining = passenger.remaining_itinerary()
+            if not any(edge in closed for edge in zip(remaining[:-1], remaining[1:])):
+                continue
+
+            try:
+                path = self.network.compute_itinerary(remaining[0], remaining[-1])
+            except nx.NetworkXNoPath:
+                stranded += 1
+                logger.warning(f"[{self.env.now}] Passenger {passenger.passenger_id} stranded at {remaining[0]}: no route to {remaining[-1]}")
+                continue
+
+            passenger.reroute(path)
+            rerouted += 1
+
+        return rerouted, stranded
@@ -1,14 +1,172 @@
+import logging
+from math import radians, cos
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS = 6371000  # m
+
+# forward neighbor cells - each pair of adjacent cells is visited once
+NEIGHBOR_CELLS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
 
 class UTM:
-    def __init__(self, network):
+    def __init__(self, network, horizontal_separation=500, vertical_separation=45):
+        """
+        Unmanned traffic management services of the network.
+
+        :param network: UAMNetwork instance
+        :param horizontal_separation: horizontal separation minimum in meters
+        :param vertical_separation: vertical separation minimum in meters
+        """
         self.network = network
+        self.horizontal_separation = horizontal_separation
+        self.vertical_separation = vertical_separation
+
+        # local tangent plane around the network for the grid hash
+        latitudes = [vp.location[0] for vp in network.vertiports.values()] or [0.0]
+        longitudes = [vp.location[1] for vp in network.vertiports.values()] or [0.0]
+        self.reference_lat = float(np.mean(latitudes))
+        self.reference_lon = float(np.mean(longitudes))
+        self.meters_per_rad_lon = EARTH_RADIUS * cos(radians(self.reference_lat))
+
+        self.aircraft_ids = []
+        self.xyz = np.empty((0, 3))
+
+        # compact conflict log
+        self.num_checks = 0
+        self.num_conflicts = 0
+        self.max_concurrent_conflicts = 0
+        self.conflict_log = []  # (time, aircraft id, aircraft id, horizontal distance, vertical distance)
 
     def check_airspace_capacity(self, origin, destination):
         self.network.airspaces[origin, destination] # check
         return 0
 
-    def check_space_separation(self):
-        return 0
+    def update_positions(self, aircraft_ids=None, positions=None):
+        """
+        Refreshes the airborne positions used by the separation check.
 
-    def check_vertiport_viscinity_capacity(self):
-        return 0
+        :param aircraft_ids: sequence of aircraft ids (default: all flying aircraft of the network)
+        :param positions: array-like (n, 3) of (lat, lon, alt) matching aircraft_ids
+        """
+        if aircraft_ids is None:
+            flying = [ac for ac in self.network.aircrafts.values() if ac.state == "flying"]
+            aircraft_ids = [ac.aircraft_id for ac in flying]
+            positions = [ac.position for ac in flying]
+
+        positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.aircraft_ids = list(aircraft_ids)
+        self.xyz = np.column_stack((
+            np.radians(positions[:, 1] - self.reference_lon) * self.meters_per_rad_lon,
+            np.radians(positions[:, 0] - self.reference_lat) * EARTH_RADIUS,
+            positions[:, 2],
+        ))
+
+    def check_space_separation(self, now=None):
+        """
+        Reports aircraft pairs violating both the horizontal and the vertical separation minima.
+        Positions are hashed into a uniform grid with cells of the horizontal minimum, so only aircraft
+        in the same or adjacent cells are compared (near-linear instead of all pairs).
+
+        :param now: simulation time stamped on the conflict log (default: network env time)
+        :return: list of (aircraft id, aircraft id, horizontal distance, vertical distance)
+        """
+        if now is None:
+            now = self.network.env.now
+
+        conflicts = []
+        if len(self.xyz) > 1:
+            i, j = self._candidate_pairs()
+            conflicts = self._violations(i, j)
+
+        self.num_checks += 1
+        self.num_conflicts += len(conflicts)
+        self.max_concurrent_conflicts = max(self.max_concurrent_conflicts, len(conflicts))
+        for ac1, ac2, horizontal, vertical in conflicts:
+            self.conflict_log.append((now, ac1, ac2, horizontal, vertical))
+
+        if conflicts:
+            logger.info(f"[{now}] separation conflicts: {len(conflicts)}")
+
+        return conflicts
+
+    def _candidate_pairs(self):
+        """
+        Index pairs of aircraft in the same or adjacent grid cells. Cells are sorted by key once and
+        every (cell, neighbor cell) block is expanded into pairs with array operations.
+        """
+        cells = np.floor(self.xyz[:, :2] / self.horizontal_separation).astype(np.int64)
+        cells -= cells.min(axis=0) - 1  # keep neighbor keys non-negative
+        width = int(cells[:, 1].max()) + 2
+        keys = cells[:, 0] * width + cells[:, 1]
+
+        order = np.argsort(keys, kind="stable")
+        unique_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+        pairs_i, pairs_j = [], []
+        for dx, dy in ((0, 0),) + NEIGHBOR_CELLS:
+            if (dx, dy) == (0, 0):
+                cell_a = np.flatnonzero(counts > 1)
+                cell_b = cell_a
+            else:
+                neighbor_keys = unique_keys + dx * width + dy
+                found = np.searchsorted(unique_keys, neighbor_keys)
+                found = np.minimum(found, len(unique_keys) - 1)
+                cell_a = np.flatnonzero(unique_keys[found] == neighbor_keys)
+                cell_b = found[cell_a]
+
+            if len(cell_a) == 0:
+                continue
+
+            count_a = counts[cell_a]
+            count_b = counts[cell_b]
+            block_size = count_a * count_b
+            block = np.repeat(np.arange(len(cell_a)), block_size)
+            local = np.arange(block_size.sum()) - np.repeat(np.cumsum(block_size) - block_size, block_size)
+            local_a = local // count_b[block]
+            local_b = local % count_b[block]
+
+            if (dx, dy) == (0, 0):
+                keep = local_a < local_b
+                block, local_a, local_b = block[keep], local_a[keep], local_b[keep]
+
+            pairs_i.append(order[starts[cell_a][block] + local_a])
+            pairs_j.append(order[starts[cell_b][block] + local_b])
+
+        if not pairs_i:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+    def _violations(self, i, j):
+        delta = self.xyz[i] - self.xyz[j]
+        horizontal = np.hypot(delta[:, 0], delta[:, 1])
+        vertical = np.abs(delta[:, 2])
+        violated = np.flatnonzero((horizontal < self.horizontal_separation) & (vertical < self.vertical_separation))
+        return [(self.aircraft_ids[i[k]], self.aircraft_ids[j[k]], float(horizontal[k]), float(vertical[k]))
+                for k in violated]
+
+    def monitor(self, interval):
+        """Process refreshing the airborne positions and checking separation every interval seconds."""
+        while True:
+            yield self.network.env.timeout(interval)
+            self.update_positions()
+            self.check_space_separation()
+
+    def get_statistics(self):
+        return {
+            "checks": self.num_checks,
+            "conflicts": self.num_conflicts,
+            "max_concurrent_conflicts": self.max_concurrent_conflicts,
+        }
+
+    def check_vertiport_viscinity_capacity(self, vertiport_id=None):
+        """
+        Ground and approach occupancy of the vertiports (pads in use, aircraft holding, turnarounds).
+
+        :param vertiport_id: single vertiport to check (default: all vertiports)
+        :return: dict[vertiport_id] = ground statistics of the vertiport
+        """
+        vertiport_ids = [vertiport_id] if vertiport_id is not None else list(self.network.vertiports)
+        return {vid: self.network.vertiports[vid].get_ground_statistics() for vid in vertiport_ids}
@@ -0,0 +1,133 @@
+"""
+Dispatch policy benchmark harness.
+
+Replays the same passenger demand through each dispatch policy on a fresh network and reports
+service KPIs next to the per-decision latency of the policy.
+
+usage: python policy_benchmark.py --demand input/demand/Fixed_Passenger_Schedule_BD.csv
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import simpy
+
+from airsim import UAMSimulation
+from models.charger import ChargerModel
+from models.network import UAMNetwork
+from planning.dispatch_policy import POLICIES
+from planning.batch_dispatch import BatchDispatchOptimizer
+from planning.mission_profile import create_mission_profile
+from utils.scenario import Scenario
+from utils.demand_utils import DemandTable
+
+BENCHMARK_POLICIES = {**POLICIES, BatchDispatchOptimizer.name: BatchDispatchOptimizer}
+
+NETWORK_PATH = os.path.join(os.curdir, 'input/network')
+OUTPUT_PATH = os.path.join(os.curdir, 'output')
+
+
+def run_policy(policy, nodes_df, edges_df, demand, charger, mission_profile, scenario=None,
+               start_time=6*3600, end_time=22*3600, update_interval=120):
+    """
+    Runs one fast-mode simulation with the given policy.
+
+    :return: dict of KPIs and decision latency statistics
+    """
+    env = simpy.Environment()
+    network = UAMNetwork(env, nodes_df, edges_df, charger, mission_profile, scenario=scenario)
+    simulation = UAMSimulation(env, network, demand, mission_profile,
+                               update_interval=update_interval, start_time=start_time, end_time=end_time,
+                               run_mode="fast", dispatch_policy=policy)
+
+    wall_start = time.perf_counter()
+    env.run(until=end_time + 1)
+    wall_time = time.perf_counter() - wall_start
+
+    return summarize(simulation, demand, wall_time)
+
+
+def summarize(simulation, demand, wall_time):
+    trips = simulation.passenger_trip_log
+    flights = simulation.vehicle_trip_log
+    latency = np.array(simulation.scheduler.decision_latency) * 1e6  # microseconds
+
+    wait = trips.column("total_wait_time")
+    travel = trips.column("total_travel_time")
+    num_passengers = flights.column("num_passengers")
+    empty_legs = int((num_passengers == 0).sum())
+    seats_flown = int(num_passengers.sum())
+
+    result = {
+        "policy": simulation.scheduler.policy.name,
+        "passengers_demand": len(demand),
+        "passengers_served": len(trips),
+        "mean_wait_s": wait.mean() if wait.size else np.nan,
+        "p95_wait_s": np.percentile(wait, 95) if wait.size else np.nan,
+        "mean_travel_s": travel.mean() if travel.size else np.nan,
+        "flights": len(flights),
+        "empty_legs": empty_legs,
+        "mean_load": seats_flown / len(flights) if len(flights) else np.nan,
+        "energy_kwh": flights.column("energy_consumed").sum(),
+        "decisions": latency.size,
+        "decision_mean_us": latency.mean() if latency.size else np.nan,
+        "decision_p50_us": np.percentile(latency, 50) if latency.size else np.nan,
+        "decision_p99_us": np.percentile(latency, 99) if latency.size else np.nan,
+        "decision_max_us": latency.max() if latency.size else np.nan,
+        "wall_time_s": wall_time,
+    }
+
+    solve_log = getattr(simulation.scheduler.policy, "solve_log", None)
+    if solve_log:
+        solve_time = np.array([record["wall_time"] for record in solve_log]) * 1e3
+        result["solves"] = len(solve_log)
+        result["solve_fallbacks"] = sum(record["fallback"] for record in solve_log)
+        result["solve_mean_ms"] = solve_time.mean()
+        result["solve_max_ms"] = solve_time.max()
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay one demand file through each dispatch policy.")
+    parser.add_argument("--demand", default=os.path.join(os.curdir, 'input/demand/Fixed_Passenger_Schedule_BD.csv'))
+    parser.add_argument("--policies", nargs="+", default=list(BENCHMARK_POLICIES), choices=list(BENCHMARK_POLICIES))
+    parser.add_argument("--start", type=int, default=6*3600, help="simulation start time in seconds")
+    parser.add_argument("--end", type=int, default=22*3600, help="simulation end time in seconds")
+    parser.add_argument("--update-interval", type=int, default=120)
+    parser.add_argument("--output", default=os.path.join(OUTPUT_PATH, "policy_benchmark.csv"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    nodes_df = pd.read_csv(os.path.join(NETWORK_PATH, "nodes.csv"))
+    edges_df = pd.read_csv(os.path.join(NETWORK_PATH, "edges.csv"))
+    demand = DemandTable.read_csv(args.demand)  # parsed once, replayed by every policy
+
+    # shared across policies: only the dispatch policy differs between runs
+    scenario = Scenario.load(nodes_df, edges_df)
+    mission_profile = create_mission_profile(nodes_df, edges_df, save_result=False, scenario=scenario)
+    charger = ChargerModel(400, 0.9, 160)
+
+    results = []
+    for name in args.policies:
+        print(f"running policy: {name}")
+        try:
+            results.append(run_policy(BENCHMARK_POLICIES[name](), nodes_df, edges_df, demand, charger, mission_profile,
+                                      scenario=scenario, start_time=args.start, end_time=args.end, update_interval=args.update_interval))
+        except Exception as e:
+            # keep the comparison going, a failing policy is reported instead of aborting the benchmark
+            logging.exception(f"policy {name} failed")
+            results.append({"policy": name, "error": str(e)})
+
+    df_results = pd.DataFrame(results).set_index("policy")
+    print(df_results.T.to_string(float_format=lambda x: f"{x:.2f}"))
+    df_results.to_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
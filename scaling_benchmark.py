@@ -0,0 +1,148 @@
+"""
+Network scaling benchmark.
+
+Generates synthetic scenarios of increasing size (input/network/synthetic_network.py) and runs the
+fast-mode simulation on each one in a fresh process. Reports setup time (scenario loading and mission
+profiles), simulation wall time, processed events per second and peak memory, and charts them against
+the number of vertiports when matplotlib is available.
+
+usage: python scaling_benchmark.py --sizes 10 100 1000
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # not available on Windows - peak memory is not reported
+    resource = None
+
+from input.network.synthetic_network import generate_network
+
+OUTPUT_PATH = os.path.join(os.curdir, 'output')
+SYNTHETIC_PATH = os.path.join(OUTPUT_PATH, 'synthetic_networks')
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def run_size(paths, start_time, end_time, update_interval, log_level):
+    """Loads one synthetic scenario and runs it in fast mode. Executed in a fresh process per size."""
+    import simpy
+    from airsim import UAMSimulation
+    from models.charger import ChargerModel
+    from models.network import UAMNetwork
+    from planning.mission_profile import create_mission_profile
+    from utils.demand_utils import DemandTable
+    from utils.scenario import Scenario
+
+    logging.basicConfig(level=log_level)
+
+    setup_start = time.perf_counter()
+    scenario = Scenario.load(network_path=paths["network_path"], waypoint_path=paths["waypoint_path"])
+    mission_profile = create_mission_profile(scenario.nodes_df, scenario.edges_df, save_result=False, scenario=scenario)
+    demand = DemandTable.read_csv(paths["demand"], scenario.nodes_df["id"].tolist())
+    charger = ChargerModel(400, 0.9, 160)
+
+    env = simpy.Environment()
+    network = UAMNetwork(env, scenario.nodes_df, scenario.edges_df, charger, mission_profile, scenario=scenario)
+    simulation = UAMSimulation(env, network, demand, mission_profile, update_interval=update_interval,
+                               start_time=start_time, end_time=end_time, run_mode="fast")
+    setup_time = time.perf_counter() - setup_start
+    setup_memory = peak_memory_mb()
+
+    # step loop (same as main.py) so the processed events can be counted
+    events = 0
+    run_start = time.perf_counter()
+    while env.peek() <= end_time:
+        env.step()
+        events += 1
+    run_time = time.perf_counter() - run_start
+
+    return {
+        "vertiports": len(scenario.nodes),
+        "routes": len(scenario.edges),
+        "aircraft": len(network.aircrafts),
+        "passengers_demand": len(demand),
+        "passengers_served": len(simulation.passenger_trip_log),
+        "flights": len(simulation.vehicle_trip_log),
+        "setup_s": setup_time,
+        "run_s": run_time,
+        "events": events,
+        "events_per_s": events / run_time if run_time > 0 else float("nan"),
+        "setup_peak_mb": setup_memory,
+        "peak_mb": peak_memory_mb(),
+    }
+
+
+def plot_results(df_results, output_file):
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not available - chart skipped")
+        return
+
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+    for ax, column, label in zip(axes, ("run_s", "events_per_s", "peak_mb"),
+                                 ("simulation wall time [s]", "events / s", "peak memory [MB]")):
+        ax.plot(df_results["vertiports"], df_results[column], marker="o")
+        ax.set_xscale("log")
+        ax.set_xlabel("vertiports")
+        ax.set_ylabel(label)
+        ax.grid(True, linestyle="--", alpha=0.7)
+
+    fig.tight_layout()
+    fig.savefig(output_file)
+    print(f"chart saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fast-mode simulation on synthetic networks of increasing size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--k", type=int, default=4, help="nearest neighbors connected to every vertiport")
+    parser.add_argument("--aircraft", type=int, default=4, help="initial aircraft per vertiport")
+    parser.add_argument("--trips", type=float, default=100, help="mean daily passengers per vertiport")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", type=int, default=0, help="simulation start time in seconds")
+    parser.add_argument("--end", type=int, default=22*3600, help="simulation end time in seconds")
+    parser.add_argument("--update-interval", type=int, default=120)
+    parser.add_argument("--log-level", default="ERROR", help="simulation log level (logging I/O distorts the timings)")
+    parser.add_argument("--output", default=os.path.join(OUTPUT_PATH, "scaling_benchmark.csv"))
+    parser.add_argument("--chart", default=os.path.join(OUTPUT_PATH, "scaling_benchmark.png"))
+    args = parser.parse_args()
+
+    # a fresh process per size keeps the peak memory of one run from leaking into the next
+    context = multiprocessing.get_context("spawn")
+
+    results = []
+    for size in args.sizes:
+        print(f"generating network: {size} vertiports")
+        paths = generate_network(size, os.path.join(SYNTHETIC_PATH, f"n{size}"), k=args.k,
+                                 aircraft_per_vertiport=args.aircraft, daily_trips_per_vertiport=args.trips, seed=args.seed)
+
+        print(f"running network: {size} vertiports")
+        with context.Pool(1) as pool:
+            try:
+                results.append(pool.apply(run_size, (paths, args.start, args.end, args.update_interval, args.log_level)))
+            except Exception as e:
+                logging.exception(f"network size {size} failed")
+                results.append({"vertiports": size, "error": str(e)})
+
+    df_results = pd.DataFrame(results)
+    print(df_results.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    df_results.to_csv(args.output, index=False)
+
+    if "error" not in df_results:
+        plot_results(df_results, args.chart)
+
+
+if __name__ == "__main__":
+    main()
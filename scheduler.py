@@ -1,15 +1,24 @@
 import logging
+import time
+from planning.dispatch_policy import DispatchSnapshot, VertiportState, QueueState, StaticPolicy
 
 logger = logging.getLogger(__name__)
 
+# airspace queue priorities (lower departs first)
+PASSENGER_FLIGHT_PRIORITY = 0
+REPOSITION_FLIGHT_PRIORITY = 1
+
 class Scheduler:
-    def __init__(self, env, network, mission_profile, passenger_threshold=4, max_wait_time=600, run_mode="visual"):
+    def __init__(self, env, network, mission_profile, passenger_threshold=4, max_wait_time=600, run_mode="visual", policy=None, deconfliction=None):
         """
         Initializes the Scheduler.
 
         :param env: SimPy environment
         :param network: UAMNetwork instance
-        :param passenger_threshold: Number of passengers required to dispatch an aircraft (default 4)        :param max_wait_time: Maximum wait time in seconds before forcing dispatch (default 900s = 15 minutes)
+        :param passenger_threshold: Number of passengers required to dispatch an aircraft by the default static policy (default 4)
+        :param max_wait_time: Maximum wait time in seconds before forcing dispatch (default 900s = 15 minutes)
+        :param policy: DispatchPolicy instance (default: StaticPolicy with the threshold and max wait time above)
+        :param deconfliction: StrategicDeconfliction reserving 4D trajectories before departure (optional)
         """
         self.env = env
         self.network = network
@@ -17,31 +26,101 @@ class Scheduler:
         self.mission_profile = mission_profile
         self.max_wait_time = max_wait_time
         self.run_mode = run_mode
+        # seats of the smallest aircraft of the fleet (pax row of the vehicle specification)
+        self.seat_capacity = min((int(ac.aircraft_params["pax"]) for ac in network.aircrafts.values()),
+                                 default=passenger_threshold)
+
+        if policy is None:
+            policy = StaticPolicy(passenger_threshold=passenger_threshold, max_wait_time=max_wait_time)
+        self.policy = policy
+        self.deconfliction = deconfliction
+
+        self.decision_latency = []  # wall time in seconds spent in policy.decide per decision epoch
 
     def make_dispatch_decision(self):
         """
-        Static Policy based dispatch decision
+        Builds a snapshot of queues and fleet, asks the dispatch policy for actions and executes them.
+
+        :return: PolicyDecision of the dispatch policy
         """
-        """Checks demand at each vertiport and dispatches aircrafts based on static policy."""
-        for vertiport in self.network.vertiports.values():
-            demand_summary = vertiport.check_demand()
+        snapshot, queued_passengers = self.build_snapshot()
+
+        start = time.perf_counter()
+        decision = self.policy.decide(snapshot)
+        self.decision_latency.append(time.perf_counter() - start)
+
+        for action in decision.dispatches:
+            vertiport = self.network.vertiports[action.origin]
+            destination = self.network.vertiports[action.destination]
+            queue = queued_passengers[action.origin, action.destination]
+
+            # hand each dispatch a distinct slice of the queue so split dispatches do not double-board
+            passengers = queue[:action.num_passengers]
+            del queue[:action.num_passengers]
 
-            for destination, demand_info in demand_summary.items():  # Corrected `.items()`
-                passenger_count = demand_info["count"]
-                max_wait_time = demand_info["max_wait_time"]
-                passengers = demand_info["passengers"]  # List of passengers
+            if not passengers:
+                logger.debug(f"[{self.env.now}]: check the dispatch decision at {action.origin} to {action.destination}. no passengers left in queue")
+                continue
+            self.dispatch_aircraft(vertiport, destination, passengers)
 
-                if passenger_count >= self.passenger_threshold or max_wait_time >= self.max_wait_time:
-                    if passengers is None:
-                        logger.debug(f"[{self.env.now}]: check the dispatch threshold at {vertiport.vertiport_id}. Pax count: {passenger_count}, max wait time: {max_wait_time}")
-                    self.env.process(self.dispatch_aircraft(vertiport, destination, passengers))
+        self.perform_vehicle_reposition(decision.repositions)
+        return decision
 
-        self.perform_vehicle_reposition()
+    def build_snapshot(self):
+        """
+        :return: DispatchSnapshot for the policy, and dict[(origin id, destination id)] = list of queued passengers
+        """
+        vertiport_states = {}
+        queued_passengers = {}
+
+        for vertiport_id, vertiport in self.network.vertiports.items():
+            queues = {}
+            for destination, demand_info in vertiport.check_demand().items():
+                if self.network.airspaces[vertiport_id, destination.vertiport_id].closed:
+                    continue  # passengers stranded behind a closed route wait for it to reopen
+                queues[destination.vertiport_id] = QueueState(destination.vertiport_id, demand_info["count"], demand_info["max_wait_time"])
+                queued_passengers[vertiport_id, destination.vertiport_id] = list(demand_info["passengers"])
+
+            available = 0
+            charging = 0
+            for ac in vertiport.aircrafts:
+                if ac.flight_ready:
+                    available += 1
+                if ac.state == "charge":
+                    charging += 1
+
+            # airborne aircraft heading here (maintained on airspace entry/exit, no fleet scan)
+            inbound_etas = tuple((ac.expected_arrival_time, ac.expected_arrival_soc) for ac in vertiport.inbound_aircraft.values())
+
+            vertiport_states[vertiport_id] = VertiportState(
+                vertiport_id=vertiport_id,
+                queues=queues,
+                available=available,
+                charging=charging,
+                parked=len(vertiport.aircrafts),
+                inbound=len(inbound_etas),
+                target=self.network.initial_aircraft_allocation.get(vertiport_id, 0),
+                arrivals=dict(vertiport.arrival_counts),
+                inbound_etas=inbound_etas
+            )
+
+        predecessors = {
+            node_id: tuple(src_id for src_id in self.network.graph.predecessors(node_id) if src_id in self.network.vertiports)
+            for node_id in self.network.vertiports
+        }
+
+        snapshot = DispatchSnapshot(
+            time=self.env.now,
+            vertiports=vertiport_states,
+            predecessors=predecessors,
+            seat_capacity=self.seat_capacity
+        )
+        return snapshot, queued_passengers
 
     def dispatch_aircraft(self, vertiport, destination, passengers):
         """Dispatch an aircraft if available."""
 
-        passengers_to_board = min(len(passengers), self.passenger_threshold)  # remove up to 4 or max pax below that
+        passengers_to_board = min(len(passengers), self.seat_capacity)  # the policy already split the queue by seats
         available_aircraft = vertiport.get_available_aircraft()
         flying_route = self.network.airspaces[vertiport.vertiport_id, destination.vertiport_id]
 
@@ -82,18 +161,26 @@ class Scheduler:
                 passenger = passengers[i]
                 passenger.board_aircraft(aircraft)
 
-            if not flying_route.can_accommodate(): # air traffic control
-                logger.warning(f"[{self.env.now}]: Airspace {(vertiport.vertiport_id, destination.vertiport_id)} full. waiting...")
-                wait_time = flying_route.compute_time_until_availability()
-                yield self.env.timeout(wait_time)
-
+            # air traffic control - the aircraft queues for a route slot inside fly()
             logger.info(f"[{self.env.now}]: Aircraft {aircraft.aircraft_id} dispatched from {vertiport.vertiport_id} to {destination.vertiport_id} with {passengers_to_board} passengers.")
             aircraft.reserve_aircraft() # need to reserve this aircraft since dispatching at the same timestep will cause an error
-            self.env.process(aircraft.fly(destination, self.run_mode))
+            self.launch_flight(aircraft, destination, PASSENGER_FLIGHT_PRIORITY)
 
         else:
             logger.warning(f"[{self.env.now}]: No aircraft available at {vertiport.vertiport_id} to {destination.vertiport_id}")
 
+    def launch_flight(self, aircraft, destination, priority):
+        """Starts the flight of a reserved aircraft, booking a conflict-free trajectory first if deconfliction is enabled."""
+        if self.deconfliction is None:
+            aircraft.flight_process = self.env.process(aircraft.fly(destination, self.run_mode, priority=priority))
+            return aircraft.flight_process
+
+        reservation = self.deconfliction.reserve(aircraft, aircraft.origin_vertiport.vertiport_id,
+                                                 destination.vertiport_id, self.env.now)
+        aircraft.flight_process = self.env.process(aircraft.fly(destination, self.run_mode, priority=priority,
+                                                                reservation=reservation, deconfliction=self.deconfliction))
+        return aircraft.flight_process
+
     def compute_expected_waiting_time(self, vertiport, destination):
         """
         :param destination:
@@ -118,79 +205,19 @@ class Scheduler:
 
         return remaining_time
 
-    def perform_vehicle_reposition(self):
-        distribution = self.network.simulation.get_aircraft_distribution_state()
-        aircraft_at_node = distribution["aircraft_at_node"]
-        aircraft_inbound_to_node = distribution["aircraft_inbound_to_node"]
-        initial_alloc = self.network.initial_aircraft_allocation
-        buffer = 0.4  # Tolerance: allows ±1 imbalance before rebalancing
-        supply_buffer = 0.7 # if neighboring airport is above 70% support worst supply vertiport by repositioning
-
-        reposition_targets = {}  # node_id → imbalance
-        node_supply = {}  # node_id → total aircraft (at + inbound)
-
-        for node_id in self.network.vertiports:
-            current = aircraft_at_node.get(node_id, 0) + aircraft_inbound_to_node.get(node_id, 0)
-            node_supply[node_id] = current
-            target = initial_alloc.get(node_id, 0)
-
-            # deficit case
-            if current <= round(target*buffer):
-                reposition_targets[node_id] = current - target
-
-        # Step 2: Rank surplus nodes by (actual supply - target), descending
-        surplus_candidates = {
-            node_id: node_supply[node_id] - initial_alloc.get(node_id, 0)
-            for node_id in self.network.vertiports
-            if node_id not in reposition_targets and node_supply[node_id] > initial_alloc.get(node_id, 0)
-        }
-
-        surplus_nodes = sorted(surplus_candidates.items(), key=lambda x: x[1], reverse=True)  # most surplus first
-        deficit_nodes = sorted(reposition_targets.items(), key=lambda x: x[1])  # most negative = worst deficit
-
-
-        """TODO: 
-        1) add a demand-based re-balance requirement
-        2) rather than rebalancing from a deficit node, 
-            rebalance based on forecasted demand,
-            also rebalance based on energy cost repositioning on the edge 
-        """
-
-        for dst_id, _ in deficit_nodes:
-            dst_vp = self.network.vertiports[dst_id]
-            target_dst = initial_alloc.get(dst_id, 0)
-
-            inbound_neighbors = [
-                src_id for src_id in self.network.graph.predecessors(dst_id)
-                if src_id in self.network.vertiports
-            ]
-
-            best_source = None
-            best_score = -float("inf")
-
-            for src_id in inbound_neighbors:
-                src_vp = self.network.vertiports[src_id]
-                src_supply = node_supply.get(src_id, 0)
-                src_target = initial_alloc.get(src_id, 0)
-
-                if src_supply <= round(supply_buffer*src_target):
-                    continue
-
-                else:
-                    score = src_supply - src_target
-                    available_ac = src_vp.get_available_aircraft()
-
-                    if not available_ac:
-                        continue
+    def perform_vehicle_reposition(self, repositions):
+        """Executes the reposition actions of the dispatch policy."""
+        for action in repositions:
+            src_vp = self.network.vertiports[action.origin]
+            dst_vp = self.network.vertiports[action.destination]
+            available_ac = src_vp.get_available_aircraft()
 
-                    if score > best_score:
-                        best_score = score
-                        best_source = (src_id, src_vp, available_ac[0])
+            if not available_ac:
+                logger.debug(f"[{self.env.now}] Rebalancing from {action.origin} → {action.destination} skipped: no aircraft available")
+                continue
 
-            if best_source:
-                src_id, src_vp, aircraft = best_source
-                aircraft.reserve_aircraft()
-                self.env.process(aircraft.fly(dst_vp, self.run_mode))
+            aircraft = available_ac[0]
+            aircraft.reserve_aircraft()
+            self.launch_flight(aircraft, dst_vp, REPOSITION_FLIGHT_PRIORITY)
 
-                logger.info(f"[{self.env.now}] Rebalancing aircraft {aircraft.aircraft_id} from {src_id} → {dst_id} "
-                            f"(src surplus: {node_supply[src_id] - initial_alloc[src_id]}, dst current: {node_supply[dst_id]})")
\ No newline at end of file
+            logger.info(f"[{self.env.now}] Rebalancing aircraft {aircraft.aircraft_id} from {action.origin} → {action.destination}")
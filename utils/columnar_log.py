@@ -0,0 +1,310 @@
+"""
+Fixed-schema columnar simulation logs.
+
+Each log preallocates one NumPy array per column. Full buffers are flushed as one chunk file - Parquet
+(pyarrow) or .npz when pyarrow is not installed - so memory stays bounded on long runs. Every chunk file
+is complete when written, so a log can be read back at any time, before or after close, with either
+backend. Without an output directory full buffers are kept in memory as compact column chunks.
+
+Vertiport and aircraft ids are stored as integer codes with a category table (network vertiport index,
+fleet row); to_frame and load_log decode them back to ids.
+
+The aircraft distribution is a dense (time × vertiport) history of the network counters, preallocated
+for the update ticks of the run and saved as one .npz file.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # logs are flushed as .npz chunks
+    pa = None
+    pq = None
+
+CATEGORY_PREFIX = "__categories__"
+
+# column → dtype, in record order
+PASSENGER_TRIP_SCHEMA = {
+    "passenger_id": np.int64,
+    "origin": np.int32,
+    "destination": np.int32,
+    "arrival_time": np.float64,  # arrival at the origin vertiport
+    "completion_time": np.float64,  # arrival at the final destination
+    "legs": np.int16,
+    "total_wait_time": np.float64,
+    "total_travel_time": np.float64,
+}
+
+PASSENGER_LEG_SCHEMA = {
+    "passenger_id": np.int64,
+    "leg": np.int16,  # 0 for the first leg of the itinerary
+    "origin": np.int32,
+    "destination": np.int32,
+    "wait_time": np.float64,
+    "arrival_time": np.float64,  # arrival at the leg destination
+    "travel_time": np.float64,  # since the arrival at the trip origin
+}
+
+VEHICLE_TRIP_SCHEMA = {
+    "time": np.float64,
+    "aircraft_id": np.int32,
+    "origin": np.int32,
+    "destination": np.int32,
+    "start_soc": np.float64,
+    "end_soc": np.float64,
+    "flight_time": np.float64,
+    "num_passengers": np.int16,
+    "energy_consumed": np.float64,
+}
+
+class ColumnarLog:
+    def __init__(self, name, schema, capacity=65536, output_dir=None, categories=None):
+        """
+        :param name: log name, also the output file name (name_00000.parquet or name_00000.npz, ...)
+        :param schema: dict[column] = NumPy dtype
+        :param capacity: rows per buffer (one chunk file per flush)
+        :param output_dir: directory the full buffers are flushed to (None keeps them in memory) - must not hold
+            chunk files of an earlier log of the same name
+        :param categories: dict[column] = list of ids the integer codes of the column refer to
+        """
+        self.name = name
+        self.schema = dict(schema)
+        self.columns = tuple(schema)
+        self.capacity = capacity
+        self.output_dir = output_dir
+        self.categories = {column: list(ids) for column, ids in (categories or {}).items()}
+
+        self.buffer = self._allocate()
+        self.size = 0  # rows in the current buffer
+        self.flushed = 0  # rows flushed to disk or chunks
+        self.chunks = []  # in-memory flushed buffers (no output directory)
+        self.files = 0  # chunk files written
+        self.closed = False
+
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+            leftovers = chunk_files(output_dir, name)
+            if leftovers:
+                raise FileExistsError(f"{output_dir} already holds {len(leftovers)} chunk files of log {name} "
+                                      f"- write each run to its own directory")
+
+    def _allocate(self):
+        return {column: np.empty(self.capacity, dtype=dtype) for column, dtype in self.schema.items()}
+
+    def __len__(self):
+        return self.flushed + self.size
+
+    def append(self, *values):
+        """Appends one row, values in schema order."""
+        if self.closed:
+            raise ValueError(f"log {self.name} is closed")
+        row = self.size
+        for column, value in zip(self.columns, values):
+            self.buffer[column][row] = value
+        self.size += 1
+
+        if self.size == self.capacity:
+            self.flush()
+
+    @property
+    def path(self):
+        if self.output_dir is None:
+            return None
+        return os.path.join(self.output_dir, f"{self.name}_*.{'parquet' if pq is not None else 'npz'}")
+
+    def flush(self):
+        if self.size == 0:
+            return
+
+        chunk = {column: values[:self.size] for column, values in self.buffer.items()}
+        if self.output_dir is None:
+            self.chunks.append(chunk)
+            self.buffer = self._allocate()  # the chunk keeps the filled arrays
+        elif pq is not None:
+            # category tables travel in the file metadata
+            table = pa.table(chunk).replace_schema_metadata({"categories": json.dumps(self.categories)})
+            pq.write_table(table, os.path.join(self.output_dir, f"{self.name}_{self.files:05d}.parquet"))
+            self.files += 1
+        else:
+            categories = {CATEGORY_PREFIX + column: np.array(ids, dtype=str) for column, ids in self.categories.items()}
+            np.savez_compressed(os.path.join(self.output_dir, f"{self.name}_{self.files:05d}.npz"), **chunk, **categories)
+            self.files += 1
+
+        self.flushed += self.size
+        self.size = 0
+
+    def close(self):
+        """Flushes the remaining rows to disk (no-op for in-memory logs)."""
+        if self.output_dir is None or self.closed:
+            return
+        self.flush()
+        self.closed = True
+
+    def column(self, name):
+        """Values of one column over all rows (codes are not decoded)."""
+        if self.output_dir is not None and self.flushed:
+            return self.to_frame(decode=False)[name].to_numpy()
+        return np.concatenate([chunk[name] for chunk in self.chunks] + [self.buffer[name][:self.size]])
+
+    def to_frame(self, decode=True):
+        """
+        All rows as a DataFrame: the chunk files flushed so far plus the rows still buffered.
+
+        :param decode: replace the integer codes by their ids
+        """
+        if self.output_dir is not None and self.flushed:
+            df = load_log(self.output_dir, self.name, decode=False, files=self.files)
+            if self.size:
+                df = pd.concat([df, pd.DataFrame({column: values[:self.size] for column, values in self.buffer.items()})],
+                               ignore_index=True)
+        else:
+            df = pd.DataFrame({column: self.column(column) for column in self.columns})
+
+        if decode:
+            for column, ids in self.categories.items():
+                df[column] = pd.Categorical.from_codes(df[column], categories=ids)
+        return df
+
+
+def chunk_files(output_dir, name):
+    """Chunk files of a log in write order."""
+    return sorted(glob.glob(os.path.join(output_dir, f"{name}_[0-9][0-9][0-9][0-9][0-9].parquet"))
+                  + glob.glob(os.path.join(output_dir, f"{name}_[0-9][0-9][0-9][0-9][0-9].npz")))
+
+
+def load_log(output_dir, name, decode=True, files=None):
+    """
+    Reloads a flushed log (Parquet or .npz chunk files).
+
+    :param decode: replace the integer codes by their ids
+    :param files: read only the first files chunk files (the ones a log still being written has flushed)
+    :return: DataFrame
+    """
+    paths = chunk_files(output_dir, name)[:files]
+    if not paths:
+        raise FileNotFoundError(f"no log {name} in {output_dir}")
+    parquet_files = [path for path in paths if path.endswith(".parquet")]
+    npz_files = [path for path in paths if path.endswith(".npz")]
+
+    frames = []
+    categories = {}
+    if parquet_files:
+        if pq is None:
+            raise ImportError(f"pyarrow is required to read {parquet_files[0]}")
+        for path in parquet_files:
+            table = pq.read_table(path)
+            frames.append(table.to_pandas())
+            categories = json.loads((table.schema.metadata or {}).get(b"categories", b"{}"))
+    else:
+        for path in npz_files:
+            with np.load(path) as chunk:
+                frames.append(pd.DataFrame({key: chunk[key] for key in chunk.files if not key.startswith(CATEGORY_PREFIX)}))
+                categories = {key[len(CATEGORY_PREFIX):]: chunk[key].tolist() for key in chunk.files if key.startswith(CATEGORY_PREFIX)}
+    df = pd.concat(frames, ignore_index=True)
+
+    if decode:
+        for column, ids in categories.items():
+            df[column] = pd.Categorical.from_codes(df[column], categories=ids)
+    return df
+
+
+class DistributionHistory:
+    def __init__(self, vertiport_ids, rows=1024, update_interval=None):
+        """
+        Parked and inbound aircraft per vertiport at every network update. Updates skipped while the system
+        was idle are not materialized, only their interval is kept (start, end, number of skipped updates).
+
+        :param vertiport_ids: vertiport ids in network index order (columns of the history)
+        :param rows: preallocated updates, the arrays double when they are full
+        :param update_interval: seconds between two updates (places the skipped updates in to_frame)
+        """
+        self.vertiport_ids = list(vertiport_ids)
+        self.update_interval = update_interval
+        self.size = 0
+        self.time = np.empty(rows, dtype=np.float64)
+        self.parked = np.empty((rows, len(self.vertiport_ids)), dtype=np.int32)
+        self.inbound = np.empty((rows, len(self.vertiport_ids)), dtype=np.int32)
+        self.skipped = []  # (start, end, updates skipped) of the idle intervals
+
+    def __len__(self):
+        return self.size
+
+    def _grow(self, rows):
+        self.time = np.resize(self.time, rows)
+        self.parked = np.resize(self.parked, (rows, len(self.vertiport_ids)))
+        self.inbound = np.resize(self.inbound, (rows, len(self.vertiport_ids)))
+
+    def record(self, time, parked, inbound):
+        """Copies one row of the network counters (arrays indexed by vertiport index)."""
+        if self.size == len(self.time):
+            self._grow(2 * max(self.size, 1))
+        self.time[self.size] = time
+        self.parked[self.size] = parked
+        self.inbound[self.size] = inbound
+        self.size += 1
+
+    def record_skip(self, start, end, updates_skipped):
+        """Idle interval starting right after the update at start, without updates until end."""
+        self.skipped.append((start, end, updates_skipped))
+
+    def skipped_intervals(self):
+        """DataFrame of the idle intervals (start, end, updates_skipped)."""
+        return pd.DataFrame(self.skipped, columns=["start", "end", "updates_skipped"])
+
+    def to_frame(self, decode=True, fill_skipped=False):
+        """
+        Long format: one row per update and vertiport (time, vertiport, parked, inbound).
+
+        :param fill_skipped: add the updates skipped while idle, with the (unchanged) state of the update before them
+        """
+        time, parked, inbound = self.time[:self.size], self.parked[:self.size], self.inbound[:self.size]
+        if fill_skipped and self.skipped:
+            if self.update_interval is None:
+                raise ValueError("update_interval is required to place the skipped updates")
+            times = [time] + [start + self.update_interval * np.arange(1, updates_skipped + 1)
+                              for start, _, updates_skipped in self.skipped]
+            time = np.sort(np.concatenate(times), kind="stable")
+            # every row takes the state of the last recorded update at or before it
+            source = np.searchsorted(self.time[:self.size], time, side="right") - 1
+            parked, inbound = parked[source], inbound[source]
+
+        n = len(self.vertiport_ids)
+        vertiport = np.tile(np.arange(n, dtype=np.int32), len(time))
+        df = pd.DataFrame({
+            "time": np.repeat(time, n),
+            "vertiport": pd.Categorical.from_codes(vertiport, categories=self.vertiport_ids) if decode else vertiport,
+            "parked": parked.ravel(),
+            "inbound": inbound.ravel(),
+        })
+        return df
+
+    def save(self, output_dir, name="aircraft_distribution"):
+        os.makedirs(output_dir, exist_ok=True)
+        skipped = np.array(self.skipped, dtype=np.float64).reshape(-1, 3)
+        np.savez_compressed(os.path.join(output_dir, f"{name}.npz"), time=self.time[:self.size],
+                            parked=self.parked[:self.size], inbound=self.inbound[:self.size],
+                            vertiport_ids=np.array(self.vertiport_ids, dtype=str),
+                            update_interval=np.float64(np.nan if self.update_interval is None else self.update_interval),
+                            skipped_start=skipped[:, 0], skipped_end=skipped[:, 1],
+                            skipped_updates=skipped[:, 2].astype(np.int64))
+
+    @classmethod
+    def load(cls, output_dir, name="aircraft_distribution"):
+        with np.load(os.path.join(output_dir, f"{name}.npz")) as data:
+            update_interval = float(data["update_interval"]) if "update_interval" in data.files else np.nan
+            history = cls(data["vertiport_ids"].tolist(), rows=len(data["time"]),
+                          update_interval=None if np.isnan(update_interval) else update_interval)
+            history.size = len(data["time"])
+            history.time[:] = data["time"]
+            history.parked[:] = data["parked"]
+            history.inbound[:] = data["inbound"]
+            if "skipped_start" in data.files:
+                history.skipped = list(zip(data["skipped_start"].tolist(), data["skipped_end"].tolist(),
+                                           data["skipped_updates"].tolist()))
+        return history
@@ -0,0 +1,117 @@
+"""
+Demand table preprocessing.
+
+Passenger demand (passenger_id, arrival_time, origin, destination) is converted once into sorted NumPy
+columns: integer arrival seconds, origin/destination codes into a shared vertiport id list and the
+passenger ids. The arrival process walks these arrays instead of pandas rows. Large demand files can be
+read in time-ordered chunks so only one chunk is held in memory at a time.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEMAND_COLUMNS = ["passenger_id", "arrival_time", "origin", "destination"]
+
+
+def clock_to_seconds(values):
+    """
+    Vectorized conversion of HH:MM:SS (or H:MM) strings to seconds past midnight.
+    Numeric columns are taken as seconds.
+    """
+    values = pd.Series(values)
+    if values.empty:
+        return np.zeros(0, dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.int64)
+
+    parts = values.astype(str).str.split(":", expand=True).astype(np.int64).to_numpy()
+    seconds = parts[:, 0] * 3600 + parts[:, 1] * 60
+    if parts.shape[1] > 2:
+        seconds += parts[:, 2]
+    return seconds
+
+
+class DemandTable:
+    def __init__(self, passenger_id, arrival, origin, destination, vertiport_ids):
+        """
+        Column store of passenger demand sorted by arrival time.
+
+        :param passenger_id: array of passenger ids
+        :param arrival: int64 array of arrival times in seconds
+        :param origin: int32 array of origin codes (index into vertiport_ids)
+        :param destination: int32 array of destination codes (index into vertiport_ids)
+        :param vertiport_ids: list of vertiport ids shared by all chunks of the same demand
+        """
+        order = np.argsort(arrival, kind="stable")
+        self.passenger_id = np.asarray(passenger_id)[order]
+        self.arrival = np.asarray(arrival, dtype=np.int64)[order]
+        self.origin = np.asarray(origin, dtype=np.int32)[order]
+        self.destination = np.asarray(destination, dtype=np.int32)[order]
+        self.vertiport_ids = list(vertiport_ids)
+
+    def __len__(self):
+        return len(self.arrival)
+
+    def to_frame(self):
+        """Demand file layout: passenger_id, arrival_time (integer seconds), origin, destination (ids)."""
+        ids = np.asarray(self.vertiport_ids, dtype=object)
+        return pd.DataFrame({
+            "passenger_id": self.passenger_id,
+            "arrival_time": self.arrival,
+            "origin": ids[self.origin],
+            "destination": ids[self.destination],
+        })
+
+    @classmethod
+    def from_frame(cls, df, vertiport_ids=None):
+        """
+        :param df: DataFrame with passenger_id, arrival_time (HH:MM:SS or seconds), origin, destination
+        :param vertiport_ids: known vertiport ids (default: the ids found in the frame)
+        """
+        if vertiport_ids is None:
+            vertiport_ids = sorted(set(df["origin"]) | set(df["destination"]))
+
+        categories = pd.Index(vertiport_ids)
+        origin = categories.get_indexer(df["origin"])
+        destination = categories.get_indexer(df["destination"])
+        if (origin < 0).any() or (destination < 0).any():
+            unknown = set(df["origin"][origin < 0]) | set(df["destination"][destination < 0])
+            raise ValueError(f"demand references unknown vertiports: {sorted(unknown)}")
+
+        return cls(df["passenger_id"].to_numpy(), clock_to_seconds(df["arrival_time"]), origin, destination, vertiport_ids)
+
+    @classmethod
+    def read_csv(cls, path, vertiport_ids=None):
+        """Loads a whole demand file."""
+        return cls.from_frame(pd.read_csv(path, usecols=DEMAND_COLUMNS), vertiport_ids)
+
+    @classmethod
+    def read_csv_chunks(cls, path, vertiport_ids, chunksize=100000):
+        """
+        Streams a demand file sorted by arrival time as DemandTable chunks.
+
+        :param vertiport_ids: vertiport ids shared by every chunk (the codes must not change between chunks)
+        :param chunksize: number of passengers per chunk
+        """
+        last_arrival = None
+        for df in pd.read_csv(path, usecols=DEMAND_COLUMNS, chunksize=chunksize):
+            chunk = cls.from_frame(df, vertiport_ids)
+            if len(chunk) == 0:
+                continue
+            if last_arrival is not None and chunk.arrival[0] < last_arrival:
+                raise ValueError(f"demand file {path} is not sorted by arrival time - load it without chunks")
+            last_arrival = chunk.arrival[-1]
+            yield chunk
+
+
+def demand_chunks(passenger_data, vertiport_ids=None):
+    """
+    Normalizes the demand input of the simulation to an iterable of time-ordered DemandTable chunks.
+
+    :param passenger_data: DataFrame, DemandTable or iterable of DemandTable chunks
+    """
+    if isinstance(passenger_data, pd.DataFrame):
+        return [DemandTable.from_frame(passenger_data, vertiport_ids)]
+    if isinstance(passenger_data, DemandTable):
+        return [passenger_data]
+    return passenger_data
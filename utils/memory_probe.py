@@ -0,0 +1,233 @@
+"""
+Opt-in memory instrumentation of long runs.
+
+MemoryProbe runs as a SimPy process next to the simulation. It samples the resident set size (RSS)
+and the traced heap every rss_interval simulated seconds and, at every milestone, takes a tracemalloc
+snapshot and a census of the live objects:
+
+    memory_rss.csv         RSS and traced heap over simulated time
+    memory_allocators.csv  top allocation sites per milestone, attributed to the innermost frame of
+                           this code base and grouped by model (Passenger, Aircraft, logs, ...),
+                           with the growth since the previous milestone
+    memory_objects.csv     live instances per class of this code base and SimPy, and DataFrames
+    memory_components.csv  size of known structures: mission profile DataFrames, log buffers,
+                           rejected passenger log, waiting passengers
+
+tracemalloc slows the simulation down several times and the census walks the whole heap, so the
+probe is for finding retention, not for timing runs.
+"""
+
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import pandas as pd
+
+try:
+    import psutil
+except ImportError:  # RSS is read from /proc/self/statm (Linux only)
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# allocation sites in these modules are reported under the model they belong to
+MODULE_COMPONENTS = {
+    "airsim.py": "UAMSimulation",
+    "scheduler.py": "Scheduler",
+    "models/passenger.py": "Passenger",
+    "models/aircraft.py": "Aircraft",
+    "models/vertiport.py": "Vertiport",
+    "models/airspace.py": "Airspace",
+    "models/network.py": "UAMNetwork",
+    "models/charger.py": "ChargerModel",
+    "planning/mission_profile.py": "mission_profile",
+    "utils/columnar_log.py": "logs",
+    "utils/demand_utils.py": "demand",
+}
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (None if it cannot be read)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def frame_component(filename):
+    """Component of an allocation site: model of a module of this code base, else the top-level package."""
+    path = os.path.abspath(filename)
+    if path.startswith(ROOT_PATH + os.sep):
+        relative = os.path.relpath(path, ROOT_PATH).replace(os.sep, "/")
+        return MODULE_COMPONENTS.get(relative, relative), True
+
+    parts = path.replace(os.sep, "/").split("/")
+    if "site-packages" in parts:
+        return parts[parts.index("site-packages") + 1], False
+    return os.path.basename(path), False
+
+
+class MemoryProbe:
+    def __init__(self, env, milestones, rss_interval=600, top=20, frames=16):
+        """
+        Starts tracing allocations - create the probe before the objects of interest are built.
+
+        :param env: SimPy environment
+        :param milestones: simulated times of the tracemalloc snapshots
+        :param rss_interval: simulated seconds between two RSS samples
+        :param top: allocation sites reported per milestone
+        :param frames: traceback depth kept by tracemalloc (deep enough to reach the model code)
+        """
+        self.env = env
+        self.milestones = sorted(milestones)
+        self.rss_interval = rss_interval
+        self.top = top
+        self.simulation = None
+        self.wall_start = time.perf_counter()
+
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start(frames)
+
+        self.rss_samples = []
+        self.allocators = []
+        self.objects = []
+        self.components = []
+        self.previous_sites = {}  # (component, location) → size at the previous milestone
+        self.type_modules = {}  # type → module is part of this code base / SimPy
+
+    def attach(self, simulation):
+        """Starts the sampling process for a simulation."""
+        self.simulation = simulation
+        self.env.process(self.run())
+
+    def run(self):
+        milestones = iter(self.milestones)
+        milestone = next(milestones, None)
+        next_sample = self.env.now
+        while milestone is not None or next_sample <= self.simulation.end_time:
+            if next_sample <= self.simulation.end_time and (milestone is None or next_sample < milestone):
+                yield self.env.timeout(max(next_sample - self.env.now, 0))
+                self.sample_rss()
+                next_sample += self.rss_interval
+            else:
+                yield self.env.timeout(max(milestone - self.env.now, 0))
+                self.take_snapshot()
+                milestone = next(milestones, None)
+
+    def sample_rss(self):
+        traced, peak = tracemalloc.get_traced_memory()
+        self.rss_samples.append({
+            "time": self.env.now,
+            "wall_s": time.perf_counter() - self.wall_start,
+            "rss_mb": current_rss_mb(),
+            "traced_mb": traced / 2**20,
+            "traced_peak_mb": peak / 2**20,
+        })
+
+    def take_snapshot(self):
+        """tracemalloc snapshot and object census at the current simulated time."""
+        now = self.env.now
+        self.sample_rss()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__, all_frames=True),
+        ])
+
+        sites = Counter()
+        blocks = Counter()
+        for statistic in snapshot.statistics("traceback"):
+            component, location = None, None
+            for frame in reversed(statistic.traceback):  # innermost frame first
+                name, local = frame_component(frame.filename)
+                if component is None:
+                    component, location = name, f"{frame.filename}:{frame.lineno}"
+                if local:
+                    component, location = name, f"{os.path.relpath(frame.filename, ROOT_PATH)}:{frame.lineno}"
+                    break
+            sites[component, location] += statistic.size
+            blocks[component, location] += statistic.count
+
+        for (component, location), size in sites.most_common(self.top):
+            self.allocators.append({
+                "time": now,
+                "component": component,
+                "location": location,
+                "size_mb": size / 2**20,
+                "blocks": blocks[component, location],
+                "growth_mb": (size - self.previous_sites.get((component, location), 0)) / 2**20,
+            })
+        self.previous_sites = dict(sites)
+
+        self.census(now)
+        self.measure_components(now)
+        logger.info(f"[{now}] memory milestone: {self.rss_samples[-1]['traced_mb']:.1f} MB traced, "
+                    f"RSS {self.rss_samples[-1]['rss_mb']} MB")
+
+    def is_model_type(self, cls):
+        if cls not in self.type_modules:
+            module_name = cls.__dict__.get("__module__")
+            if not isinstance(module_name, str):  # e.g. types created by C extensions
+                module_name = ""
+            filename = getattr(sys.modules.get(module_name), "__file__", None) or ""
+            self.type_modules[cls] = (os.path.abspath(filename).startswith(ROOT_PATH + os.sep)
+                                      or module_name.split(".")[0] == "simpy" or cls is pd.DataFrame)
+        return self.type_modules[cls]
+
+    def census(self, now):
+        counts = Counter()
+        sizes = Counter()
+        for obj in gc.get_objects():
+            cls = type(obj)
+            if self.is_model_type(cls):
+                counts[cls.__qualname__] += 1
+                sizes[cls.__qualname__] += sys.getsizeof(obj)
+
+        for name, count in counts.most_common():
+            self.objects.append({"time": now, "class": name, "instances": count, "shallow_mb": sizes[name] / 2**20})
+
+    def measure_components(self, now):
+        simulation = self.simulation
+        mission_profile_bytes = sum(profile.memory_usage(deep=True).sum()
+                                    for profiles in simulation.mission_profile.values() for profile in profiles.values())
+
+        logs = (simulation.passenger_trip_log, simulation.passenger_leg_log, simulation.vehicle_trip_log)
+        log_bytes = sum(values.nbytes for log in logs for values in log.buffer.values())
+        log_bytes += sum(values.nbytes for log in logs for chunk in log.chunks for values in chunk.values())
+        history = simulation.distribution_history
+        history_bytes = history.time.nbytes + history.parked.nbytes + history.inbound.nbytes
+
+        waiting = sum(len(vertiport.passengers) for vertiport in simulation.network.vertiports.values())
+
+        rows = {
+            "mission_profile": (mission_profile_bytes, sum(len(profiles) for profiles in simulation.mission_profile.values())),
+            "columnar_logs": (log_bytes, sum(len(log) for log in logs)),
+            "distribution_history": (history_bytes, len(history)),
+            "rejected_passenger_log": (sys.getsizeof(simulation.rejected_passenger_log), len(simulation.rejected_passenger_log)),
+            "waiting_passengers": (None, waiting),
+        }
+        for component, (size, items) in rows.items():
+            self.components.append({"time": now, "component": component,
+                                    "size_mb": size / 2**20 if size is not None else None, "items": items})
+
+    def stop(self):
+        """Stops tracing if the probe started it."""
+        if self.started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def write(self, output_dir):
+        """Writes the memory report files (see module docstring)."""
+        os.makedirs(output_dir, exist_ok=True)
+        pd.DataFrame(self.rss_samples).to_csv(os.path.join(output_dir, "memory_rss.csv"), index=False)
+        pd.DataFrame(self.allocators).to_csv(os.path.join(output_dir, "memory_allocators.csv"), index=False)
+        pd.DataFrame(self.objects).to_csv(os.path.join(output_dir, "memory_objects.csv"), index=False)
+        pd.DataFrame(self.components).to_csv(os.path.join(output_dir, "memory_components.csv"), index=False)
@@ -0,0 +1,115 @@
+"""
+Wall-clock pacing of visual runs.
+
+Instead of stepping the SimPy environment one event at a time with a fixed sleep after each event,
+the pacer advances the simulation in chunks: on every tick it runs env.run(until=...) up to the
+simulated time that corresponds to the elapsed wall time times the playback speed. Playback speed
+therefore does not depend on the event density, and the asyncio loop is entered once per tick.
+
+Playback can be paused, resumed and sped up or slowed down while running, e.g. by websocket clients:
+
+    {"command": "pause"}
+    {"command": "resume"}
+    {"command": "speed", "value": 60}    # simulated seconds per wall-clock second
+"""
+
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PLAYBACK_COMMANDS = ("pause", "resume", "speed")
+
+
+class WallClockPacer:
+    def __init__(self, env, speed=10.0, tick=0.05):
+        """
+        :param env: SimPy environment
+        :param speed: simulated seconds per wall-clock second
+        :param tick: wall-clock seconds between two simulation chunks
+        """
+        self.env = env
+        self.speed = speed
+        self.tick = tick
+        self.paused = False
+        self.running = asyncio.Event()
+        self.running.set()
+        self.listeners = []  # callables notified with status() after every playback change
+
+        # wall time and simulated time of the last (re)start of the playback - speed changes re-anchor
+        self.anchor_wall = None
+        self.anchor_sim = None
+
+    def status(self):
+        return {"time": self.env.now, "paused": self.paused, "speed": self.speed}
+
+    def reanchor(self):
+        self.anchor_wall = time.perf_counter()
+        self.anchor_sim = self.env.now
+
+    def target_time(self):
+        """Simulated time that corresponds to the wall time elapsed since the anchor."""
+        return self.anchor_sim + (time.perf_counter() - self.anchor_wall) * self.speed
+
+    def pause(self):
+        self.paused = True
+        self.running.clear()
+        self.notify()
+
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.reanchor()  # the paused wall time is not caught up
+            self.running.set()
+        self.notify()
+
+    def set_speed(self, speed):
+        if speed <= 0:
+            raise ValueError(f"playback speed must be positive, got {speed}")
+        self.reanchor()
+        self.speed = speed
+        self.notify()
+
+    def handle_command(self, message):
+        """
+        Applies a playback command (dict with "command" and an optional "value").
+
+        :return: True if the command was applied
+        """
+        command = message.get("command")
+        try:
+            if command == "pause":
+                self.pause()
+            elif command == "resume":
+                self.resume()
+            elif command == "speed":
+                self.set_speed(float(message["value"]))
+            else:
+                logger.warning(f"[{self.env.now}] unknown playback command {command} - expected one of {PLAYBACK_COMMANDS}")
+                return False
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"[{self.env.now}] invalid playback command {message}: {e}")
+            return False
+
+        logger.info(f"[{self.env.now}] playback {command}: {self.status()}")
+        return True
+
+    def notify(self):
+        status = self.status()
+        for listener in self.listeners:
+            listener(status)
+
+    async def run(self, until):
+        """Advances the simulation to until, paced by the wall clock."""
+        self.reanchor()
+        while self.env.now < until:
+            if self.paused:
+                await self.running.wait()
+                continue
+
+            target = min(self.target_time(), until)
+            if target > self.env.now:
+                self.env.run(until=target)
+
+            await asyncio.sleep(self.tick)
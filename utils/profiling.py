@@ -0,0 +1,205 @@
+"""
+Opt-in profiling of the SimPy event loop.
+
+SimulationProfiler replaces env.step with an instrumented step that times every callback of the
+processed event. Process resumptions are attributed to the process generator chain they resume
+(e.g. Aircraft.fly;Vertiport.request_landing), other callbacks to their qualified name. Selected
+methods called from inside the processes (network update, dispatch decision, ...) are tracked as
+child frames. Event counts per event type and the event queue depth over simulated time are
+sampled as well.
+
+Nothing is patched unless attach() is called, so an unprofiled run has no overhead.
+
+At the end of a run write() emits:
+    profile_stacks.csv       self wall time and calls per stack
+    profile_processes.csv    wall time and resumptions per process type / callback
+    profile_events.csv       processed events per event type
+    profile_queue_depth.csv  event queue length over simulated time
+    profile.collapsed        collapsed stacks (microseconds) for flamegraph.pl / speedscope
+"""
+
+import os
+import time
+from collections import Counter, defaultdict
+
+import pandas as pd
+from simpy.events import Process
+
+ROOT_FRAME = "simulation"
+
+
+class SimulationProfiler:
+    def __init__(self, env, sample_interval=60):
+        """
+        :param env: SimPy environment
+        :param sample_interval: simulated seconds between two queue depth samples
+        """
+        self.env = env
+        self.sample_interval = sample_interval
+
+        self.stacks = defaultdict(lambda: [0.0, 0])  # stack tuple → [self wall time, calls]
+        self.event_counts = Counter()  # event type → processed events
+        self.resumptions = Counter()  # process type / callback → profiled callbacks
+        self.queue_depth = []  # (simulated time, queued events)
+        self.frames = []  # [stack, child wall time] of the callback / tracked call being executed
+        self.next_sample = None
+        self.wall_time = 0.0  # wall time spent in profiled steps
+        self.steps = 0
+
+        self._step = None  # original env.step while attached
+        self.tracked = []  # (object, attribute) of the tracked methods
+
+    def attach(self, simulation=None):
+        """
+        Instruments env.step, and the main per-tick methods of the simulation if given.
+
+        :param simulation: UAMSimulation whose network update, dispatch and logging calls are tracked
+        """
+        if self._step is not None:
+            return
+        self._step = self.env.step
+        self.env.step = self.step  # Environment.run calls self.step()
+
+        if simulation is not None:
+            scheduler = simulation.scheduler
+            self.track(simulation.network, "update_network")
+            self.track(scheduler, "make_dispatch_decision")
+            self.track(scheduler, "build_snapshot")
+            self.track(scheduler.policy, "decide")
+            self.track(scheduler, "dispatch_aircraft")
+            self.track(scheduler, "perform_vehicle_reposition")
+            self.track(simulation, "log_distribution")
+            self.track(simulation, "process_passenger_arrival")
+
+    def detach(self):
+        """Restores env.step and the tracked methods."""
+        if self._step is None:
+            return
+        del self.env.step
+        self._step = None
+        for obj, name in self.tracked:
+            delattr(obj, name)
+        self.tracked = []
+
+    def track(self, obj, name):
+        """Times calls of obj.name made from inside a profiled callback as a child frame."""
+        function = getattr(obj, name)
+        label = getattr(function, "__qualname__", name)
+        profiler = self
+
+        def tracked(*args, **kwargs):
+            if not profiler.frames:
+                return function(*args, **kwargs)  # called outside the event loop (setup)
+
+            parent = profiler.frames[-1]
+            frame = [parent[0] + (label,), 0.0]
+            profiler.frames.append(frame)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                profiler.frames.pop()
+                parent[1] += elapsed
+                profiler.add(frame[0], elapsed - frame[1])
+
+        setattr(obj, name, tracked)
+        self.tracked.append((obj, name))
+
+    @staticmethod
+    def callback_stack(callback):
+        """Generator chain of a process resumption (outermost first), or the qualified name of a plain callback."""
+        owner = getattr(callback, "__self__", None)
+        if isinstance(owner, Process):
+            frames = []
+            generator = owner._generator
+            while generator is not None:
+                frames.append(getattr(generator, "__qualname__", type(generator).__name__))
+                generator = getattr(generator, "gi_yieldfrom", None)
+            return (ROOT_FRAME, *frames)
+        return ROOT_FRAME, getattr(callback, "__qualname__", type(callback).__name__)
+
+    def timed(self, callback):
+        def profiled_callback(event):
+            frame = [self.callback_stack(callback), 0.0]
+            self.resumptions[frame[0][1]] += 1
+            self.frames.append(frame)
+            start = time.perf_counter()
+            try:
+                callback(event)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.frames.pop()
+                self.add(frame[0], elapsed - frame[1])
+
+        profiled_callback.profiled = True
+        return profiled_callback
+
+    def add(self, stack, self_time):
+        record = self.stacks[stack]
+        record[0] += self_time
+        record[1] += 1
+
+    def step(self):
+        queue = self.env._queue
+        if queue:
+            event = queue[0][3]
+            self.event_counts[type(event).__name__] += 1
+            if event.callbacks:
+                event.callbacks = [callback if getattr(callback, "profiled", False) else self.timed(callback)
+                                   for callback in event.callbacks]
+
+        start = time.perf_counter()
+        try:
+            self._step()
+        finally:
+            self.wall_time += time.perf_counter() - start
+            self.steps += 1
+
+            now = self.env.now
+            if self.next_sample is None:
+                self.next_sample = now
+            if now >= self.next_sample:
+                self.queue_depth.append((now, len(queue)))
+                self.next_sample = now + self.sample_interval
+
+    def stack_frame(self):
+        """Self wall time and calls per stack."""
+        rows = [{"stack": ";".join(stack), "self_s": self_time, "calls": calls}
+                for stack, (self_time, calls) in self.stacks.items()]
+        df = pd.DataFrame(rows, columns=["stack", "self_s", "calls"])
+        return df.sort_values("self_s", ascending=False, ignore_index=True)
+
+    def process_frame(self):
+        """Inclusive wall time and resumptions per process type (outermost generator) or callback."""
+        totals = defaultdict(float)
+        for stack, (self_time, _) in self.stacks.items():
+            totals[stack[1]] += self_time
+
+        rows = [{"process": name, "wall_s": wall, "resumptions": self.resumptions[name]} for name, wall in totals.items()]
+        df = pd.DataFrame(rows, columns=["process", "wall_s", "resumptions"])
+        df["share"] = df["wall_s"] / self.wall_time if self.wall_time else float("nan")
+        return df.sort_values("wall_s", ascending=False, ignore_index=True)
+
+    def summary(self, top=10):
+        df = self.process_frame().head(top)
+        lines = [f"profiled {self.steps} events in {self.wall_time:.2f} s wall time"]
+        lines += [f"  {row.process:<50} {row.wall_s:8.3f} s {row.share:6.1%}  {row.resumptions} resumptions"
+                  for row in df.itertuples()]
+        return "\n".join(lines)
+
+    def write(self, output_dir):
+        """Writes the profile report files (see module docstring)."""
+        os.makedirs(output_dir, exist_ok=True)
+        self.stack_frame().to_csv(os.path.join(output_dir, "profile_stacks.csv"), index=False)
+        self.process_frame().to_csv(os.path.join(output_dir, "profile_processes.csv"), index=False)
+        pd.DataFrame(sorted(self.event_counts.items()), columns=["event", "count"]).to_csv(
+            os.path.join(output_dir, "profile_events.csv"), index=False)
+        pd.DataFrame(self.queue_depth, columns=["time", "queued_events"]).to_csv(
+            os.path.join(output_dir, "profile_queue_depth.csv"), index=False)
+
+        with open(os.path.join(output_dir, "profile.collapsed"), "w") as f:
+            for stack, (self_time, _) in sorted(self.stacks.items()):
+                microseconds = int(round(self_time * 1e6))
+                if microseconds > 0:
+                    f.write(f"{';'.join(frame.replace(';', ':').replace(' ', '_') for frame in stack)} {microseconds}\n")
@@ -0,0 +1,150 @@
+"""
+Single-pass scenario loader.
+
+Reads the network (nodes/edges), the waypoint file of every route and the vehicle specifications once
+into typed structures and validates their cross-references (edges ↔ nodes, edges ↔ waypoint files,
+fleet composition ↔ vehicle specifications). The same Scenario is handed to create_mission_profile and
+UAMNetwork, so no input file is read twice at startup.
+"""
+
+import json
+import os
+from typing import NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+NETWORK_PATH = os.path.join(os.curdir, 'input/network')
+WAYPOINT_PATH = os.path.join(os.curdir, 'input/waypoints')
+PARAM_PATH = os.path.join(os.curdir, 'input/specifications')
+
+
+class NodeSpec(NamedTuple):
+    id: str
+    name: str
+    location: Tuple[float, float, float]  # (latitude, longitude, altitude)
+    composition: dict  # vehicle → number of aircraft initially parked
+    charger: dict
+    pads: Optional[int]
+    stands: Optional[int]
+
+
+class EdgeSpec(NamedTuple):
+    origin: str
+    destination: str
+    waypoints: str  # waypoint file name (without extension)
+    capacity: int
+    attributes: dict  # every edge column except origin/destination (graph edge attributes)
+
+
+class Scenario:
+    def __init__(self, nodes_df, edges_df, specification_df, waypoints):
+        """
+        :param nodes_df: nodes table (id, lat, lon, alt, name, ac_composition, [charger, pads, stands])
+        :param edges_df: edges table (origin, destination, waypoints, [capacity, ...])
+        :param specification_df: vehicle specifications, one column per vehicle
+        :param waypoints: dict[waypoint file name] = waypoint DataFrame
+        """
+        self.nodes_df = nodes_df
+        self.edges_df = edges_df
+        self.specification = specification_df
+        self.waypoints = waypoints
+
+        self.nodes = tuple(self.parse_node(row) for row in nodes_df.to_dict("records"))
+        self.edges = tuple(self.parse_edge(row) for row in edges_df.to_dict("records"))
+        self.vehicles = {vehicle: specification_df[vehicle] for vehicle in specification_df.columns}
+
+        self.validate()
+
+    @classmethod
+    def load(cls, nodes_df=None, edges_df=None, network_path=NETWORK_PATH, waypoint_path=WAYPOINT_PATH, param_path=PARAM_PATH):
+        """
+        Reads every scenario input once. Preloaded nodes/edges tables are used as is.
+
+        :return: Scenario
+        """
+        if nodes_df is None:
+            nodes_df = pd.read_csv(os.path.join(network_path, "nodes.csv"))
+        if edges_df is None:
+            edges_df = pd.read_csv(os.path.join(network_path, "edges.csv"))
+        specification_df = pd.read_csv(os.path.join(param_path, "evtol_spec.csv"), index_col=0)
+
+        waypoints = {}
+        missing = []
+        for name in edges_df["waypoints"].unique():
+            waypoint_file = os.path.join(waypoint_path, name + ".csv")
+            if os.path.exists(waypoint_file):
+                waypoints[name] = pd.read_csv(waypoint_file)
+            else:
+                missing.append(waypoint_file)
+
+        if missing:
+            raise ValueError(f"waypoint files not found: {missing}")
+
+        return cls(nodes_df, edges_df, specification_df, waypoints)
+
+    @staticmethod
+    def parse_node(row):
+        charger = row.get("charger")
+        return NodeSpec(
+            id=row["id"],
+            name=row["name"],
+            location=(row["lat"], row["lon"], row["alt"]),
+            composition=json.loads(row["ac_composition"]),
+            charger=json.loads(charger) if isinstance(charger, str) else {},
+            pads=Scenario.optional_count(row, "pads"),
+            stands=Scenario.optional_count(row, "stands"),
+        )
+
+    @staticmethod
+    def parse_edge(row):
+        attributes = {key: value for key, value in row.items() if key not in ("origin", "destination")}
+        return EdgeSpec(
+            origin=row["origin"],
+            destination=row["destination"],
+            waypoints=row["waypoints"],
+            capacity=attributes.get("capacity", 5),  # Default capacity = 5 if not provided
+            attributes=attributes,
+        )
+
+    @staticmethod
+    def optional_count(row, column):
+        """Optional integer count column, None if the column is missing or empty."""
+        value = row.get(column)
+        if value is None or pd.isna(value):
+            return None
+        return int(value)
+
+    def validate(self):
+        """Raises ValueError listing every broken cross-reference of the scenario."""
+        errors = []
+        node_ids = {node.id for node in self.nodes}
+
+        if len(node_ids) != len(self.nodes):
+            errors.append("duplicate vertiport ids in nodes")
+
+        for node in self.nodes:
+            for vehicle in node.composition:
+                if vehicle not in self.vehicles:
+                    errors.append(f"vertiport {node.id}: vehicle {vehicle} has no specification")
+
+        routes = set()
+        for edge in self.edges:
+            route = (edge.origin, edge.destination)
+            if route in routes:
+                errors.append(f"duplicate edge {route}")
+            routes.add(route)
+
+            for node_id in route:
+                if node_id not in node_ids:
+                    errors.append(f"edge {route}: unknown vertiport {node_id}")
+
+            waypoints = self.waypoints.get(edge.waypoints)
+            if waypoints is None:
+                errors.append(f"edge {route}: waypoint file {edge.waypoints} not loaded")
+            elif {"origin", "destination"} <= set(waypoints.columns) and len(waypoints):
+                if (waypoints["origin"].iloc[0], waypoints["destination"].iloc[0]) != route:
+                    errors.append(f"edge {route}: waypoint file {edge.waypoints} is for route "
+                                  f"{(waypoints['origin'].iloc[0], waypoints['destination'].iloc[0])}")
+
+        if errors:
+            raise ValueError("invalid scenario:\n\t" + "\n\t".join(errors))
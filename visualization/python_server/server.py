@@ -1,17 +1,45 @@
 import asyncio
+import logging
 import websockets
 import json
 
+from models.fleet_state import FleetState
+
+# per-aircraft fields of the JSON frames
+JSON_FIELDS = ("vehicle", "id", "lat", "lon", "alt", "v_h", "v_v", "heading", "soc")
+
+logger = logging.getLogger(__name__)
+
 class WebSocketServer:
-    def __init__(self, simulation, port=8765):
+    def __init__(self, simulation, port=8765, binary=False, pacer=None):
+        """
+        :param binary: send packed float64 frames (FleetState.pack) instead of JSON, the fleet id table is sent as JSON on connect
+        :param pacer: WallClockPacer controlled by the playback commands of the clients (see utils/pacing.py)
+        """
         self.simulation = simulation
         self.port = port
+        self.binary = binary
         self.clients = set()  # Track connected clients
+        self.pacer = None
+        if pacer is not None:
+            self.attach_pacer(pacer)
+
+    def attach_pacer(self, pacer):
+        """Routes client playback commands to the pacer and broadcasts its status after every change."""
+        self.pacer = pacer
+        pacer.listeners.append(lambda status: asyncio.create_task(self.send_message(json.dumps({"playback": status}))))
 
     async def handler(self, websocket):
         self.clients.add(websocket)
         try:
-            await asyncio.Future()  # Keep connection open
+            if self.binary and self.simulation is not None:
+                await websocket.send(json.dumps({"fleet": self.simulation.network.fleet.id_table()}))
+            if self.pacer is not None:
+                await websocket.send(json.dumps({"playback": self.pacer.status()}))
+
+            # connection stays open until the client leaves - incoming messages are playback commands
+            async for message in websocket:
+                self.handle_message(message)
         finally:
             self.clients.remove(websocket)
 
@@ -29,13 +57,38 @@ class WebSocketServer:
         #
         #     await asyncio.sleep(0.05)  # Check frequently, but only send on change
 
+    def handle_message(self, message):
+        try:
+            command = json.loads(message)
+        except ValueError:
+            logger.warning(f"ignored client message (not JSON): {message!r}")
+            return
+
+        if self.pacer is None or not isinstance(command, dict):
+            logger.warning(f"ignored client message: {message!r}")
+            return
+        self.pacer.handle_command(command)
+
+    def serialize(self, state):
+        """Frame of a fleet snapshot (column arrays) - packed bytes or JSON with one record per aircraft."""
+        if self.binary:
+            return FleetState.pack_snapshot(state)
+
+        columns = [state[field].tolist() for field in JSON_FIELDS]
+        return json.dumps({
+            "time": float(state["time"]),
+            "aircrafts": [dict(zip(JSON_FIELDS, values)) for values in zip(*columns)]
+        })
+
     async def send_update(self, state):
         """Send the current state to all connected clients."""
         if self.clients:  # Only send if there are connected clients
-            message = json.dumps(state)
-            await asyncio.gather(*(client.send(message) for client in self.clients))
+            await self.send_message(self.serialize(state))
+
+    async def send_message(self, message):
+        if self.clients:
+            await asyncio.gather(*(client.send(message) for client in list(self.clients)))
             
     async def run(self):
         async with websockets.serve(self.handler, "localhost", self.port):
             await asyncio.Future()  # Run forever
-            
\ No newline at end of file